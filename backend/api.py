@@ -1,55 +1,58 @@
-from fastapi import FastAPI, HTTPException, Body, Query
+from fastapi import FastAPI, HTTPException, Body, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import asyncio
 from typing import List, Dict, Optional
-import uvicorn
-from crewai import Agent, Task, Crew
-from langchain_openai import ChatOpenAI
 import os
 from dotenv import load_dotenv
-import re
 import uuid
 import json
 import requests
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 import io
 import base64
-from PIL import Image
 import traceback
 import random
+import math
 import tempfile
+import time
 import datetime
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 from starlette.background import BackgroundTask
-from bs4 import BeautifulSoup
-import markdown2  # Ajout de l'import pour markdown2
 from crew_flux_image_agent import get_image_prompt_from_gemini, generate_image_with_fal
+from image_sourcing import DEFAULT_DEADLINE as DEFAULT_IMAGE_DEADLINE, serp_api_key, source_article_image
+from providers import OPENAI_MODEL, get_chat_llm, invoke_llm, llm_available
+from singleflight import get_flight, request_fingerprint, singleflight_metrics
+from starlette.concurrency import run_in_threadpool
+from title_engine import TONE_INSTRUCTIONS, clean_title, regenerate_title_ranked
+from title_index import get_history, history_key
+from translation import LANGUAGE_NAMES, translate_markdown
+import json_codec
+from compression import CompressionMiddleware, compression_stats
+from blob_store import image_blobs
+from elementor_kit import build_kit, kit_filename, kit_registry
+from wordpress_client import UnknownSiteError, WordPressSite, get_site, wordpress_sites
+from json_codec import FastJSONResponse
+from session_store import SESSION_CACHE_CONTROL, etag_matches, list_sessions, project_fields
+from palettes import PREDEFINED_PALETTES, get_palette_index, palette_for_scheme
+from prefetch import PREFETCH_ENABLED, speculative_cache
+from session_cache import session_cache, start_flusher, stop_flusher
+from session_lifecycle import lifecycle_stats, start_sweeper, stop_sweeper
 
-# Importation conditionnelle des bibliothèques LLM
-try:
-    # Essayer les importations pour les versions récentes
-    from langchain_openai import ChatOpenAI
-    from langchain_core.messages import HumanMessage
-    LLM_AVAILABLE = True
-except ImportError:
-    try:
-        # Essayer les importations pour les versions plus anciennes
-        from langchain.chat_models import ChatOpenAI
-        from langchain.schema import HumanMessage
-        LLM_AVAILABLE = True
-    except ImportError:
-        print("Erreur: Impossible d'importer les modules langchain nécessaires")
-        raise
+# Les bibliothèques lourdes (crewai, langchain, PIL, NumPy, bs4, markdown2, Gemini, fal)
+# sont importées au premier usage pour que l'API démarre rapidement.
+LLM_AVAILABLE = llm_available()
 
 # Chargement des variables d'environnement
 load_dotenv()
 
 # Récupération de la clé API depuis les variables d'environnement
 api_key = os.getenv("OPENAI_API_KEY", "")
-model = "gpt-3.5-turbo"  # Modèle par défaut
+model = OPENAI_MODEL  # Modèle par défaut
 
-app = FastAPI()
+# Réponses encodées avec orjson quand il est installé (payloads chargés en base64 et Markdown)
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Configuration CORS pour permettre les requêtes depuis votre frontend
 app.add_middleware(
@@ -58,8 +61,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Logo-Score"],
 )
 
+# Compression négociée (zstd / br / gzip) des réponses JSON volumineuses
+app.add_middleware(CompressionMiddleware)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # Écriture différée des sessions modifiées, puis balayage périodique (expiration, archivage, index)
+    start_flusher()
+    start_sweeper()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    # Les sessions modifiées sont écrites avant l'arrêt
+    await stop_flusher()
+    await stop_sweeper()
+    wordpress_sites.close()
+    speculative_cache.clear()
+
 class TitleRequest(BaseModel):
     sujet: str
     tone: str = "standard"
@@ -75,6 +96,8 @@ class RegenerateRequest(BaseModel):
     sujet: str
     tone: str
     titres: List[str]
+    session_id: Optional[str] = None
+    candidates: int = 4
 
 class ArticleRequest(BaseModel):
     titre: str
@@ -88,6 +111,11 @@ class ArticleResponse(BaseModel):
 class ThemeAnalysisRequest(BaseModel):
     theme: str
 
+# Coalescence des requêtes identiques en cours (double-clic, plusieurs onglets)
+article_flight = get_flight("article")
+image_flight = get_flight("generate-image")
+theme_color_flight = get_flight("analyze-theme-color")
+
 # Fonction pour générer des titres
 def generate_titles_with_llm(sujet: str, tone: str, additional_context: str, avoid_context: str) -> List[str]:
     """Génère des titres en utilisant le modèle de langage."""
@@ -95,8 +123,6 @@ def generate_titles_with_llm(sujet: str, tone: str, additional_context: str, avo
         raise ValueError("Clé API OpenAI non configurée")
     
     try:
-        llm = ChatOpenAI(api_key=api_key, model_name=model, temperature=0.7)
-        
         context_info = ""
         if additional_context:
             context_info += f"\nÉléments à inclure: {additional_context}"
@@ -118,7 +144,7 @@ def generate_titles_with_llm(sujet: str, tone: str, additional_context: str, avo
         Retourne uniquement les 5 titres, un par ligne, sans numérotation ni formatage supplémentaire.
         """
         
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = invoke_llm(prompt, temperature=0.7)
         
         # Extraction des titres
         titles = [line.strip() for line in response.content.split('\n') if line.strip()]
@@ -132,9 +158,12 @@ def generate_titles_with_llm(sujet: str, tone: str, additional_context: str, avo
         print(f"Erreur lors de la génération des titres avec LLM: {str(e)}")
         raise
 
-# Fonction pour régénérer un titre spécifique
-def regenerer_titre(index: int, sujet: str, tone: str, titres: List[str]) -> str:
-    llm = ChatOpenAI(openai_api_key=api_key, model=model)
+# Fonction pour régénérer un titre spécifique avec un équipage CrewAI.
+# /api/regenerate-title utilise désormais title_engine (un seul appel au modèle) ;
+# ce chemin est conservé comme référence pour benchmarks/bench_title_regeneration.py.
+def regenerer_titre(index: int, sujet: str, tone: str, titres: List[str], llm=None) -> str:
+    from crewai import Agent, Task, Crew
+    llm = llm or get_chat_llm(0.7)
     
     # Création de l'agent spécialisé
     agent_titres = Agent(
@@ -146,20 +175,11 @@ def regenerer_titre(index: int, sujet: str, tone: str, titres: List[str]) -> str
         llm=llm
     )
     
-    # Adaptation du ton selon le choix de l'utilisateur
-    tone_instructions = {
-        "standard": "équilibré entre information et attractivité",
-        "professionnel": "formel, sérieux et adapté à un public professionnel",
-        "créatif": "original, avec des jeux de mots ou des formulations surprenantes",
-        "accrocheur": "conçu pour maximiser les clics et l'engagement",
-        "informatif": "clair, précis et axé sur l'information"
-    }
-    
     # Définition de la tâche
     tache_regeneration = Task(
         description=f"""
         En fonction du sujet général suivant: "{sujet}", 
-        génère UN SEUL titre d'article qui est {tone_instructions[tone]}.
+        génère UN SEUL titre d'article qui est {TONE_INSTRUCTIONS.get(tone, TONE_INSTRUCTIONS["standard"])}.
         
         Le titre doit être:
         1. Pertinent par rapport au sujet principal
@@ -185,13 +205,7 @@ def regenerer_titre(index: int, sujet: str, tone: str, titres: List[str]) -> str
     resultat = crew.kickoff()
     
     # Nettoyage du résultat
-    nouveau_titre = str(resultat).strip()
-    # Supprimer les numéros ou puces éventuels
-    nouveau_titre = re.sub(r'^[\d\.\-\*]+\s*', '', nouveau_titre)
-    # Supprimer les guillemets éventuels
-    nouveau_titre = nouveau_titre.strip('"\'')
-    
-    return nouveau_titre
+    return clean_title(resultat)
 
 # Fonction pour générer un article complet
 def generate_article_with_llm(titre: str, sujet: str, additional_context: str, avoid_context: str) -> str:
@@ -200,8 +214,6 @@ def generate_article_with_llm(titre: str, sujet: str, additional_context: str, a
         raise ValueError("Clé API OpenAI non configurée")
     
     try:
-        llm = ChatOpenAI(api_key=api_key, model_name=model, temperature=0.7)
-        
         context_info = ""
         if additional_context:
             context_info += f"\nÉléments à inclure: {additional_context}"
@@ -223,7 +235,7 @@ def generate_article_with_llm(titre: str, sujet: str, additional_context: str, a
         Format: Markdown
         """
         
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = invoke_llm(prompt, temperature=0.7)
         return response.content
     except Exception as e:
         print(f"Erreur lors de la génération de l'article avec LLM: {str(e)}")
@@ -276,270 +288,288 @@ async def regenerate_title(request: RegenerateRequest):
         raise HTTPException(status_code=500, detail="API key not configured")
     
     try:
-        new_title = regenerer_titre(request.index, request.sujet, request.tone, request.titres)
-        return {"title": new_title, "id": str(uuid.uuid4())}
+        history = get_history(history_key(request.session_id, request.sujet))
+        new_title, novelty = await run_in_threadpool(
+            regenerate_title_ranked,
+            request.sujet,
+            request.tone,
+            request.titres,
+            history,
+            max(1, min(request.candidates, 8)),
+        )
+        return {"title": new_title, "id": str(uuid.uuid4()), "novelty": round(novelty, 3)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/article")
-async def generate_article(request: dict = Body(...)):
+# Étape "contenu" de /api/article : résultats organiques SERP utilisés comme sources
+def _search_article_sources(sujet: str, titre: str) -> dict:
+    web_content = ""
+    sources = []
+    links = []
+    query = f"{sujet} {titre}"
+    search_url = f"https://serpapi.com/search.json?q={query.replace(' ', '+')}&api_key={serp_api_key()}&engine=google&num=5"
+    
     try:
-        print(f"Requête reçue pour générer un article")
-        titre = request.get("titre", "")
-        sujet = request.get("sujet", "")
-        session_id = request.get("session_id", "")
-        article_index = request.get("article_index")
-        website = request.get("website", "")
-        
-        print(f"Génération d'article: {titre} pour le site {website}, index {article_index}")
-        
-        # Vérifier si une image existe déjà pour cet article
-        article_image_url = None
+        print(f"Envoi de la requête à SERP API pour le contenu: {search_url}")
+        response = requests.get(search_url, timeout=15)
+        print(f"Réponse SERP API (contenu): {response.status_code}")
         
-        # Effectuer le scraping web pour trouver des images et du contenu
-        web_content = ""
-        sources = []
-        
-        try:
-            print(f"Tentative de scraping pour: {sujet} - {titre}")
-            
-            # Recherche d'images via Google Images
-            query = f"{sujet} {titre}"
-            print(f"Requête de recherche d'images: {query}")
-            
-            # Utiliser SERP API pour la recherche d'images
-            serp_api_key = os.getenv("SERP_API_KEY", "be83482fbc42759f8b772badebee33da859d05e98b88506bb2b7bc4e9e33fe56")
-            search_url = f"https://serpapi.com/search.json?q={query.replace(' ', '+')}&api_key={serp_api_key}&engine=google&tbm=isch&num=5"
-            
-            try:
-                print(f"Envoi de la requête à SERP API pour les images: {search_url}")
-                response = requests.get(search_url, timeout=15)
-                print(f"Réponse SERP API (images): {response.status_code}")
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    images_results = data.get("images_results", [])
-                    
-                    if images_results and len(images_results) > 0:
-                        # Prendre la première image pertinente
-                        article_image_url = images_results[0].get("original", "")
-                        print(f"Image trouvée via SERP API: {article_image_url}")
-                elif response.status_code == 429:
-                    print("Limite de requêtes SERP API atteinte, utilisation d'Unsplash")
-                    # Utiliser Unsplash comme alternative
-                    unsplash_query = f"{sujet} {titre}".replace(" ", "+")
-                    unsplash_url = f"https://source.unsplash.com/featured/?{unsplash_query}"
-                    unsplash_response = requests.get(unsplash_url, allow_redirects=True, timeout=10)
-                    if unsplash_response.status_code == 200:
-                        article_image_url = unsplash_response.url
-                        print(f"Image trouvée via Unsplash: {article_image_url}")
-            except Exception as e:
-                print(f"Erreur lors de la recherche d'images: {str(e)}")
-            
-            # Si aucune image n'a été trouvée, essayer avec Unsplash
-            if not article_image_url:
-                try:
-                    print("Tentative avec Unsplash comme solution de secours")
-                    unsplash_query = f"{sujet} {titre}".replace(" ", "+")
-                    unsplash_url = f"https://source.unsplash.com/featured/?{unsplash_query}"
-                    unsplash_response = requests.get(unsplash_url, allow_redirects=True, timeout=10)
-                    if unsplash_response.status_code == 200:
-                        article_image_url = unsplash_response.url
-                        print(f"Image trouvée via Unsplash: {article_image_url}")
-                except Exception as e:
-                    print(f"Erreur lors de la recherche d'image sur Unsplash: {str(e)}")
-            
-            # Recherche de contenu web pour les sources
-            search_url = f"https://serpapi.com/search.json?q={query.replace(' ', '+')}&api_key={serp_api_key}&engine=google&num=5"
+        if response.status_code == 200:
+            data = response.json()
+            organic_results = data.get("organic_results", [])
             
-            try:
-                print(f"Envoi de la requête à SERP API pour le contenu: {search_url}")
-                response = requests.get(search_url, timeout=15)
-                print(f"Réponse SERP API (contenu): {response.status_code}")
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    organic_results = data.get("organic_results", [])
-                    
-                    if organic_results:
-                        for i, result in enumerate(organic_results[:3]):
-                            title = result.get("title", "")
-                            snippet = result.get("snippet", "")
-                            link = result.get("link", "")
-                            
-                            print(f"Source {i+1}: {title} - {link}")
-                            web_content += f"\n\nSource {i+1}: {title}\n{snippet}\n"
-                            sources.append(f"{title} - {link}")
-                            
-                            # Si aucune image n'a été trouvée, essayer d'en extraire une de cette page
-                            if not article_image_url and i == 0:
-                                try:
-                                    page_response = requests.get(link, timeout=10, headers={
-                                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                                    })
-                                    
-                                    if page_response.status_code == 200:
-                                        soup = BeautifulSoup(page_response.text, 'html.parser')
-                                        # Chercher une image pertinente
-                                        img_tags = soup.find_all('img', src=True)
-                                        for img in img_tags:
-                                            src = img.get('src', '')
-                                            # Filtrer les petites images et les icônes
-                                            if src and ('http' in src) and not ('icon' in src.lower()) and not ('logo' in src.lower()):
-                                                article_image_url = src
-                                                print(f"Image extraite de la page: {article_image_url}")
-                                                break
-                                except Exception as e:
-                                    print(f"Erreur lors de l'extraction d'image: {str(e)}")
-                    else:
-                        print("Aucun résultat organique trouvé")
-            except Exception as e:
-                print(f"Erreur lors de la recherche de contenu: {str(e)}")
-        
-        except Exception as e:
-            print(f"Erreur lors du scraping: {str(e)}")
-            traceback.print_exc()
-        
-        # Générer l'article avec le contenu web
-        llm = ChatOpenAI(api_key=api_key, model_name=model, temperature=0.7)
-        
-        # Inclure les sources dans le prompt
-        sources_text = "\n".join([f"- {source}" for source in sources]) if sources else "Aucune source spécifique disponible"
-        
-        prompt = f"""
-        Tu es un expert en rédaction d'articles.
-        
-        Rédige un article complet et détaillé sur "{titre}".
-        
-        Utilise ces informations comme base pour ton article:
-        {web_content}
-        
-        Sources d'information:
-        {sources_text}
-        
-        L'article doit:
-        - Avoir une introduction captivante
-        - Contenir au moins 3 sections principales avec sous-titres
-        - Inclure des exemples concrets
-        - Se terminer par une conclusion
-        - Citer les sources d'information quand c'est pertinent
-        
-        Format: Markdown avec des sections et sous-sections.
-        """
-        
-        response = llm.invoke([HumanMessage(content=prompt)])
-        article_content = response.content.strip()
-        
-        # Sauvegarder l'article et l'image dans la session
-        if session_id:
-            try:
-                # Vérifier si le dossier sessions existe
-                os.makedirs("./sessions", exist_ok=True)
-                
-                session_file = f"./sessions/session_{session_id}.json"
-                session_data = {}
-                
-                # Charger les données de session existantes si elles existent
-                if os.path.exists(session_file):
-                    with open(session_file, "r", encoding="utf-8") as f:
-                        session_data = json.load(f)
-                
-                # Initialiser la structure si nécessaire
-                if "articles" not in session_data:
-                    session_data["articles"] = {}
-                
-                # Sauvegarder l'article avec son image
-                if article_index is not None:
-                    article_key = str(article_index)
-                    if article_key not in session_data["articles"]:
-                        session_data["articles"][article_key] = {}
-                    
-                    session_data["articles"][article_key]["title"] = titre
-                    session_data["articles"][article_key]["content"] = article_content
-                    session_data["articles"][article_key]["sources"] = sources
+            if organic_results:
+                for i, result in enumerate(organic_results[:3]):
+                    title = result.get("title", "")
+                    snippet = result.get("snippet", "")
+                    link = result.get("link", "")
                     
-                    if article_image_url:
-                        session_data["articles"][article_key]["image"] = article_image_url
-                        print(f"Image sauvegardée pour l'article {article_index}: {article_image_url}")
-                
-                # Écrire les données mises à jour
-                with open(session_file, "w", encoding="utf-8") as f:
-                    json.dump(session_data, f, ensure_ascii=False, indent=2)
-                
-                print(f"Article et image sauvegardés dans la session {session_id}")
-            
-            except Exception as e:
-                print(f"Erreur lors de la sauvegarde de l'article: {str(e)}")
-                traceback.print_exc()
-        
-        return {
-            "content": article_content,
-            "sources": sources,
-            "imageUrl": article_image_url
-        }
+                    print(f"Source {i+1}: {title} - {link}")
+                    web_content += f"\n\nSource {i+1}: {title}\n{snippet}\n"
+                    sources.append(f"{title} - {link}")
+                    links.append(link)
+            else:
+                print("Aucun résultat organique trouvé")
+    except Exception as e:
+        print(f"Erreur lors de la recherche de contenu: {str(e)}")
+    
+    return {"web_content": web_content, "sources": sources, "links": links}
+
+def _write_article(titre: str, web_content: str, sources: List[str]) -> str:
+    # Inclure les sources dans le prompt
+    sources_text = "\n".join([f"- {source}" for source in sources]) if sources else "Aucune source spécifique disponible"
+    
+    prompt = f"""
+    Tu es un expert en rédaction d'articles.
+    
+    Rédige un article complet et détaillé sur "{titre}".
+    
+    Utilise ces informations comme base pour ton article:
+    {web_content}
+    
+    Sources d'information:
+    {sources_text}
+    
+    L'article doit:
+    - Avoir une introduction captivante
+    - Contenir au moins 3 sections principales avec sous-titres
+    - Inclure des exemples concrets
+    - Se terminer par une conclusion
+    - Citer les sources d'information quand c'est pertinent
+    
+    Format: Markdown avec des sections et sous-sections.
+    """
+    
+    response = invoke_llm(prompt, temperature=0.7)
+    return response.content.strip()
+
+def _store_article(session_data: dict, article_index, titre: str, article_content: str, sources: List[str], article_image_url: Optional[str]):
+    # Initialiser la structure si nécessaire
+    if "articles" not in session_data:
+        session_data["articles"] = {}
+    
+    # Sauvegarder l'article avec son image
+    if article_index is not None:
+        article_key = str(article_index)
+        if article_key not in session_data["articles"]:
+            session_data["articles"][article_key] = {}
+        
+        session_data["articles"][article_key]["title"] = titre
+        session_data["articles"][article_key]["content"] = article_content
+        session_data["articles"][article_key]["sources"] = sources
+        
+        if article_image_url:
+            session_data["articles"][article_key]["image"] = article_image_url
+            print(f"Image sauvegardée pour l'article {article_index}: {article_image_url}")
+
+async def _save_article_to_session(session_id: str, article_index, titre: str, article_content: str, sources: List[str], article_image_url: Optional[str]):
+    try:
+        # La session est créée si elle n'existe pas encore ; l'écriture sur disque est différée
+        await session_cache.update(
+            session_id,
+            lambda session_data: _store_article(session_data, article_index, titre, article_content, sources, article_image_url),
+            default=dict,
+        )
+        print(f"Article et image sauvegardés dans la session {session_id}")
+    
+    except Exception as e:
+        print(f"Erreur lors de la sauvegarde de l'article: {str(e)}")
+        traceback.print_exc()
+
+def _parse_number(value, default, cast=float):
+    # Valeur numérique envoyée par le client ; `default` si elle est absente ou invalide
+    if value is None or isinstance(value, bool):
+        return default
+    try:
+        return cast(value)
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+def _image_deadline(value) -> float:
+    deadline = _parse_number(value, DEFAULT_IMAGE_DEADLINE)
+    return deadline if math.isfinite(deadline) and deadline > 0 else DEFAULT_IMAGE_DEADLINE
+
+# Fonction pour générer un article complet (scraping web + LLM + sauvegarde en session).
+# Les recherches d'images et de sources sont lancées en parallèle ; la rédaction démarre
+# dès que les extraits organiques sont disponibles, pendant que les sources d'images
+# (SERP, page source, Unsplash, éventuellement fal) font la course sous une même échéance.
+async def _generate_article(request: dict) -> dict:
+    print(f"Requête reçue pour générer un article")
+    titre = request.get("titre", "")
+    sujet = request.get("sujet", "")
+    session_id = request.get("session_id", "")
+    article_index = request.get("article_index")
+    website = request.get("website", "")
+    
+    print(f"Génération d'article: {titre} pour le site {website}, index {article_index}")
+    print(f"Tentative de scraping pour: {sujet} - {titre}")
+    
+    sources_task = asyncio.ensure_future(run_in_threadpool(_search_article_sources, sujet, titre))
+    
+    async def organic_links():
+        # shield : la course des images annule la source "page" perdante, et cette annulation
+        # ne doit pas remonter jusqu'à la recherche de sources dont dépend la rédaction
+        return (await asyncio.shield(sources_task))["links"]
+    
+    # Génération avec fal en dernier recours (optionnelle, coûteuse)
+    fal_fallback = None
+    if request.get("generate_image_fallback"):
+        image_topic = f"{titre} - {sujet}"
+        fal_fallback = lambda: run_in_threadpool(lambda: _generate_image(image_topic).get("image_url"))
+    
+    image_task = asyncio.ensure_future(source_article_image(
+        f"{sujet} {titre}",
+        links_task=asyncio.ensure_future(organic_links()),
+        deadline=_image_deadline(request.get("image_deadline")),
+        fal_fallback=fal_fallback,
+    ))
+    try:
+        found = await sources_task
+        article_content = await run_in_threadpool(_write_article, titre, found["web_content"], found["sources"])
+        image_result = await image_task
+    finally:
+        image_task.cancel()
+    article_image_url = image_result["url"] if image_result else None
     
+    # Sauvegarder l'article et l'image dans la session
+    if session_id:
+        await _save_article_to_session(session_id, article_index, titre, article_content, found["sources"], article_image_url)
+    
+    return {
+        "content": article_content,
+        "sources": found["sources"],
+        "imageUrl": article_image_url
+    }
+
+@app.post("/api/article")
+async def generate_article(request: dict = Body(...)):
+    try:
+        return await article_flight.do(request_fingerprint(request), _generate_article, request)
     except Exception as e:
         print(f"Erreur lors de la génération de l'article: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+# Modes de livraison des images générées :
+# - "data_url" (défaut) : JSON {"image_url": "data:image/png;base64,..."} ;
+# - "binary" : l'image PNG brute dans le corps de la réponse ;
+# - "url" : JSON avec une URL courte vers /api/images/{id}, valable IMAGE_BLOB_TTL secondes.
+IMAGE_DELIVERY_MODES = ("data_url", "binary", "url")
+
+def _png_data_url(image_data: bytes) -> str:
+    return f"data:image/png;base64,{base64.b64encode(image_data).decode('utf-8')}"
+
+def _render_png(generate, prompt: str) -> bytes:
+    # Les générateurs fal écrivent dans un fichier : passer par un fichier temporaire
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
+    temp_file_path = temp_file.name
+    temp_file.close()  # Close the file handle before generating the image
+    try:
+        generate(prompt, temp_file_path)
+        with open(temp_file_path, "rb") as f:
+            return f.read()
+    finally:
+        # Nettoyer le fichier temporaire
+        try:
+            os.unlink(temp_file_path)
+        except Exception as e:
+            print(f"Warning: Could not delete temporary file {temp_file_path}: {str(e)}")
+
+# Génère une image (Gemini + Fal) à partir d'un prompt et retourne le PNG
+def _render_image(prompt: str) -> bytes:
+    print(f"Génération d'une image avec le prompt: {prompt}")
+    # Générer un meilleur prompt avec Gemini
+    enhanced_prompt = get_image_prompt_from_gemini(prompt)
+    print(f"Prompt amélioré par Gemini: {enhanced_prompt}")
+    return _render_png(generate_image_with_fal, enhanced_prompt)
+
+# Fonction pour générer une image (Gemini + Fal) à partir d'un prompt, en data URL
+def _generate_image(prompt: str) -> dict:
+    try:
+        return {"image_url": _png_data_url(_render_image(prompt))}
+    except Exception as e:
+        print(f"Erreur lors de la génération de l'image: {str(e)}")
+        traceback.print_exc()
+        return {"error": f"Erreur lors de la génération de l'image: {str(e)}"}
+
+def _deliver_image(image_data: bytes, delivery: str, http_request: Request, field: str):
+    if delivery == "binary":
+        return Response(
+            content=image_data,
+            media_type="image/png",
+            headers={"Cache-Control": "no-store", "Content-Disposition": 'inline; filename="image.png"'},
+        )
+    if delivery == "url":
+        blob_id = image_blobs.put(image_data, "image/png")
+        return {field: str(http_request.url_for("get_image_blob", blob_id=blob_id)), "expires_in": int(image_blobs.ttl)}
+    return {field: _png_data_url(image_data)}
+
 @app.post("/api/generate-image")
-async def generate_image(request: dict = Body(...)):
+async def generate_image(http_request: Request, request: dict = Body(...)):
     try:
         print(f"Requête reçue pour générer une image")
         prompt = request.get("prompt", "")
         title = request.get("title", "")
+        delivery = request.get("delivery", "data_url")
         
         if not prompt and not title:
             return {"error": "Aucun prompt ou titre fourni"}
+        if delivery not in IMAGE_DELIVERY_MODES:
+            return {"error": f"Mode de livraison inconnu: {delivery} (attendu: {', '.join(IMAGE_DELIVERY_MODES)})"}
         
         # Utiliser le titre comme prompt si aucun prompt n'est fourni
         if not prompt:
             prompt = f"Illustration pour un article intitulé '{title}'"
         
-        print(f"Génération d'une image avec le prompt: {prompt}")
-        
-        # Utiliser Gemini pour améliorer le prompt
+        # Les requêtes identiques partagent la même génération, quel que soit le mode de livraison
         try:
-            # Générer un meilleur prompt avec Gemini
-            enhanced_prompt = get_image_prompt_from_gemini(prompt)
-            print(f"Prompt amélioré par Gemini: {enhanced_prompt}")
-            
-            temp_file = None
-            try:
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-                temp_file_path = temp_file.name
-                temp_file.close()  # Close the file handle before generating the image
-                
-                generate_image_with_fal(enhanced_prompt, temp_file_path)
-                
-                # Lire l'image générée
-                with open(temp_file_path, "rb") as f:
-                    image_data = f.read()
-                
-                # Convertir en base64
-                image_base64 = base64.b64encode(image_data).decode('utf-8')
-                image_url = f"data:image/png;base64,{image_base64}"
-                
-                return {"image_url": image_url}
-            finally:
-                # Nettoyer le fichier temporaire
-                if temp_file and os.path.exists(temp_file_path):
-                    try:
-                        os.unlink(temp_file_path)
-                    except Exception as e:
-                        print(f"Warning: Could not delete temporary file {temp_file_path}: {str(e)}")
-                
+            image_data = await image_flight.do(request_fingerprint({"prompt": prompt}), _render_image, prompt)
         except Exception as e:
             print(f"Erreur lors de la génération de l'image: {str(e)}")
             traceback.print_exc()
             return {"error": f"Erreur lors de la génération de l'image: {str(e)}"}
-            
+        return _deliver_image(image_data, delivery, http_request, "image_url")
     except Exception as e:
         print(f"Erreur lors de la génération de l'image: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/images/{blob_id}")
+async def get_image_blob(blob_id: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Sert une image générée en mode "url". Le contenu d'un identifiant ne change jamais :
+    la réponse est cacheable jusqu'à son expiration.
+    """
+    blob = image_blobs.get(blob_id)
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Image expirée ou inconnue")
+    image_data, content_type, remaining = blob
+    etag = f'"{blob_id}"'
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max(int(remaining), 0)}, immutable"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=image_data, media_type=content_type, headers=headers)
+
 @app.post("/api/export-json")
 async def export_json(request: dict = Body(...)):
     try:
@@ -558,6 +588,24 @@ async def export_pdf(request: dict = Body(...)):
         print(f"Erreur lors de l'exportation PDF: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Textes de secours de la traduction (sans clé API, ou en cas d'échec)
+def _translation_fallback(target_language: str, failed: bool = False) -> str:
+    if failed:
+        # Fallback: texte simple indiquant l'échec de traduction
+        if target_language == "ar":
+            return "عذرًا، فشلت الترجمة. يرجى المحاولة مرة أخرى لاحقًا."
+        elif target_language == "en":
+            return "Sorry, translation failed. Please try again later."
+        else:  # fr
+            return "Désolé, la traduction a échoué. Veuillez réessayer plus tard."
+    # Fallback simple pour les tests
+    if target_language == "ar":
+        return "هذا هو النص المترجم. هذا مجرد نص للاختبار."
+    elif target_language == "en":
+        return "This is the translated text. This is just a test text."
+    else:  # fr
+        return "Voici le texte traduit. Ceci est juste un texte de test."
+
 @app.post("/api/translate")
 async def translate_content(request: dict = Body(...)):
     try:
@@ -567,162 +615,146 @@ async def translate_content(request: dict = Body(...)):
         
         if not api_key:
             print("Clé API OpenAI non configurée, utilisation du fallback")
-            # Fallback simple pour les tests
-            if target_language == "ar":
-                return {"translated_content": "هذا هو النص المترجم. هذا مجرد نص للاختبار."}
-            elif target_language == "en":
-                return {"translated_content": "This is the translated text. This is just a test text."}
-            else:  # fr
-                return {"translated_content": "Voici le texte traduit. Ceci est juste un texte de test."}
+            return {"translated_content": _translation_fallback(target_language)}
         
         try:
-            llm = ChatOpenAI(api_key=api_key, model_name=model, temperature=0.3)
-            
-            language_name = ""
-            if target_language == "ar":
-                language_name = "arabe"
-            elif target_language == "en":
-                language_name = "anglais"
-            else:  # fr
-                language_name = "français"
-            
-            prompt = f"""
-            Traduis le texte suivant en {language_name}. 
-            Conserve le formatage Markdown, les titres, les listes et tous les éléments de mise en forme.
-            
-            Texte à traduire:
-            {content}
-            """
-            
-            response = llm.invoke([HumanMessage(content=prompt)])
-            translated_content = response.content
+            # Traduction par segments Markdown, en parallèle, avec mémoire de traduction
+            translated_content = await run_in_threadpool(translate_markdown, content, target_language)
             
             print(f"Traduction réussie vers {target_language}")
             return {"translated_content": translated_content}
         except Exception as e:
             print(f"Erreur lors de la traduction avec LLM: {str(e)}")
             traceback.print_exc()
-            
-            # Fallback: texte simple indiquant l'échec de traduction
-            if target_language == "ar":
-                return {"translated_content": "عذرًا، فشلت الترجمة. يرجى المحاولة مرة أخرى لاحقًا."}
-            elif target_language == "en":
-                return {"translated_content": "Sorry, translation failed. Please try again later."}
-            else:  # fr
-                return {"translated_content": "Désolé, la traduction a échoué. Veuillez réessayer plus tard."}
+            return {"translated_content": _translation_fallback(target_language, failed=True)}
     except Exception as e:
         print(f"Erreur lors de la traduction: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/generate-website-theme")
-async def generate_website_theme(request: dict = Body(...)):
+@app.post("/api/translate-batch")
+async def translate_content_batch(request: dict = Body(...)):
+    """
+    Traduit un même contenu vers plusieurs langues en parallèle. Les segments de toutes les
+    langues partagent la limite de concurrence du moteur de traduction. Chaque langue est
+    renvoyée dès qu'elle est prête, sous forme d'une ligne JSON (application/x-ndjson).
+    """
+    content = request.get("content", "")
+    if not isinstance(content, str) or not content.strip():
+        return {"error": "Contenu à traduire non fourni"}
+    target_languages = request.get("target_languages") or ["ar", "en", "fr"]
+    if not isinstance(target_languages, list) or not all(isinstance(language, str) for language in target_languages):
+        return {"error": "target_languages doit être une liste de codes de langue"}
+    # Une langue inconnue serait traduite en français et mémorisée sous le mauvais code
+    unsupported = [language for language in target_languages if language not in LANGUAGE_NAMES]
+    if unsupported:
+        return {"error": f"Langue(s) non prise(s) en charge: {', '.join(unsupported)} (disponibles: {', '.join(LANGUAGE_NAMES)})"}
+    target_languages = list(dict.fromkeys(target_languages))
+    print(f"Requête de traduction groupée reçue: {target_languages}")
+    
+    async def translate_one(target_language: str) -> dict:
+        started = time.perf_counter()
+        result = {"target_language": target_language}
+        if not api_key:
+            result["translated_content"] = _translation_fallback(target_language)
+        else:
+            try:
+                result["translated_content"] = await run_in_threadpool(translate_markdown, content, target_language)
+            except Exception as e:
+                print(f"Erreur lors de la traduction vers {target_language}: {str(e)}")
+                traceback.print_exc()
+                result["translated_content"] = _translation_fallback(target_language, failed=True)
+                result["error"] = str(e)
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000)
+        return result
+    
+    async def stream():
+        tasks = [asyncio.ensure_future(translate_one(language)) for language in target_languages]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json_codec.dumps(await next_done) + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def _generate_website_theme(theme: str, number_of_variations: int) -> dict:
+    """
+    Génère les variations de thème de site web (fonction bloquante : appel LLM).
+    """
+    if not api_key:
+        # Fallback pour les tests
+        variations = [
+            {
+                "id": "var1",
+                "title": f"{theme} - Version Professionnelle",
+                "description": f"Un site web professionnel sur {theme} avec une approche business.",
+                "style": "Professionnel et épuré"
+            },
+            {
+                "id": "var2",
+                "title": f"{theme} - Version Créative",
+                "description": f"Un site web créatif sur {theme} avec un design unique.",
+                "style": "Créatif et coloré"
+            },
+            {
+                "id": "var3",
+                "title": f"{theme} - Version Minimaliste",
+                "description": f"Un site web minimaliste sur {theme} avec un design simple.",
+                "style": "Minimaliste et élégant"
+            }
+        ]
+        
+        return {"variations": variations[:number_of_variations]}
+    
     try:
-        print(f"Requête reçue pour générer un thème de site web")
-        theme = request.get("theme", "")
-        number_of_variations = request.get("variations", 3)
+        prompt = f"""
+        Génère {number_of_variations} variations de thèmes de sites web basés sur le sujet principal: "{theme}".
+        
+        Pour chaque variation, fournis:
+        1. Un titre unique
+        2. Une brève description (1-2 phrases)
+        3. Un style visuel suggéré
+        
+        Les variations doivent être différentes les unes des autres et explorer différentes approches du même thème.
+        
+        Format de réponse: JSON
+        [
+            {{
+                "title": "Titre de la variation",
+                "description": "Description de la variation",
+                "style": "Style visuel suggéré"
+            }},
+            ...
+        ]
+        """
         
-        if not api_key:
-            # Fallback pour les tests
-            variations = [
-                {
-                    "id": "var1",
-                    "title": f"{theme} - Version Professionnelle",
-                    "description": f"Un site web professionnel sur {theme} avec une approche business.",
-                    "style": "Professionnel et épuré"
-                },
-                {
-                    "id": "var2",
-                    "title": f"{theme} - Version Créative",
-                    "description": f"Un site web créatif sur {theme} avec un design unique.",
-                    "style": "Créatif et coloré"
-                },
-                {
-                    "id": "var3",
-                    "title": f"{theme} - Version Minimaliste",
-                    "description": f"Un site web minimaliste sur {theme} avec un design simple.",
-                    "style": "Minimaliste et élégant"
-                }
-            ]
-            
-            return {"variations": variations[:number_of_variations]}
+        response = invoke_llm(prompt, temperature=0.7)
         
-        try:
-            llm = ChatOpenAI(api_key=api_key, model_name=model, temperature=0.7)
-            
-            prompt = f"""
-            Génère {number_of_variations} variations de thèmes de sites web basés sur le sujet principal: "{theme}".
-            
-            Pour chaque variation, fournis:
-            1. Un titre unique
-            2. Une brève description (1-2 phrases)
-            3. Un style visuel suggéré
-            
-            Les variations doivent être différentes les unes des autres et explorer différentes approches du même thème.
-            
-            Format de réponse: JSON
-            [
-                {{
-                    "title": "Titre de la variation",
-                    "description": "Description de la variation",
-                    "style": "Style visuel suggéré"
-                }},
-                ...
-            ]
-            """
-            
-            response = llm.invoke([HumanMessage(content=prompt)])
-            
-            # Extraire le JSON de la réponse
-            import json
-            import re
+        # Extraire le JSON de la réponse
+        import json
+        import re
+        
+        # Rechercher un bloc JSON dans la réponse
+        json_match = re.search(r'\[[\s\S]*\]', response.content)
+        if json_match:
+            json_str = json_match.group(0)
+            variations_data = json.loads(json_str)
             
-            # Rechercher un bloc JSON dans la réponse
-            json_match = re.search(r'\[[\s\S]*\]', response.content)
-            if json_match:
-                json_str = json_match.group(0)
-                variations_data = json.loads(json_str)
-                
-                # Ajouter des IDs aux variations
-                variations = []
-                for i, var in enumerate(variations_data):
-                    variations.append({
-                        "id": f"var{i+1}",
-                        "title": var.get("title", f"{theme} - Variation {i+1}"),
-                        "description": var.get("description", f"Une variation de site web sur {theme}."),
-                        "style": var.get("style", "Style standard")
-                    })
-                
-                return {"variations": variations[:number_of_variations]}
-            else:
-                # Fallback si le format JSON n'est pas détecté
-                variations = [
-                    {
-                        "id": "var1",
-                        "title": f"{theme} - Version Professionnelle",
-                        "description": f"Un site web professionnel sur {theme} avec une approche business.",
-                        "style": "Professionnel et épuré"
-                    },
-                    {
-                        "id": "var2",
-                        "title": f"{theme} - Version Créative",
-                        "description": f"Un site web créatif sur {theme} avec un design unique.",
-                        "style": "Créatif et coloré"
-                    },
-                    {
-                        "id": "var3",
-                        "title": f"{theme} - Version Minimaliste",
-                        "description": f"Un site web minimaliste sur {theme} avec un design simple.",
-                        "style": "Minimaliste et élégant"
-                    }
-                ]
-                
-                return {"variations": variations[:number_of_variations]}
-        except Exception as e:
-            print(f"Erreur lors de la génération des variations avec LLM: {str(e)}")
-            traceback.print_exc()
+            # Ajouter des IDs aux variations
+            variations = []
+            for i, var in enumerate(variations_data):
+                variations.append({
+                    "id": f"var{i+1}",
+                    "title": var.get("title", f"{theme} - Variation {i+1}"),
+                    "description": var.get("description", f"Une variation de site web sur {theme}."),
+                    "style": var.get("style", "Style standard")
+                })
             
-            # Fallback en cas d'erreur
+            return {"variations": variations[:number_of_variations]}
+        else:
+            # Fallback si le format JSON n'est pas détecté
             variations = [
                 {
                     "id": "var1",
@@ -745,360 +777,513 @@ async def generate_website_theme(request: dict = Body(...)):
             ]
             
             return {"variations": variations[:number_of_variations]}
+    except Exception as e:
+        print(f"Erreur lors de la génération des variations avec LLM: {str(e)}")
+        traceback.print_exc()
+        
+        # Fallback en cas d'erreur
+        variations = [
+            {
+                "id": "var1",
+                "title": f"{theme} - Version Professionnelle",
+                "description": f"Un site web professionnel sur {theme} avec une approche business.",
+                "style": "Professionnel et épuré"
+            },
+            {
+                "id": "var2",
+                "title": f"{theme} - Version Créative",
+                "description": f"Un site web créatif sur {theme} avec un design unique.",
+                "style": "Créatif et coloré"
+            },
+            {
+                "id": "var3",
+                "title": f"{theme} - Version Minimaliste",
+                "description": f"Un site web minimaliste sur {theme} avec un design simple.",
+                "style": "Minimaliste et élégant"
+            }
+        ]
+        
+        return {"variations": variations[:number_of_variations]}
+
+@app.post("/api/generate-website-theme")
+async def generate_website_theme(request: dict = Body(...)):
+    try:
+        print(f"Requête reçue pour générer un thème de site web")
+        theme = request.get("theme", "")
+        number_of_variations = request.get("variations", 3)
+        
+        result = await run_in_threadpool(_generate_website_theme, theme, number_of_variations)
+        
+        # Préchargement spéculatif des étapes suivantes (prompts de logo, titres et sources des articles)
+        if request.get("prefetch", PREFETCH_ENABLED):
+            scheduled = _prefetch_variations(result["variations"])
+            print(f"[Prefetch] {scheduled} préchargement(s) lancé(s)")
+        return result
     except Exception as e:
         print(f"Erreur lors de la génération des variations de thème: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+# Nombre maximal de variations dont les logos sont générés simultanément (appels Gemini + fal)
+LOGO_CONCURRENCY = int(os.getenv("LOGO_CONCURRENCY", "5"))
+
+def _rank_logo_candidates(logos: List[bytes]) -> List[tuple]:
+    """
+    Classe les logos candidats par qualité (centrage, fond, couleurs, lisibilité en petit).
+    Retourne [(png, qualité)] du meilleur au moins bon ; un candidat unique n'est pas évalué.
+    """
+    if len(logos) == 1:
+        return [(logos[0], None)]
+    from logo_quality import rank_logos
+    return [
+        (logos[quality["index"]], {key: quality[key] for key in ("score", "dominant_colors", "metrics")})
+        for quality in rank_logos(logos)
+    ]
+
+def _logo_alternatives(ranked: List[tuple], to_url) -> List[dict]:
+    return [{"logo_url": to_url(logo), "quality": quality} for logo, quality in ranked[1:]]
+
+def _default_logo_prompt(variation: dict) -> str:
+    return f"Un logo moderne pour {variation.get('title', '')}. Style: {variation.get('style', '')}."
+
+def _generate_variation_logos(logo_prompt: str, count: int):
+    """
+    Améliore le prompt avec Gemini puis demande `count` logos à fal en un seul appel.
+    Retourne (prompt amélioré, [(png, qualité)] du meilleur au moins bon).
+    """
+    from crew_flux_image_agent import get_logo_prompt_from_gemini, generate_logos_with_fal
+    
+    # Générer un meilleur prompt avec Gemini (ou reprendre celui préchargé après la génération du thème)
+    enhanced_prompt = speculative_cache.take(("logo_prompt", logo_prompt))
+    if enhanced_prompt is None:
+        enhanced_prompt = get_logo_prompt_from_gemini(logo_prompt)
+    print(f"Prompt de logo amélioré par Gemini: {enhanced_prompt}")
+    logos = generate_logos_with_fal(enhanced_prompt, num_images=count)
+    if not logos:
+        raise ValueError("Aucun logo retourné par fal")
+    return enhanced_prompt, _rank_logo_candidates(logos)
+
+async def _generate_variation_logo(variation: dict, logo_descriptions: dict, images_per_variation: int, semaphore: asyncio.Semaphore) -> dict:
+    """
+    Génère le logo d'une variation (au plus `semaphore` générations simultanées).
+    En cas d'échec, retourne un logo de substitution avec "generated": False.
+    """
+    var_id = variation.get("id", "")
+    
+    # Obtenir la description du logo si fournie, sinon en générer une
+    logo_prompt = logo_descriptions.get(var_id, "")
+    if not logo_prompt:
+        # Générer une description de logo basée sur le thème
+        logo_prompt = _default_logo_prompt(variation)
+    
+    try:
+        async with semaphore:
+            enhanced_prompt, ranked = await run_in_threadpool(_generate_variation_logos, logo_prompt, images_per_variation)
+        best_logo, quality = ranked[0]
+        result = {
+            "variation_id": var_id,
+            "logo_url": _png_data_url(best_logo),
+            "logo_prompt": enhanced_prompt,
+            "generated": True,
+        }
+        if quality is not None:
+            result["quality"] = quality
+            result["alternatives"] = _logo_alternatives(ranked, _png_data_url)
+        return result
+    except Exception as e:
+        print(f"Erreur lors de la génération du logo: {str(e)}")
+        traceback.print_exc()
+        # Use a placeholder logo in case of error
+        return {
+            "variation_id": var_id,
+            "logo_url": f"https://via.placeholder.com/200x200.png?text=Logo+{var_id}",
+            "logo_prompt": logo_prompt,
+            "generated": False,
+        }
+
 @app.post("/api/generate-logos")
 async def generate_logos(request: dict = Body(...)):
+    """
+    Génère les logos de toutes les variations en parallèle (au plus LOGO_CONCURRENCY à la fois).
+    `images_per_variation` (1 à 4) demande plusieurs propositions par variation dans un même
+    appel fal : elles sont évaluées localement, la meilleure est retenue et les autres sont
+    retournées, classées, dans `alternatives`.
+    Les logos générés sont enregistrés dans la session en une seule écriture.
+    """
     try:
         print(f"Requête reçue pour générer des logos")
         variations = request.get("variations", [])
         logo_descriptions = request.get("logo_descriptions", {})
         session_id = request.get("session_id")
+        images_per_variation = _parse_number(request.get("images_per_variation", 1), None, int)
+        if images_per_variation is None:
+            return {"error": "images_per_variation doit être un nombre entier"}
+        images_per_variation = max(1, min(images_per_variation, 4))
+        
+        semaphore = asyncio.Semaphore(LOGO_CONCURRENCY)
+        
+        results = await asyncio.gather(*[
+            _generate_variation_logo(variation, logo_descriptions, images_per_variation, semaphore)
+            for variation in variations
+        ])
+        
+        # --- PERSISTENCE: enregistrer les logos dans la session backend si session_id fourni ---
+        generated = {result["variation_id"]: result["logo_url"] for result in results if result.pop("generated")}
+        if session_id and generated:
+            def store_logos(session_data: dict):
+                for var_id, logo_url in generated.items():
+                    _set_session_logo(session_data, var_id, logo_url)
+            try:
+                await session_cache.update(session_id, store_logos)
+            except KeyError:
+                pass
+            except Exception as e:
+                print(f"[WARN] Impossible de persister les logos dans la session: {e}")
+        # --- FIN PERSISTENCE ---
+        
+        return {"logos": results}
+    except Exception as e:
+        print(f"Erreur lors de la génération des logos: {str(e)}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Fonction pour analyser la palette de couleurs adaptée à un thème
+def _theme_color_result(color_scheme: str) -> dict:
+    # Palette prédéfinie la plus proche du schéma (index CIELAB précalculé, recherche k-d)
+    return {"colorScheme": color_scheme, "palette": palette_for_scheme(color_scheme)}
+
+def _analyze_theme_color(theme: str) -> dict:
+    if not api_key:
+        # Fallback si pas de clé API
+        return _theme_color_result(get_automatic_color_scheme(theme))
+    
+    try:
+        prompt = f"""
+        Analyse le thème suivant: "{theme}"
+        
+        Détermine la palette de couleurs la plus appropriée parmi les options suivantes:
+        - vert: pour les thèmes liés à la nature, l'environnement, la nourriture, la santé naturelle
+        - bleu: pour les thèmes liés au voyage, à la technologie professionnelle, à la santé médicale, à l'eau
+        - violet: pour les thèmes liés à la technologie créative, l'innovation, le luxe
+        - rouge: pour les thèmes liés à la mode, la beauté, la passion, l'urgence
+        - orange: pour les thèmes liés à la créativité, l'enthousiasme, la chaleur
+        - jaune: pour les thèmes liés à l'optimisme, la jeunesse, l'énergie
+        
+        Réponds uniquement avec le nom de la palette (vert, bleu, violet, rouge, orange ou jaune) sans aucun autre texte.
+        """
+        
+        response = invoke_llm(prompt, temperature=0.3)
+        
+        # Extraire la réponse et la nettoyer
+        color_scheme = response.content.strip().lower()
+        
+        # Vérifier si la réponse est valide
+        valid_schemes = ["vert", "bleu", "violet", "rouge", "orange", "jaune"]
+        if color_scheme not in valid_schemes:
+            # Si la réponse n'est pas valide, utiliser la méthode de secours
+            color_scheme = get_automatic_color_scheme(theme)
+        
+        return _theme_color_result(color_scheme)
+    except Exception as e:
+        print(f"Erreur lors de l'analyse du thème avec LLM: {str(e)}")
+        return _theme_color_result(get_automatic_color_scheme(theme))
+
+@app.post("/api/analyze-theme-color")
+async def analyze_theme_color(request: ThemeAnalysisRequest):
+    try:
+        key = request_fingerprint({"theme": request.theme})
+        return await theme_color_flight.do(key, _analyze_theme_color, request.theme)
+    except Exception as e:
+        print(f"Erreur lors de l'analyse du thème: {str(e)}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Fonction de secours pour déterminer la palette de couleurs
+def get_automatic_color_scheme(theme: str) -> str:
+    theme_lower = theme.lower()
+    
+    if any(keyword in theme_lower for keyword in ["nourriture", "food", "restaurant", "bio", "café", "cuisine"]):
+        return "vert"
+    elif any(keyword in theme_lower for keyword in ["voyage", "travel", "tourisme", "aventure", "destination"]):
+        return "bleu"
+    elif any(keyword in theme_lower for keyword in ["tech", "digital", "innovation", "startup", "ai", "ia"]):
+        return "violet"
+    elif any(keyword in theme_lower for keyword in ["santé", "health", "médical", "clinique", "hôpital"]):
+        return "bleu"
+    elif any(keyword in theme_lower for keyword in ["mode", "fashion", "beauté", "beauty", "luxe", "style"]):
+        return "rouge"
+    elif any(keyword in theme_lower for keyword in ["créatif", "creative", "art", "design", "studio"]):
+        return "orange"
+    elif any(keyword in theme_lower for keyword in ["enfant", "kid", "école", "school", "éducation", "formation"]):
+        return "jaune"
+    else:
+        return "default"
+
+def get_random_color_palette():
+    """
+    Retourne une palette de couleurs aléatoire parmi les palettes prédéfinies.
+    """
+    return dict(random.choice(PREDEFINED_PALETTES))
+
+ARTICLES_PER_VARIATION = 5
+ARTICLE_CATEGORIES = ["Business", "Education", "Productivity", "Events", "Blog", "jobs"]
+
+def _article_title(site_name: str, site_description: str, category: str, index: int) -> str:
+    # Générer un titre d'article
+    title_prompt = f"""
+    Génère un titre d'article accrocheur pour un site web nommé '{site_name}'.
+    Description du site: {site_description}
+    Le titre doit être concis (moins de 10 mots) et attrayant.
+    Catégorie de l'article : {category}
+    """
+    
+    title = ""
+    if api_key:
+        response = invoke_llm(title_prompt, temperature=0.7)
+        title = response.content.strip().replace('"', '')
+    else:
+        # Fallback pour les tests
+        title = f"Article {index+1} pour {site_name}"
+    
+    return title
+
+def _article_web_content(title: str, site_name: str, site_description: str, category: str):
+    """
+    Recherche SERP des sources d'un article. Retourne (contenu web, sources) ; contenu vide si rien n'est trouvé.
+    """
+    print(f"Démarrage du scraping web pour l'article: {title}")
+    
+    article_web_content = ""
+    article_sources = []
+    
+    try:
+        # Construire la requête de recherche
+        query = f"{title} {site_name} {site_description} {category}"
+        search_url = f"https://serpapi.com/search.json?q={query.replace(' ', '+')}&api_key={serp_api_key()}&engine=google&num=5"
+        
+        print(f"Requête SERP API pour l'article: {search_url}")
+        response = requests.get(search_url, timeout=30)
         
-        # Résultats à retourner
-        results = []
+        print(f"Réponse SERP API reçue: status code {response.status_code}")
         
+        if response.status_code == 200:
+            data = response.json()
+            
+            # Extraire les résultats organiques
+            organic_results = data.get("organic_results", [])
+            print(f"Nombre de résultats organiques trouvés: {len(organic_results)}")
+            
+            if organic_results:
+                for k, result in enumerate(organic_results[:3]):
+                    result_title = result.get("title", "")
+                    result_snippet = result.get("snippet", "")
+                    result_link = result.get("link", "")
+                    
+                    print(f"Source {k+1}: {result_title} - {result_link}")
+                    
+                    # Ajouter à notre contenu web
+                    article_web_content += f"\n\nSource {k+1}: {result_title}\n{result_snippet}\n"
+                    article_sources.append(f"{result_title} - {result_link}")
+            else:
+                print("Aucun résultat organique trouvé")
+        else:
+            print(f"Erreur API SERP: {response.status_code} - {response.text}")
+    except Exception as e:
+        print(f"Erreur lors du scraping web: {str(e)}")
+        traceback.print_exc()
+        article_web_content = ""
+    
+    return article_web_content, article_sources
+
+def _prefetch_article(site_name: str, site_description: str, category: str, index: int):
+    title = _article_title(site_name, site_description, category, index)
+    return (title, *_article_web_content(title, site_name, site_description, category))
+
+def _prefetch_variations(variations: List[dict]) -> int:
+    """
+    Précharge en arrière-plan, sous le budget du préchargement, ce que les étapes suivantes
+    demanderont presque sûrement : le prompt Gemini du logo de chaque variation, puis le titre
+    et les sources SERP de ses articles. Retourne le nombre de préchargements lancés.
+    """
+    from crew_flux_image_agent import get_logo_prompt_from_gemini
+    scheduled = 0
+    if os.getenv("GEMINI_API_KEY"):
         for variation in variations:
-            var_id = variation.get("id", "")
-            title = variation.get("title", "")
-            description = variation.get("description", "")
-            style = variation.get("style", "")
+            logo_prompt = _default_logo_prompt(variation)
+            scheduled += speculative_cache.schedule(("logo_prompt", logo_prompt), 1, get_logo_prompt_from_gemini, logo_prompt)
+    # Coût d'un article : appel LLM du titre (si configuré) + recherche SERP
+    article_cost = 2 if api_key else 1
+    for variation in variations:
+        site_name = variation.get("title", "Site")
+        site_description = variation.get("description", "")
+        for j in range(ARTICLES_PER_VARIATION):
+            category = ARTICLE_CATEGORIES[j % len(ARTICLE_CATEGORIES)]
+            scheduled += speculative_cache.schedule(
+                ("article", site_name, site_description, category, j),
+                article_cost,
+                _prefetch_article, site_name, site_description, category, j,
+            )
+    return scheduled
+
+def _generate_variation_articles(variation: dict) -> List[dict]:
+    """
+    Génère les 5 articles d'une variation (titre, recherche SERP, rédaction, image).
+    Fonction bloquante : à exécuter dans le threadpool.
+    """
+    articles = []
+    # Récupérer les informations de la variation
+    site_name = variation.get("title", "Site")
+    site_description = variation.get("description", "")
+    
+    # Générer 5 articles
+    for j in range(ARTICLES_PER_VARIATION):
+        try:
+            category = ARTICLE_CATEGORIES[j % len(ARTICLE_CATEGORIES)]
+            print(f"Génération de l'article {j+1}/5 pour {site_name} (Catégorie: {category})")
+            
+            # Titre et sources SERP préchargés après la génération du thème, sinon calculés ici
+            prefetched = speculative_cache.take(("article", site_name, site_description, category, j))
+            if prefetched is not None:
+                title, article_web_content, article_sources = prefetched
+                print(f"Titre et sources préchargés: {title}")
+            else:
+                title = _article_title(site_name, site_description, category, j)
+                print(f"Titre généré: {title}")
+                article_web_content, article_sources = _article_web_content(title, site_name, site_description, category)
+            
+            # Si aucun contenu n'a été trouvé, utiliser un message par défaut
+            if not article_web_content:
+                article_web_content = f"Aucune information spécifique trouvée sur '{title}'. Génération d'un article basé sur les connaissances générales."
+                print("Utilisation du contenu par défaut")
+            else:
+                print(f"Contenu web récupéré avec succès: {len(article_web_content)} caractères")
+            
+            # Générer le contenu de l'article avec le contenu web
+            content_prompt = f"""
+            Écris un article complet pour un site web nommé '{site_name}' avec le titre '{title}'.
+            Description du site: {site_description}
+            Catégorie de l'article : {category}
+            Utilise les informations suivantes récupérées du web pour enrichir ton article:
+            {article_web_content}
+            L'article doit:
+            - Être informatif et engageant
+            - Contenir environ 500 mots
+            - Être structuré avec une introduction, un développement et une conclusion
+            - Être adapté au thème du site
+            - Être pertinent pour la catégorie : {category}
+            - Inclure des faits et informations pertinentes tirés des sources web
+            Format: Markdown avec des sections et sous-sections.
+            """
+            
+            content = ""
             
-            # Obtenir la description du logo si fournie, sinon en générer une
-            logo_prompt = logo_descriptions.get(var_id, "")
-            if not logo_prompt:
-                # Générer une description de logo basée sur le thème
-                logo_prompt = f"Un logo moderne pour {title}. Style: {style}."
+            if api_key:
+                response = invoke_llm(content_prompt, temperature=0.7)
+                content = response.content.strip()
+                
+                print(f"Article généré: {len(content)} caractères")
+            else:
+                # Fallback pour les tests
+                content = f"Contenu par défaut pour l'article {j+1}."
             
+            # GÉNÉRATION DE L'IMAGE AVEC CREW_FLUX
+            article_image_url = None
             try:
-                from crew_flux_image_agent import get_logo_prompt_from_gemini, generate_logo_with_fal
+                # Créer un prompt pour l'image basé sur le titre et la catégorie
+                image_topic = f"{title} - {category} - {site_description}"
+                print(f"Génération d'une image pour: {image_topic}")
                 
                 # Générer un meilleur prompt avec Gemini
-                enhanced_prompt = get_logo_prompt_from_gemini(logo_prompt)
-                print(f"Prompt de logo amélioré par Gemini: {enhanced_prompt}")
+                enhanced_prompt = get_image_prompt_from_gemini(image_topic)
+                print(f"Prompt amélioré par Gemini: {enhanced_prompt}")
                 
+                # Générer l'image avec Fal.ai
                 temp_file = None
                 try:
                     temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
                     temp_file_path = temp_file.name
                     temp_file.close()  # Close the file handle before generating the image
                     
-                    generate_logo_with_fal(enhanced_prompt, temp_file_path)
+                    generate_image_with_fal(enhanced_prompt, temp_file_path)
                     
-                    # Read the generated logo
+                    # Lire l'image générée
                     with open(temp_file_path, "rb") as f:
-                        logo_data = f.read()
-                    
-                    # Convert to base64
-                    logo_base64 = base64.b64encode(logo_data).decode('utf-8')
-                    logo_url = f"data:image/png;base64,{logo_base64}"
-                    
-                    # --- PERSISTENCE: enregistrer le logo dans la session backend si session_id fourni ---
-                    if session_id:
-                        import os, json
-                        session_file = f"./sessions/session_{session_id}.json"
-                        if os.path.exists(session_file):
-                            try:
-                                with open(session_file, "r", encoding="utf-8") as f:
-                                    session_data = json.load(f)
-                                if "logos" not in session_data or not isinstance(session_data["logos"], dict):
-                                    session_data["logos"] = {}
-                                session_data["logos"][var_id] = logo_url
-                                with open(session_file, "w", encoding="utf-8") as f:
-                                    json.dump(session_data, f, ensure_ascii=False, indent=2)
-                            except Exception as e:
-                                print(f"[WARN] Impossible de persister le logo dans la session: {e}")
-                    # --- FIN PERSISTENCE ---
-                    
-                    # Add the result
-                    results.append({
-                        "variation_id": var_id,
-                        "logo_url": logo_url,
-                        "logo_prompt": enhanced_prompt
-                    })
+                        image_data = f.read()
                     
+                    # Convertir en base64
+                    image_base64 = base64.b64encode(image_data).decode('utf-8')
+                    article_image_url = f"data:image/png;base64,{image_base64}"
+                    print(f"Image générée pour l'article: {len(article_image_url)} caractères")
                 finally:
-                    # Clean up the temporary file
                     if temp_file and os.path.exists(temp_file_path):
                         try:
                             os.unlink(temp_file_path)
                         except Exception as e:
                             print(f"Warning: Could not delete temporary file {temp_file_path}: {str(e)}")
-                    
             except Exception as e:
-                print(f"Erreur lors de la génération du logo: {str(e)}")
+                print(f"Erreur lors de la génération de l'image: {str(e)}")
                 traceback.print_exc()
-                # Use a placeholder logo in case of error
-                placeholder_url = f"https://via.placeholder.com/200x200.png?text=Logo+{var_id}"
-                results.append({
-                    "variation_id": var_id,
-                    "logo_url": placeholder_url,
-                    "logo_prompt": logo_prompt
-                })
-        
-        return {"logos": results}
-    except Exception as e:
-        print(f"Erreur lors de la génération des logos: {str(e)}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.post("/api/analyze-theme-color")
-async def analyze_theme_color(request: ThemeAnalysisRequest):
-    try:
-        theme = request.theme
-        
-        if not api_key:
-            # Fallback si pas de clé API
-            return {"colorScheme": get_automatic_color_scheme(theme)}
-        
-        try:
-            llm = ChatOpenAI(api_key=api_key, model_name=model, temperature=0.3)
-            
-            prompt = f"""
-            Analyse le thème suivant: "{theme}"
-            
-            Détermine la palette de couleurs la plus appropriée parmi les options suivantes:
-            - vert: pour les thèmes liés à la nature, l'environnement, la nourriture, la santé naturelle
-            - bleu: pour les thèmes liés au voyage, à la technologie professionnelle, à la santé médicale, à l'eau
-            - violet: pour les thèmes liés à la technologie créative, l'innovation, le luxe
-            - rouge: pour les thèmes liés à la mode, la beauté, la passion, l'urgence
-            - orange: pour les thèmes liés à la créativité, l'enthousiasme, la chaleur
-            - jaune: pour les thèmes liés à l'optimisme, la jeunesse, l'énergie
-            
-            Réponds uniquement avec le nom de la palette (vert, bleu, violet, rouge, orange ou jaune) sans aucun autre texte.
-            """
-            
-            response = llm.invoke([HumanMessage(content=prompt)])
             
-            # Extraire la réponse et la nettoyer
-            color_scheme = response.content.strip().lower()
+            # Ajouter l'article à la liste avec l'image
+            articles.append({
+                "title": title,
+                "content": content,
+                "sources": article_sources,
+                "category": category,
+                "image": article_image_url
+            })
             
-            # Vérifier si la réponse est valide
-            valid_schemes = ["vert", "bleu", "violet", "rouge", "orange", "jaune"]
-            if color_scheme not in valid_schemes:
-                # Si la réponse n'est pas valide, utiliser la méthode de secours
-                color_scheme = get_automatic_color_scheme(theme)
+            print(f"Article {j+1} ajouté avec image")
             
-            return {"colorScheme": color_scheme}
         except Exception as e:
-            print(f"Erreur lors de l'analyse du thème avec LLM: {str(e)}")
-            return {"colorScheme": get_automatic_color_scheme(theme)}
-    except Exception as e:
-        print(f"Erreur lors de l'analyse du thème: {str(e)}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
-
-# Fonction de secours pour déterminer la palette de couleurs
-def get_automatic_color_scheme(theme: str) -> str:
-    theme_lower = theme.lower()
+            print(f"Erreur lors de la génération de l'article {j+1}: {str(e)}")
+            traceback.print_exc()
+            
+            # Ajouter un article par défaut en cas d'erreur
+            articles.append({
+                "title": f"Article {j+1} pour {site_name}",
+                "content": f"Contenu par défaut pour l'article {j+1}. Une erreur s'est produite lors de la génération.",
+                "category": category
+            })
     
-    if any(keyword in theme_lower for keyword in ["nourriture", "food", "restaurant", "bio", "café", "cuisine"]):
-        return "vert"
-    elif any(keyword in theme_lower for keyword in ["voyage", "travel", "tourisme", "aventure", "destination"]):
-        return "bleu"
-    elif any(keyword in theme_lower for keyword in ["tech", "digital", "innovation", "startup", "ai", "ia"]):
-        return "violet"
-    elif any(keyword in theme_lower for keyword in ["santé", "health", "médical", "clinique", "hôpital"]):
-        return "bleu"
-    elif any(keyword in theme_lower for keyword in ["mode", "fashion", "beauté", "beauty", "luxe", "style"]):
-        return "rouge"
-    elif any(keyword in theme_lower for keyword in ["créatif", "creative", "art", "design", "studio"]):
-        return "orange"
-    elif any(keyword in theme_lower for keyword in ["enfant", "kid", "école", "school", "éducation", "formation"]):
-        return "jaune"
-    else:
-        return "default"
+    return articles
 
-def get_random_color_palette():
+async def _variation_palette(logo: Optional[str], fallback: Optional[dict] = None):
     """
-    Retourne une palette de couleurs aléatoire parmi les palettes prédéfinies.
+    Palette tirée du logo (k-means CIELAB, contrastes WCAG, cache par logo) ; à défaut,
+    `fallback` (palette du thème) ou une palette aléatoire. Retourne (palette, source).
     """
-    palettes = [
-  {
-    "primary": "#0077b6",
-    "secondary": "#E8F0FE",
-    "background": "#FFFFFF",
-    "text": "#202124"
-  },
-  {
-    "primary": "#b2967d",
-    "secondary": "#d5bdaf",
-    "background": "#F5F5F5",
-    "text": "#504b43"
-  },
-  {
-    "primary": "#e76f51",
-    "secondary": "#f4a261",
-    "background": "#FFFFFF",
-    "text": "#212121"
-  },
-  {
-    "primary": "#009688",
-    "secondary": "#B2DFDB",
-    "background": "#FAFAFA",
-    "text": "#263238"
-  },
-  {
-    "primary": "#3F51B5",
-    "secondary": "#C5CAE9",
-    "background": "#FDFDFD",
-    "text": "#212121"
-  },
-  {
-    "primary": "#00BCD4",
-    "secondary": "#B2EBF2",
-    "background": "#FFFFFF",
-    "text": "#023e8a"
-  },
-  {
-    "primary": "#E91E63",
-    "secondary": "#F8BBD0",
-    "background": "#FFFFFF",
-    "text": "#355070"
-  },
-  {
-    "primary": "#f28482",
-    "secondary": "#FFCDD2",
-    "background": "#FFFFFF",
-    "text": "#212121"
-  },
-  {
-    "primary": "#588157",
-    "secondary": "#C8E6C9",
-    "background": "#F8F8F8",
-    "text": "#344e41"
-  },
-  {
-    "primary": "#db7c26",
-    "secondary": "#FFF8E1",
-    "background": "#FAFAFA",
-    "text": "#212121"
-  },
-  {
-    "primary": "#5e548e",
-    "secondary": "#9f86c0",
-    "background": "#FFFFFF",
-    "text": "#1A1A1A"
-  },
-  {
-    "primary": "#17c3b2",
-    "secondary": "#CFD8DC",
-    "background": "#f5f3f4",
-    "text": "#227c9d"
-  },
-  {
-    "primary": "#8a817c",
-    "secondary": "#bcb8b1",
-    "background": "#f4f3ee",
-    "text": "#463f3a"
-  },
-  {
-    "primary": "#a6a2a2",
-    "secondary": "#cfd2cd",
-    "background": "#fbfbf2",
-    "text": "#847577"
-  },
-  {
-    "primary": "#006494",
-    "secondary": "#4cc9f0",
-    "background": "#d6e3f8",
-    "text": "#006daa"
-  },
-  {
-    "primary": "#304d6d",
-    "secondary": "#82a0bc",
-    "background": "#d6e3f8",
-    "text": "#545e75"
-  },
-  {
-    "primary": "#007ea7",
-    "secondary": "#B3E5FC",
-    "background": "#F9FAFB",
-    "text": "#01579B"
-  },
-  {
-    "primary": "#00ACC1",
-    "secondary": "#E0F7FA",
-    "background": "#FFFFFF",
-    "text": "#263238"
-  },
-  {
-    "primary": "#C2185B",
-    "secondary": "#F48FB1",
-    "background": "#FFFFFF",
-    "text": "#1C1C1C"
-  },
-  {
-    "primary": "#3da35d",
-    "secondary": "#A5D6A7",
-    "background": "#e8fccf",
-    "text": "#134611"
-  },
-  {
-    "primary": "#303F9F",
-    "secondary": "#C5CAE9",
-    "background": "#FFFFFF",
-    "text": "#1A1A1A"
-  },
-  {
-    "primary": "#5D4037",
-    "secondary": "#D7CCC8",
-    "background": "#FAFAFA",
-    "text": "#3E2723"
-  },
-  {
-    "primary": "#0097A7",
-    "secondary": "#B2EBF2",
-    "background": "#F5F5F5",
-    "text": "#004D40"
-  },
-  {
-    "primary": "#ad2e24",
-    "secondary": "#c75146",
-    "background": "#FFFFFF",
-    "text": "#3E2723"
-  },
-  {
-    "primary": "#7B1FA2",
-    "secondary": "#E1BEE7",
-    "background": "#FDFDFD",
-    "text": "#1A1A1A"
-  },
-  {
-    "primary": "#1E88E5",
-    "secondary": "#BBDEFB",
-    "background": "#FFFFFF",
-    "text": "#0D47A1"
-  },
-  {
-    "primary": "#43A047",
-    "secondary": "#C8E6C9",
-    "background": "#FAFAFA",
-    "text": "#1B5E20"
-  },
-  {
-    "primary": "#b5838d",
-    "secondary": "#F8BBD0",
-    "background": "#ffebe7",
-    "text": "#6d6875"
-  },
-  {
-    "primary": "#6D4C41",
-    "secondary": "#D7CCC8",
-    "background": "#FFF",
-    "text": "#3E2723"
-  },
-  {
-    "primary": "#607D8B",
-    "secondary": "#B0BEC5",
-    "background": "#FFFFFF",
-    "text": "#263238"
-  }
-    ]
-    return random.choice(palettes)
+    if logo:
+        try:
+            from color_palette import palette_from_logo_data_url
+            color_palette = await run_in_threadpool(palette_from_logo_data_url, logo)
+            if color_palette:
+                return color_palette, "logo"
+        except Exception as e:
+            print(f"[Couleurs] Extraction de la palette du logo impossible: {str(e)}")
+    if fallback:
+        return dict(fallback), "thème"
+    return get_random_color_palette(), "aléatoire"
+
+def _request_theme_palette(request: dict) -> Optional[dict]:
+    """
+    Palette du thème envoyée avec la requête, utilisée quand le logo ne donne pas de palette :
+    "palette" (réponse de /api/analyze-theme-color), sinon "colorData" de la session
+    ({"type": "preset", "value": "vert"} ou {"type": "hex", "value": "#43A047"}).
+    """
+    palette = request.get("palette")
+    if isinstance(palette, dict) and all(isinstance(palette.get(role), str) for role in ("primary", "secondary", "background", "text")):
+        return palette
+    color_data = request.get("colorData")
+    if not isinstance(color_data, dict) or not isinstance(color_data.get("value"), str):
+        return None
+    try:
+        if color_data.get("type") == "hex":
+            return dict(get_palette_index().nearest(color_data["value"])["palette"])
+        return palette_for_scheme(color_data["value"])
+    except Exception as e:
+        print(f"[Couleurs] Palette du thème invalide ({color_data}): {str(e)}")
+        return None
 
 @app.post("/api/generate-all-content")
 async def generate_all_content(request: dict = Body(...)):
@@ -1109,22 +1294,22 @@ async def generate_all_content(request: dict = Body(...)):
         
         print(f"Nombre de variations à traiter: {len(variations)}")
         print(f"Régénération forcée: {force_regenerate}")
+        theme_palette = _request_theme_palette(request)
         
         for i, variation in enumerate(variations):
             print(f"Traitement de la variation {i+1}/{len(variations)}: {variation.get('title', 'Sans titre')}")
             
-            # Assigner une palette de couleurs aléatoire à chaque variation
-            color_palette = get_random_color_palette()
+            # Récupérer le logo s'il existe
+            logo = variation.get("logo", None)
+            
+            color_palette, palette_source = await _variation_palette(logo, theme_palette)
             variation["color_palette"] = color_palette
-            print(f"[Couleurs] Palette assignée à {variation.get('title')}:" )
+            print(f"[Couleurs] Palette ({palette_source}) assignée à {variation.get('title')}:" )
             print(f"[Couleurs] - Primary: {color_palette['primary']}")
             print(f"[Couleurs] - Secondary: {color_palette['secondary']}")
             print(f"[Couleurs] - Text: {color_palette['text']}")
             print(f"[Couleurs] - Background: {color_palette['background']}")
             
-            # Récupérer le logo s'il existe
-            logo = variation.get("logo", None)
-            
             # Initialiser le contenu si nécessaire
             if "content" not in variation:
                 variation["content"] = {}
@@ -1134,176 +1319,7 @@ async def generate_all_content(request: dict = Body(...)):
             
             # Générer 5 articles si aucun n'existe déjà ou si force_regenerate est True
             if force_regenerate or len(variation["content"].get("articles", [])) == 0:
-                # Récupérer les informations de la variation
-                site_name = variation.get("title", "Site")
-                site_description = variation.get("description", "")
-                
-                categories_list = ["Business", "Education", "Productivity", "Events", "Blog", "jobs"]
-                # Générer 5 articles
-                for j in range(5):
-                    try:
-                        category = categories_list[j % len(categories_list)]
-                        print(f"Génération de l'article {j+1}/5 pour {site_name} (Catégorie: {category})")
-                        
-                        # Générer un titre d'article
-                        title_prompt = f"""
-                        Génère un titre d'article accrocheur pour un site web nommé '{site_name}'.
-                        Description du site: {site_description}
-                        Le titre doit être concis (moins de 10 mots) et attrayant.
-                        Catégorie de l'article : {category}
-                        """
-                        
-                        title = ""
-                        if api_key:
-                            llm = ChatOpenAI(api_key=api_key, model_name=model, temperature=0.7)
-                            response = llm.invoke([HumanMessage(content=title_prompt)])
-                            title = response.content.strip().replace('"', '')
-                        else:
-                            # Fallback pour les tests
-                            title = f"Article {j+1} pour {site_name}"
-                        
-                        print(f"Titre généré: {title}")
-                        
-                        # DÉBUT DU SCRAPING WEB POUR CET ARTICLE
-                        print(f"Démarrage du scraping web pour l'article: {title}")
-                        serp_api_key = "57a4b93a29c3c3f50ed324aa1ed7150a5989e4ec47db2b8f39019ee71a44b463"
-                        
-                        article_web_content = ""
-                        article_sources = []
-                        
-                        try:
-                            # Construire la requête de recherche
-                            query = f"{title} {site_name} {site_description} {category}"
-                            search_url = f"https://serpapi.com/search.json?q={query.replace(' ', '+')}&api_key={serp_api_key}&engine=google&num=5"
-                            
-                            print(f"Requête SERP API pour l'article: {search_url}")
-                            response = requests.get(search_url, timeout=30)
-                            
-                            print(f"Réponse SERP API reçue: status code {response.status_code}")
-                            
-                            if response.status_code == 200:
-                                data = response.json()
-                                
-                                # Extraire les résultats organiques
-                                organic_results = data.get("organic_results", [])
-                                print(f"Nombre de résultats organiques trouvés: {len(organic_results)}")
-                                
-                                if organic_results:
-                                    for k, result in enumerate(organic_results[:3]):
-                                        result_title = result.get("title", "")
-                                        result_snippet = result.get("snippet", "")
-                                        result_link = result.get("link", "")
-                                        
-                                        print(f"Source {k+1}: {result_title} - {result_link}")
-                                        
-                                        # Ajouter à notre contenu web
-                                        article_web_content += f"\n\nSource {k+1}: {result_title}\n{result_snippet}\n"
-                                        article_sources.append(f"{result_title} - {result_link}")
-                                else:
-                                    print("Aucun résultat organique trouvé")
-                            else:
-                                print(f"Erreur API SERP: {response.status_code} - {response.text}")
-                        except Exception as e:
-                            print(f"Erreur lors du scraping web: {str(e)}")
-                            traceback.print_exc()
-                            article_web_content = ""
-                        
-                        # Si aucun contenu n'a été trouvé, utiliser un message par défaut
-                        if not article_web_content:
-                            article_web_content = f"Aucune information spécifique trouvée sur '{title}'. Génération d'un article basé sur les connaissances générales."
-                            print("Utilisation du contenu par défaut")
-                        else:
-                            print(f"Contenu web récupéré avec succès: {len(article_web_content)} caractères")
-                        # FIN DU SCRAPING WEB
-                        
-                        # Générer le contenu de l'article avec le contenu web
-                        content_prompt = f"""
-                        Écris un article complet pour un site web nommé '{site_name}' avec le titre '{title}'.
-                        Description du site: {site_description}
-                        Catégorie de l'article : {category}
-                        Utilise les informations suivantes récupérées du web pour enrichir ton article:
-                        {article_web_content}
-                        L'article doit:
-                        - Être informatif et engageant
-                        - Contenir environ 500 mots
-                        - Être structuré avec une introduction, un développement et une conclusion
-                        - Être adapté au thème du site
-                        - Être pertinent pour la catégorie : {category}
-                        - Inclure des faits et informations pertinentes tirés des sources web
-                        Format: Markdown avec des sections et sous-sections.
-                        """
-                        
-                        content = ""
-                        
-                        if api_key:
-                            llm = ChatOpenAI(api_key=api_key, model_name=model, temperature=0.7)
-                            response = llm.invoke([HumanMessage(content=content_prompt)])
-                            content = response.content.strip()
-                            
-                            print(f"Article généré: {len(content)} caractères")
-                        else:
-                            # Fallback pour les tests
-                            content = f"Contenu par défaut pour l'article {j+1}."
-                        
-                        # GÉNÉRATION DE L'IMAGE AVEC CREW_FLUX
-                        article_image_url = None
-                        try:
-                            # Créer un prompt pour l'image basé sur le titre et la catégorie
-                            image_topic = f"{title} - {category} - {site_description}"
-                            print(f"Génération d'une image pour: {image_topic}")
-                            
-                            # Générer un meilleur prompt avec Gemini
-                            enhanced_prompt = get_image_prompt_from_gemini(image_topic)
-                            print(f"Prompt amélioré par Gemini: {enhanced_prompt}")
-                            
-                            # Générer l'image avec Fal.ai
-                            temp_file = None
-                            try:
-                                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-                                temp_file_path = temp_file.name
-                                temp_file.close()  # Close the file handle before generating the image
-                                
-                                generate_image_with_fal(enhanced_prompt, temp_file_path)
-                                
-                                # Lire l'image générée
-                                with open(temp_file_path, "rb") as f:
-                                    image_data = f.read()
-                                
-                                # Convertir en base64
-                                image_base64 = base64.b64encode(image_data).decode('utf-8')
-                                article_image_url = f"data:image/png;base64,{image_base64}"
-                                print(f"Image générée pour l'article: {len(article_image_url)} caractères")
-                            finally:
-                                if temp_file and os.path.exists(temp_file_path):
-                                    try:
-                                        os.unlink(temp_file_path)
-                                    except Exception as e:
-                                        print(f"Warning: Could not delete temporary file {temp_file_path}: {str(e)}")
-                        except Exception as e:
-                            print(f"Erreur lors de la génération de l'image: {str(e)}")
-                            traceback.print_exc()
-                        
-                        # Ajouter l'article à la liste avec l'image
-                        variation["content"]["articles"].append({
-                            "title": title,
-                            "content": content,
-                            "sources": article_sources,
-                            "category": category,
-                            "image": article_image_url
-                        })
-                        
-                        print(f"Article {j+1} ajouté avec image")
-                        
-                    except Exception as e:
-                        print(f"Erreur lors de la génération de l'article {j+1}: {str(e)}")
-                        traceback.print_exc()
-                        
-                        # Ajouter un article par défaut en cas d'erreur
-                        variation["content"]["articles"].append({
-                            "title": f"Article {j+1} pour {site_name}",
-                            "content": f"Contenu par défaut pour l'article {j+1}. Une erreur s'est produite lors de la génération.",
-                            "category": category
-                        })
+                variation["content"]["articles"].extend(await run_in_threadpool(_generate_variation_articles, variation))
             
             # S'assurer que le logo est conservé
             if logo:
@@ -1409,12 +1425,44 @@ def generate_simple_wxr(variation_data):
     reparsed = minidom.parseString(rough_string)
     return reparsed.toprettyxml(indent="  ")
 
-async def send_logo_to_wordpress(logo_url: str, logo_type: str = "main"):
+def _site_names(value) -> Optional[List[Optional[str]]]:
+    """
+    Noms de sites envoyés par le client : un nom seul ou une liste de noms (None = site par défaut
+    ou pas de publication, selon l'endpoint). Retourne None si la valeur n'est pas valide.
+    """
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and all(name is None or isinstance(name, str) for name in value):
+        return value
+    return None
+
+def _wordpress_site(site: Optional[str]):
+    """
+    Retourne (site WordPress, None) ou (None, dict d'erreur) si le site est inconnu ou sans identifiants.
+    """
+    try:
+        wordpress = get_site(site)
+    except UnknownSiteError:
+        print(f"[WordPress] ❌ ERREUR: Site WordPress inconnu: {site}")
+        return None, {"error": f"Site WordPress inconnu: {site}"}
+    except ValueError as e:
+        print(f"[WordPress] ❌ ERREUR: {str(e)}")
+        return None, {"error": str(e)}
+    if not wordpress.has_credentials:
+        print("[WordPress] ❌ ERREUR: Identifiants WordPress non configurés")
+        return None, {"error": "Identifiants WordPress manquants"}
+    return wordpress, None
+
+async def send_logo_to_wordpress(logo_url: str, logo_type: str = "main", site: Optional[str] = None):
     """
     Envoie le logo à WordPress via l'API Elementor.
-    logo_type peut être "main" ou "second"
+    logo_type peut être "main" ou "second" ; site est le nom du site cible (site par défaut si None).
     """
     try:
+        wordpress, error = _wordpress_site(site)
+        if error:
+            return error
+        
         if not logo_url or not isinstance(logo_url, str) or not logo_url.strip():
             print(f"[WordPress] URL de logo invalide pour {logo_type}")
             return {"error": "URL de logo invalide"}
@@ -1437,6 +1485,7 @@ async def send_logo_to_wordpress(logo_url: str, logo_type: str = "main"):
                 
                 # Redimensionner l'image
                 try:
+                    from PIL import Image
                     with Image.open(temp_file_path) as img:
                         # Définir les dimensions maximales selon le type de logo
                         if logo_type == "main":
@@ -1460,26 +1509,10 @@ async def send_logo_to_wordpress(logo_url: str, logo_type: str = "main"):
                     print(f"[WordPress] Erreur lors du redimensionnement: {str(e)}")
                     # Continuer avec l'image originale si le redimensionnement échoue
                 
-                # Vérifier les identifiants Basic Auth
-                wordpress_username = os.getenv("WORDPRESS_USERNAME")
-                wordpress_password = os.getenv("WORDPRESS_PASSWORD")
-                
-                if not wordpress_username or not wordpress_password:
-                    print("[WordPress] Erreur: Identifiants WordPress non configurés")
-                    return {"error": "Identifiants WordPress manquants"}
-                
-                # Encoder les identifiants pour Basic Auth
-                credentials = f"{wordpress_username}:{wordpress_password}"
-                token = base64.b64encode(credentials.encode()).decode()
-                headers = {
-                    "Authorization": f"Basic {token}"
-                }
-                
                 # Télécharger l'image sur WordPress
-                upload_url = "https://aic-builder.cloud-glory-creation.com/wp-json/wp/v2/media"
                 with open(temp_file_path, "rb") as f:
-                    files = {"file": f}
-                    response = requests.post(upload_url, headers=headers, files=files)
+                    logo_png = f.read()
+                response = await run_in_threadpool(wordpress.upload_media, os.path.basename(temp_file_path), logo_png, "image/png")
                 
                 # Nettoyer le fichier temporaire
                 os.unlink(temp_file_path)
@@ -1500,46 +1533,25 @@ async def send_logo_to_wordpress(logo_url: str, logo_type: str = "main"):
                 return {"error": f"Erreur lors du traitement de l'image: {str(e)}"}
         
         # Vérifier si l'URL est une URL WordPress valide
-        if not logo_url.startswith("https://aic-builder.cloud-glory-creation.com/wp-content/uploads/"):
+        if not wordpress.owns_media_url(logo_url):
             print(f"[WordPress] L'URL du logo n'est pas une URL WordPress valide: {logo_url}")
             return {"error": "URL de logo non valide pour WordPress"}
         
-        # Vérifier les identifiants Basic Auth
-        wordpress_username = os.getenv("WORDPRESS_USERNAME")
-        wordpress_password = os.getenv("WORDPRESS_PASSWORD")
-        
-        if not wordpress_username or not wordpress_password:
-            print("[WordPress] Erreur: Identifiants WordPress non configurés")
-            return {"error": "Identifiants WordPress manquants"}
-        
-        # Encoder les identifiants pour Basic Auth
-        credentials = f"{wordpress_username}:{wordpress_password}"
-        token = base64.b64encode(credentials.encode()).decode()
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {token}"
-        }
-        
         # Déterminer l'endpoint en fonction du type de logo
-        endpoint = "https://aic-builder.cloud-glory-creation.com/wp-json/elementor-remote/v1/set-main-logo"
+        endpoint = "elementor-remote/v1/set-main-logo"
         if logo_type == "second":
-            endpoint = "https://aic-builder.cloud-glory-creation.com/wp-json/elementor-remote/v1/set-second-logo"
+            endpoint = "elementor-remote/v1/set-second-logo"
         
         # Préparer le payload
         payload = {
             "logo_url": logo_url
         }
         
-        print(f"[WordPress] Envoi du logo à l'endpoint: {endpoint}")
+        print(f"[WordPress] Envoi du logo à l'endpoint: {wordpress.endpoint(endpoint)}")
         print(f"[WordPress] Payload: {json.dumps(payload, indent=2)}")
         
         try:
-            response = requests.post(
-                endpoint,
-                json=payload,
-                headers=headers,
-                timeout=30
-            )
+            response = await run_in_threadpool(wordpress.post, endpoint, json=payload)
             
             print(f"[WordPress] Réponse reçue - Status: {response.status_code}")
             print(f"[WordPress] Corps de la réponse: {response.text}")
@@ -1562,474 +1574,84 @@ async def send_logo_to_wordpress(logo_url: str, logo_type: str = "main"):
         traceback.print_exc()
         return {"error": str(e)}
 
-def upload_kit_json_to_wordpress(kit_data):
+def upload_kit_json_to_wordpress(wordpress: WordPressSite, kit: bytes, filename: str):
     """
     Uploads the kit JSON to WordPress media and returns the public URL.
     """
-    wordpress_username = os.getenv("WORDPRESS_USERNAME")
-    wordpress_password = os.getenv("WORDPRESS_PASSWORD")
-    if not wordpress_username or not wordpress_password:
-        print("[WordPress] ❌ ERREUR: Identifiants WordPress non configurés")
+    response = wordpress.upload_media(filename, kit, "application/json")
+    if response.status_code not in [201, 200]:
+        print(f"[WordPress] Erreur lors de l'upload du kit JSON: {response.status_code}")
+        print(f"[WordPress] Détails: {response.text}")
         return None
-    credentials = f"{wordpress_username}:{wordpress_password}"
-    token = base64.b64encode(credentials.encode()).decode()
-    headers = {
-        "Authorization": f"Basic {token}",
-        "Content-Disposition": "attachment; filename=global-kit.json",
-        "Content-Type": "application/json"
-    }
-    # Save kit_data to a temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".json", mode="w", encoding="utf-8") as temp_file:
-        json.dump(kit_data, temp_file, ensure_ascii=False, indent=2)
-        temp_file_path = temp_file.name
-    try:
-        with open(temp_file_path, "rb") as f:
-            files = {"file": ("global-kit.json", f, "application/json")}
-            upload_url = "https://aic-builder.cloud-glory-creation.com/wp-json/wp/v2/media"
-            response = requests.post(upload_url, headers={"Authorization": f"Basic {token}"}, files=files)
-        if response.status_code not in [201, 200]:
-            print(f"[WordPress] Erreur lors de l'upload du kit JSON: {response.status_code}")
-            print(f"[WordPress] Détails: {response.text}")
-            return None
-        image_data = response.json()
-        kit_url = image_data.get("source_url")
-        print(f"[WordPress] Kit JSON uploaded: {kit_url}")
-        return kit_url
-    finally:
-        try:
-            os.unlink(temp_file_path)
-        except Exception:
-            pass
+    image_data = response.json()
+    kit_url = image_data.get("source_url")
+    print(f"[WordPress] Kit JSON uploaded: {kit_url}")
+    return kit_url
 
-async def send_color_palette_to_wordpress(color_palette: dict):
+async def send_color_palette_to_wordpress(color_palette: dict, force: bool = False, site: Optional[str] = None):
     """
     Envoie la palette de couleurs au kit Elementor de WordPress.
+    Le kit est construit depuis le modèle templates/elementor_kit.json ; s'il est identique
+    (même hash) au dernier kit importé sur le site, ni l'upload ni l'import ne sont refaits,
+    et un kit déjà présent dans la médiathèque est réimporté sans nouvel upload.
     """
     try:
         print("\n[WordPress] ===== DÉBUT DE L'ENVOI DE LA PALETTE DE COULEURS =====")
         print(f"[WordPress] Palette reçue: {json.dumps(color_palette, indent=2)}")
         
-        # Vérifier les identifiants Basic Auth
-        wordpress_username = os.getenv("WORDPRESS_USERNAME")
-        wordpress_password = os.getenv("WORDPRESS_PASSWORD")
-        
-        if not wordpress_username or not wordpress_password:
-            print("[WordPress] ❌ ERREUR: Identifiants WordPress non configurés")
-            return {"error": "Identifiants WordPress manquants"}
+        # Vérifier le site cible et ses identifiants Basic Auth
+        wordpress, error = _wordpress_site(site)
+        if error:
+            return error
         
-        print("[WordPress] ✅ Identifiants WordPress trouvés")
+        print(f"[WordPress] ✅ Identifiants WordPress trouvés ({wordpress.name})")
         
         # Préparer le kit avec la nouvelle palette de couleurs
-        kit_data = {
-            "version": "0.4",
-            "title": "Global Kit Styles",
-            "type": "global-styles",
-            "metadata": {
-                "template_type": "global-styles",
-                "include_in_zip": "1",
-                "wp_page_template": "default"
-            },
-            "content": [],
-            "page_settings": {
-                "system_colors": [
-                    {
-                        "_id": "primary",
-                        "title": "Primary",
-                        "color": color_palette["primary"]
-                    },
-                    {
-                        "_id": "secondary",
-                        "title": "Secondary",
-                        "color": color_palette["secondary"]
-                    },
-                    {
-                        "_id": "text",
-                        "title": "Text",
-                        "color": color_palette["text"]
-                    },
-                    {
-                        "_id": "accent",
-                        "title": "Accent",
-                        "color": color_palette["secondary"]
-                    }
-                ],
-                "custom_colors": [
-                    {
-                        "_id": "e777cd9",
-                        "title": "White",
-                        "color": color_palette["background"]
-                    },
-                    {
-                        "_id": "e632858",
-                        "title": "transparent",
-                        "color": "#FFFFFF00"
-                    },
-                    {
-                        "_id": "e9c5ff0",
-                        "title": "grey",
-                        "color": "#F3F3F3"
-                    },
-                    {
-                        "_id": "9947692",
-                        "title": "white trans",
-                        "color": "#FFFFFFD1"
-                    },
-                    {
-                        "_id": "7e293d1",
-                        "title": "Black Trans",
-                        "color": "#22283170"
-                    }
-                ],
-                "system_typography": [
-                    {
-                        "_id": "primary",
-                        "title": "Large text",
-                        "typography_typography": "custom",
-                        "typography_font_family": "Sans-serif",
-                        "typography_font_weight": "500",
-                        "typography_font_size": {
-                            "unit": "px",
-                            "size": 150,
-                            "sizes": []
-                        },
-                        "typography_line_height": {
-                            "unit": "em",
-                            "size": 1,
-                            "sizes": []
-                        },
-                        "typography_letter_spacing": {
-                            "unit": "em",
-                            "size": -0.05,
-                            "sizes": []
-                        },
-                        "typography_font_size_mobile": {
-                            "unit": "px",
-                            "size": 45,
-                            "sizes": []
-                        },
-                        "typography_font_size_tablet": {
-                            "unit": "px",
-                            "size": 80,
-                            "sizes": []
-                        }
-                    },
-                    {
-                        "_id": "secondary",
-                        "title": "Secondary",
-                        "typography_typography": "custom",
-                        "typography_font_family": "Sans-serif",
-                        "typography_font_weight": "400",
-                        "typography_font_size": {
-                            "unit": "px",
-                            "size": 28,
-                            "sizes": []
-                        },
-                        "typography_line_height": {
-                            "unit": "em",
-                            "size": 1.5,
-                            "sizes": []
-                        },
-                        "typography_font_size_tablet": {
-                            "unit": "px",
-                            "size": 21,
-                            "sizes": []
-                        },
-                        "typography_font_size_mobile": {
-                            "unit": "px",
-                            "size": 19,
-                            "sizes": []
-                        }
-                    },
-                    {
-                        "_id": "text",
-                        "title": "Text",
-                        "typography_typography": "custom",
-                        "typography_font_family": "Sans-serif",
-                        "typography_font_weight": "400",
-                        "typography_font_size": {
-                            "unit": "px",
-                            "size": 18,
-                            "sizes": []
-                        },
-                        "typography_line_height": {
-                            "unit": "em",
-                            "size": 1.65,
-                            "sizes": []
-                        },
-                        "typography_letter_spacing": {
-                            "unit": "em",
-                            "size": 0.01,
-                            "sizes": []
-                        }
-                    },
-                    {
-                        "_id": "accent",
-                        "title": "Accent",
-                        "typography_typography": "custom",
-                        "typography_font_family": "Sans-serif",
-                        "typography_font_weight": "400",
-                        "typography_font_size": {
-                            "unit": "px",
-                            "size": 16,
-                            "sizes": []
-                        },
-                        "typography_line_height": {
-                            "unit": "em",
-                            "size": 1.5,
-                            "sizes": []
-                        },
-                        "typography_letter_spacing": {
-                            "unit": "px",
-                            "size": 0.15,
-                            "sizes": []
-                        },
-                        "typography_text_transform": "uppercase"
-                    }
-                ],
-                "default_generic_fonts": "Sans-serif",
-                "body_color": color_palette["text"],
-                "link_normal_color": color_palette["primary"],
-                "h1_color": color_palette["text"],
-                "page_title_selector": "h1.entry-title",
-                "hello_footer_copyright_text": "All rights reserved",
-                "activeItemIndex": 1,
-                "__globals__": {
-                    "body_color": "globals/colors?id=text",
-                    "body_typography_typography": "globals/typography?id=text",
-                    "link_normal_color": "globals/colors?id=primary",
-                    "link_hover_color": "globals/colors?id=text",
-                    "h1_color": "globals/colors?id=text",
-                    "h1_typography_typography": "globals/typography?id=8352cd5",
-                    "h3_color": "globals/colors?id=text",
-                    "h3_typography_typography": "globals/typography?id=d4f69a8",
-                    "h2_color": "globals/colors?id=text",
-                    "h4_color": "globals/colors?id=text",
-                    "h5_color": "globals/colors?id=text",
-                    "h6_color": "globals/colors?id=text",
-                    "button_typography_typography": "globals/typography?id=87350ce",
-                    "button_text_color": "globals/colors?id=e777cd9",
-                    "button_hover_background_color": "globals/colors?id=e777cd9",
-                    "button_background_color": "globals/colors?id=text",
-                    "button_hover_text_color": "globals/colors?id=primary",
-                    "form_label_typography_typography": "globals/typography?id=accent",
-                    "form_label_color": "globals/colors?id=text",
-                    "form_field_typography_typography": "globals/typography?id=text",
-                    "form_field_text_color": "globals/colors?id=text",
-                    "form_field_background_color": "globals/colors?id=e777cd9",
-                    "button_border_color": "globals/colors?id=text",
-                    "h2_typography_typography": "globals/typography?id=4353ebc",
-                    "h4_typography_typography": "globals/typography?id=326df42",
-                    "h5_typography_typography": "globals/typography?id=49ea2e1",
-                    "h6_typography_typography": "globals/typography?id=6524214",
-                    "form_field_border_color": "globals/colors?id=d59e8a8",
-                    "body_background_color": "globals/colors?id=e777cd9",
-                    "button_hover_border_color": "globals/colors?id=text"
-                },
-                "viewport_md": 768,
-                "viewport_lg": 1025,
-                "h2_color": color_palette["text"],
-                "h3_color": color_palette["text"],
-                "h4_color": color_palette["text"],
-                "h5_color": color_palette["text"],
-                "h6_color": color_palette["text"],
-                "button_padding": {
-                    "unit": "px",
-                    "top": "20",
-                    "right": "50",
-                    "bottom": "20",
-                    "left": "50",
-                    "isLinked": False
-                },
-                "paragraph_spacing": {
-                    "unit": "px",
-                    "size": 18,
-                    "sizes": []
-                },
-                "container_width": {
-                    "unit": "%",
-                    "size": 98,
-                    "sizes": []
-                },
-                "button_border_width": {
-                    "unit": "px",
-                    "top": "1",
-                    "right": "1",
-                    "bottom": "1",
-                    "left": "1",
-                    "isLinked": True
-                },
-                "image_border_radius": {
-                    "unit": "px",
-                    "top": "0",
-                    "right": "0",
-                    "bottom": "0",
-                    "left": "0",
-                    "isLinked": True
-                },
-                "image_opacity": {
-                    "unit": "px",
-                    "size": 1,
-                    "sizes": []
-                },
-                "image_hover_border_radius": {
-                    "unit": "px",
-                    "top": "0",
-                    "right": "0",
-                    "bottom": "0",
-                    "left": "0",
-                    "isLinked": True
-                },
-                "image_hover_opacity": {
-                    "unit": "px",
-                    "size": 1,
-                    "sizes": []
-                },
-                "image_hover_css_filters_saturate": {
-                    "unit": "px",
-                    "size": 139,
-                    "sizes": []
-                },
-                "image_hover_css_filters_hue": {
-                    "unit": "px",
-                    "size": 112,
-                    "sizes": []
-                },
-                "form_field_border_border": "solid",
-                "form_field_border_width": {
-                    "unit": "px",
-                    "top": "1",
-                    "right": "1",
-                    "bottom": "1",
-                    "left": "1",
-                    "isLinked": True
-                },
-                "form_field_border_radius": {
-                    "unit": "px",
-                    "top": "0",
-                    "right": "0",
-                    "bottom": "0",
-                    "left": "0",
-                    "isLinked": True
-                },
-                "button_text_color": color_palette["background"],
-                "button_background_color": color_palette["primary"],
-                "button_hover_text_color": color_palette["primary"],
-                "button_hover_background_color": color_palette["background"],
-                "form_label_color": color_palette["text"],
-                "form_field_text_color": color_palette["text"],
-                "form_field_background_color": color_palette["background"],
-                "image_box_shadow_box_shadow": {
-                    "horizontal": 0,
-                    "vertical": 20,
-                    "blur": 50,
-                    "spread": 0,
-                    "color": "rgba(98.00000000000001, 98.00000000000001, 98.00000000000001, 0.12)"
-                },
-                "link_hover_color": color_palette["text"],
-                "button_hover_border_width": {
-                    "unit": "px",
-                    "top": "1",
-                    "right": "1",
-                    "bottom": "1",
-                    "left": "1",
-                    "isLinked": True
-                },
-                "body_background_image": {
-                    "url": "",
-                    "id": "",
-                    "size": "",
-                    "alt": "",
-                    "source": "library"
-                },
-                "body_background_position": "center center",
-                "body_background_repeat": "repeat-y",
-                "body_background_size": "contain",
-                "active_breakpoints": [
-                    "viewport_mobile",
-                    "viewport_tablet",
-                    "viewport_widescreen"
-                ],
-                "viewport_widescreen": 1600,
-                "button_hover_box_shadow_box_shadow": {
-                    "horizontal": 0,
-                    "vertical": 20,
-                    "blur": 50,
-                    "spread": 0,
-                    "color": "rgba(98.22330163043478, 98.24020576116492, 98.24999999999999, 0.31)"
-                },
-                "body_background_background": "classic",
-                "button_border_width_tablet": {
-                    "unit": "px",
-                    "top": "1",
-                    "right": "1",
-                    "bottom": "1",
-                    "left": "1",
-                    "isLinked": True
-                },
-                "button_hover_border_width_tablet": {
-                    "unit": "px",
-                    "top": "1",
-                    "right": "1",
-                    "bottom": "1",
-                    "left": "1",
-                    "isLinked": True
-                },
-                "link_hover_typography_text_decoration": "underline",
-                "button_hover_background_background": "",
-                "button_border_radius": {
-                    "unit": "px",
-                    "top": "0",
-                    "right": "0",
-                    "bottom": "0",
-                    "left": "0",
-                    "isLinked": True
-                },
-                "button_padding_tablet": {
-                    "unit": "px",
-                    "top": "15",
-                    "right": "30",
-                    "bottom": "15",
-                    "left": "30",
-                    "isLinked": False
-                }
-            }
-        }
+        kit, kit_hash = build_kit(color_palette)
         
-        print("[WordPress] Kit préparé avec les couleurs suivantes:")
+        print(f"[WordPress] Kit préparé ({kit_hash[:16]}) avec les couleurs suivantes:")
         print(f"[WordPress] - Primary: {color_palette['primary']}")
         print(f"[WordPress] - Secondary: {color_palette['secondary']}")
         print(f"[WordPress] - Text: {color_palette['text']}")
         print(f"[WordPress] - Background: {color_palette['background']}")
         
-        # 1. Upload the kit JSON to WordPress media
-        kit_url = upload_kit_json_to_wordpress(kit_data)
-        if not kit_url:
-            print("[WordPress] ❌ Impossible d'uploader le kit JSON")
-            return {"error": "Impossible d'uploader le kit JSON"}
-        print(f"[WordPress] ✅ Kit JSON uploaded: {kit_url}")
+        if not force and await run_in_threadpool(kit_registry.active, wordpress.url) == kit_hash:
+            print("[WordPress] ✅ Kit déjà importé sur le site, envoi ignoré")
+            print("[WordPress] ===== FIN DE L'ENVOI DE LA PALETTE DE COULEURS =====\n")
+            return {"success": True, "skipped": True, "message": "Palette de couleurs déjà à jour"}
+        
+        # 1. Upload the kit JSON to WordPress media (unless this exact kit is already there)
+        kit_url = None if force else await run_in_threadpool(kit_registry.uploaded_url, wordpress.url, kit_hash)
+        if kit_url:
+            print(f"[WordPress] ✅ Kit JSON déjà présent dans la médiathèque: {kit_url}")
+        else:
+            kit_url = await run_in_threadpool(upload_kit_json_to_wordpress, wordpress, kit, kit_filename(kit_hash))
+            if not kit_url:
+                print("[WordPress] ❌ Impossible d'uploader le kit JSON")
+                return {"error": "Impossible d'uploader le kit JSON"}
+            await run_in_threadpool(kit_registry.record_upload, wordpress.url, kit_hash, kit_url)
+            print(f"[WordPress] ✅ Kit JSON uploaded: {kit_url}")
         
         # 2. Send the kit_url as form-data to Elementor endpoint
-        endpoint = "https://aic-builder.cloud-glory-creation.com/wp-json/elementor-remote/v1/import-kit/"
-        print(f"\n[WordPress] Envoi du kit_url à l'endpoint: {endpoint}")
+        endpoint = "elementor-remote/v1/import-kit/"
+        print(f"\n[WordPress] Envoi du kit_url à l'endpoint: {wordpress.endpoint(endpoint)}")
         print("[WordPress] Envoi de la requête form-data...")
         
         data = {"kit_url": kit_url}
-        response = requests.post(
-            endpoint,
-            data=data,
-            headers={"Authorization": f"Basic {base64.b64encode(f'{wordpress_username}:{wordpress_password}'.encode()).decode()}"},
-            timeout=30
-        )
+        response = await run_in_threadpool(wordpress.post, endpoint, data=data)
         print(f"\n[WordPress] Réponse reçue:")
         print(f"[WordPress] - Status Code: {response.status_code}")
         print(f"[WordPress] - Headers: {dict(response.headers)}")
         print(f"[WordPress] - Corps de la réponse: {response.text[:500]}...")
         
         if response.status_code == 200:
+            await run_in_threadpool(kit_registry.record_import, wordpress.url, kit_hash)
             print("\n[WordPress] ✅ Palette de couleurs envoyée avec succès")
             print("[WordPress] ===== FIN DE L'ENVOI DE LA PALETTE DE COULEURS =====\n")
             return {"success": True, "message": "Palette de couleurs envoyée avec succès"}
         else:
+            # Le fichier a pu être supprimé de la médiathèque : le prochain envoi le téléversera à nouveau
+            await run_in_threadpool(kit_registry.forget, wordpress.url, kit_hash)
             print(f"\n[WordPress] ❌ Erreur lors de l'envoi de la palette: {response.status_code}")
             print(f"[WordPress] Détails de l'erreur: {response.text}")
             print("[WordPress] ===== FIN DE L'ENVOI DE LA PALETTE DE COULEURS =====\n")
@@ -2041,12 +1663,18 @@ async def send_color_palette_to_wordpress(color_palette: dict):
         print("[WordPress] ===== FIN DE L'ENVOI DE LA PALETTE DE COULEURS =====\n")
         return {"error": str(e)}
 
-@app.post("/api/publish-to-wordpress")
-async def publish_to_wordpress(request: dict = Body(...)):
+async def _publish_variation(variation_data: dict, session_id: Optional[str] = None, site: Optional[str] = None, on_stage=None):
+    """
+    Publie une variation (palette, logos, articles) sur un site WordPress.
+    site est le nom du site cible (site par défaut si None) ; on_stage(nom), si fourni,
+    est appelé au début de chaque étape : "palette", "logo", "articles", "import".
+    """
+    def stage(name: str):
+        if on_stage is not None:
+            on_stage(name)
+    
     try:
         print(f"\n[WordPress] ===== DÉBUT DE LA PUBLICATION =====")
-        variation_data = request.get("variation_data", {})
-        session_id = request.get("session_id")
         
         if not variation_data:
             print("[WordPress] ❌ Erreur: Données de variation non fournies")
@@ -2056,6 +1684,7 @@ async def publish_to_wordpress(request: dict = Body(...)):
         print(f"[WordPress] Clés disponibles dans variation_data: {list(variation_data.keys())}")
         
         # Récupérer la palette de couleurs
+        stage("palette")
         color_palette = variation_data.get("color_palette")
         print("\n[WordPress] === PALETTE DE COULEURS ===")
         if color_palette:
@@ -2066,7 +1695,7 @@ async def publish_to_wordpress(request: dict = Body(...)):
             print(f"[WordPress] - Background: {color_palette.get('background', 'Non définie')}")
             
             print("\n[WordPress] Envoi de la palette de couleurs...")
-            palette_result = await send_color_palette_to_wordpress(color_palette)
+            palette_result = await send_color_palette_to_wordpress(color_palette, site=site)
             print(f"[WordPress] Résultat de l'envoi de la palette: {palette_result}")
         else:
             print("[WordPress] ❌ Aucune palette de couleurs trouvée dans les données")
@@ -2078,7 +1707,7 @@ async def publish_to_wordpress(request: dict = Body(...)):
             print(f"[WordPress] - Secondary: {default_palette['secondary']}")
             print(f"[WordPress] - Text: {default_palette['text']}")
             print(f"[WordPress] - Background: {default_palette['background']}")
-            palette_result = await send_color_palette_to_wordpress(default_palette)
+            palette_result = await send_color_palette_to_wordpress(default_palette, site=site)
             print(f"[WordPress] Résultat de l'envoi de la palette par défaut: {palette_result}")
         
         print("\n[WordPress] === FIN DE LA SECTION PALETTE DE COULEURS ===\n")
@@ -2087,15 +1716,13 @@ async def publish_to_wordpress(request: dict = Body(...)):
         logo_url = None
         if session_id:
             try:
-                session_file = f"./sessions/session_{session_id}.json"
-                if os.path.exists(session_file):
-                    with open(session_file, "r", encoding="utf-8") as f:
-                        session_data = json.load(f)
-                        if "logos" in session_data and isinstance(session_data["logos"], dict):
-                            variation_id = variation_data.get("id")
-                            if variation_id and variation_id in session_data["logos"]:
-                                logo_url = session_data["logos"][variation_id]
-                                print(f"[WordPress] Logo trouvé dans la session: {logo_url[:100]}...")
+                # Seul le logo de la variation est lu (projection sous le verrou du cache de sessions)
+                variation_id = variation_data.get("id")
+                if variation_id:
+                    logo_fields = await session_cache.get_fields(session_id, [f"logos.{variation_id}"]) or {}
+                    logo_url = logo_fields.get("logos", {}).get(variation_id)
+                    if logo_url:
+                        print(f"[WordPress] Logo trouvé dans la session: {logo_url[:100]}...")
             except Exception as e:
                 print(f"[WordPress] Erreur lors de la récupération du logo depuis la session: {str(e)}")
         
@@ -2104,28 +1731,18 @@ async def publish_to_wordpress(request: dict = Body(...)):
             logo_url = variation_data.get("logo")
             print(f"[WordPress] Logo depuis variation_data: {logo_url}")
         
-        # Vérifier les identifiants Basic Auth
-        wordpress_username = os.getenv("WORDPRESS_USERNAME")
-        wordpress_password = os.getenv("WORDPRESS_PASSWORD")
-        
-        if not wordpress_username or not wordpress_password:
-            print("[WordPress] Erreur: Identifiants WordPress non configurés")
-            return {"error": "Identifiants WordPress manquants"}
-        
-        # Encoder les identifiants pour Basic Auth
-        credentials = f"{wordpress_username}:{wordpress_password}"
-        token = base64.b64encode(credentials.encode()).decode()
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {token}"
-        }
+        # Vérifier le site cible et ses identifiants Basic Auth
+        wordpress, error = _wordpress_site(site)
+        if error:
+            return error
         
         print(f"[WordPress] Préparation des articles pour la variation: {variation_data.get('title', 'Sans titre')}")
         
         # Vérifier et envoyer le logo principal
+        stage("logo")
         if logo_url and isinstance(logo_url, str) and logo_url.strip():
             print(f"[WordPress] Logo principal trouvé: {logo_url[:100]}...")
-            logo_result = await send_logo_to_wordpress(logo_url, "main")
+            logo_result = await send_logo_to_wordpress(logo_url, "main", site=site)
             print(f"[WordPress] Résultat de l'envoi du logo principal: {logo_result}")
         else:
             print(f"[WordPress] Aucun logo principal valide trouvé dans les données. Valeur reçue: {logo_url}")
@@ -2144,7 +1761,7 @@ async def publish_to_wordpress(request: dict = Body(...)):
         else:
             print(f"[WordPress] Logo secondaire trouvé: {second_logo_url}")
         if second_logo_url and isinstance(second_logo_url, str) and second_logo_url.strip():
-            second_logo_result = await send_logo_to_wordpress(second_logo_url, "second")
+            second_logo_result = await send_logo_to_wordpress(second_logo_url, "second", site=site)
             print(f"[WordPress] Résultat de l'envoi du logo secondaire: {second_logo_result}")
         else:
             print(f"[WordPress] Aucun logo secondaire valide trouvé dans les données. Valeur reçue: {second_logo_url}")
@@ -2156,6 +1773,9 @@ async def publish_to_wordpress(request: dict = Body(...)):
                 print("[WordPress] Le logo secondaire est une chaîne vide")
 
         # Préparer les posts pour WordPress
+        stage("articles")
+        import markdown2
+        from bs4 import BeautifulSoup
         posts = []
         articles = variation_data.get("content", {}).get("articles", [])
         
@@ -2249,18 +1869,14 @@ async def publish_to_wordpress(request: dict = Body(...)):
         print(json.dumps(payload, indent=2, ensure_ascii=False))
         
         # Envoyer les posts à WordPress
-        wordpress_endpoint = "https://aic-builder.cloud-glory-creation.com/wp-json/elementor-remote/v1/import-posts"
+        stage("import")
+        wordpress_endpoint = "elementor-remote/v1/import-posts"
         
-        print(f"[WordPress] Envoi des articles à l'endpoint: {wordpress_endpoint}")
+        print(f"[WordPress] Envoi des articles à l'endpoint: {wordpress.endpoint(wordpress_endpoint)}")
         
         try:
             print("[WordPress] Envoi de la requête avec Basic Auth")
-            response = requests.post(
-                wordpress_endpoint,
-                json=payload,
-                headers=headers,
-                timeout=30
-            )
+            response = await run_in_threadpool(wordpress.post, wordpress_endpoint, json=payload)
             
             print(f"[WordPress] Réponse reçue - Status: {response.status_code}")
             print(f"[WordPress] Corps de la réponse: {response.text[:500]}...")
@@ -2292,8 +1908,268 @@ async def publish_to_wordpress(request: dict = Body(...)):
     except Exception as e:
         print(f"[WordPress] Erreur générale: {str(e)}")
         traceback.print_exc()
+        raise
+
+@app.post("/api/publish-to-wordpress")
+async def publish_to_wordpress(request: dict = Body(...)):
+    try:
+        # Site cible (nom déclaré dans WORDPRESS_SITES) ; site par défaut si absent
+        return await _publish_variation(request.get("variation_data", {}), request.get("session_id"), request.get("site"))
+    except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Publications simultanées sur un même site (chaque publication remplace le kit, les logos
+# et les articles du site : 1 par défaut) et au total
+WORDPRESS_SITE_CONCURRENCY = int(os.getenv("WORDPRESS_SITE_CONCURRENCY", "1"))
+WORDPRESS_PUBLISH_CONCURRENCY = int(os.getenv("WORDPRESS_PUBLISH_CONCURRENCY", "4"))
+_site_semaphores: Dict[str, asyncio.Semaphore] = {}
+_publish_semaphore = asyncio.Semaphore(WORDPRESS_PUBLISH_CONCURRENCY)
+
+def _site_semaphore(site: str) -> asyncio.Semaphore:
+    # Partagé entre les requêtes : deux publications groupées ne se chevauchent pas sur un site
+    if site not in _site_semaphores:
+        _site_semaphores[site] = asyncio.Semaphore(WORDPRESS_SITE_CONCURRENCY)
+    return _site_semaphores[site]
+
+@app.post("/api/publish-to-wordpress/bulk")
+async def publish_to_wordpress_bulk(request: dict = Body(...)):
+    """
+    Publie plusieurs variations sur plusieurs sites en parallèle, avec une limite de concurrence
+    par site (WORDPRESS_SITE_CONCURRENCY) et globale (WORDPRESS_PUBLISH_CONCURRENCY).
+    Corps : {"session_id", "targets": [{"variation_data", "site" ou "sites", "session_id"}]}.
+    La progression est renvoyée en lignes JSON (application/x-ndjson) : événements "started",
+    "stage" et "done" par publication, puis un "summary" par site.
+    """
+    default_session_id = request.get("session_id")
+    targets = request.get("targets") or []
+    if not isinstance(targets, list) or not all(isinstance(target, dict) for target in targets):
+        return {"error": "targets doit être une liste d'objets"}
+    jobs = []
+    for target in targets:
+        requested_sites = target.get("sites") or target.get("site")
+        sites = [None] if requested_sites is None else _site_names(requested_sites)
+        if sites is None:
+            return {"error": "site/sites doit être un nom de site ou une liste de noms"}
+        if not isinstance(target.get("variation_data") or {}, dict):
+            return {"error": "variation_data doit être un objet"}
+        for site in dict.fromkeys(sites):
+            jobs.append({
+                "site": site,
+                "variation_data": target.get("variation_data") or {},
+                "session_id": target.get("session_id", default_session_id),
+            })
+    if not jobs:
+        return {"error": "Aucune publication demandée"}
+    print(f"[WordPress] Publication groupée: {len(jobs)} publication(s)")
+    
+    async def stream():
+        queue: asyncio.Queue = asyncio.Queue()
+        started = time.perf_counter()
+        
+        def elapsed_ms() -> int:
+            return round((time.perf_counter() - started) * 1000)
+        
+        async def publish_job(index: int, job: dict):
+            event = {"job": index, "site": job["site"], "variation": job["variation_data"].get("title")}
+            job_started = time.perf_counter()
+            try:
+                event["site"] = get_site(job["site"]).name
+                async with _site_semaphore(event["site"]), _publish_semaphore:
+                    queue.put_nowait(dict(event, event="started", elapsed_ms=elapsed_ms()))
+                    job_started = time.perf_counter()
+                    result = await _publish_variation(
+                        job["variation_data"],
+                        job["session_id"],
+                        event["site"],
+                        on_stage=lambda name: queue.put_nowait(dict(event, event="stage", stage=name, elapsed_ms=elapsed_ms())),
+                    )
+            except UnknownSiteError:
+                result = {"error": f"Site WordPress inconnu: {job['site']}"}
+            except Exception as e:
+                result = {"error": str(e)}
+            queue.put_nowait(dict(
+                event,
+                event="done",
+                success="error" not in result,
+                result=result,
+                duration_ms=round((time.perf_counter() - job_started) * 1000),
+                elapsed_ms=elapsed_ms(),
+            ))
+        
+        tasks = [asyncio.ensure_future(publish_job(index, job)) for index, job in enumerate(jobs)]
+        summary: Dict[str, dict] = {}
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event = await queue.get()
+                if event["event"] == "done":
+                    remaining -= 1
+                    site_summary = summary.setdefault(str(event["site"]), {"succeeded": 0, "failed": 0})
+                    site_summary["succeeded" if event["success"] else "failed"] += 1
+                yield json_codec.dumps(event) + b"\n"
+            yield json_codec.dumps({"event": "summary", "sites": summary, "elapsed_ms": elapsed_ms()}) + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/api/build-sites")
+async def build_sites(request: dict = Body(...)):
+    """
+    Construit des sites de bout en bout à partir d'un thème, en pipeline plutôt qu'étape par étape :
+    - variations du thème et analyse de la couleur du thème en parallèle ;
+    - pour chaque variation, logo et articles en parallèle, palette dès que le logo existe ;
+    - publication de chaque variation dès qu'elle est prête, sur le site de même rang dans `sites`
+      (les variations sans site sont construites mais pas publiées).
+    Corps : {"theme", "variations", "sites", "session_id", "images_per_variation", "logo_descriptions"}.
+    La progression est renvoyée en lignes JSON (application/x-ndjson) : "stage" (début et fin de
+    chaque étape, avec sa durée), "variation" (variation construite), "published", puis "summary".
+    """
+    theme = request.get("theme", "")
+    if not theme:
+        return {"error": "Thème non fourni"}
+    number_of_variations = request.get("variations", 3)
+    sites = _site_names(request.get("sites") or [])
+    if sites is None:
+        return {"error": "sites doit être une liste de noms de sites (null pour ne pas publier une variation)"}
+    session_id = request.get("session_id")
+    images_per_variation = _parse_number(request.get("images_per_variation", 1), None, int)
+    if images_per_variation is None:
+        return {"error": "images_per_variation doit être un nombre entier"}
+    images_per_variation = max(1, min(images_per_variation, 4))
+    logo_descriptions = request.get("logo_descriptions", {})
+    print(f"[Build] Construction de {number_of_variations} site(s) pour le thème: {theme}")
+    
+    async def stream():
+        queue: asyncio.Queue = asyncio.Queue()
+        started = time.perf_counter()
+        durations: Dict[str, List[int]] = {}
+        finished = object()
+        
+        def elapsed_ms() -> int:
+            return round((time.perf_counter() - started) * 1000)
+        
+        async def timed(stage: str, awaitable, **context):
+            queue.put_nowait(dict(context, event="stage", stage=stage, status="started", elapsed_ms=elapsed_ms()))
+            stage_started = time.perf_counter()
+            status = "failed"
+            try:
+                result = await awaitable
+                status = "done"
+                return result
+            finally:
+                duration = round((time.perf_counter() - stage_started) * 1000)
+                durations.setdefault(stage, []).append(duration)
+                queue.put_nowait(dict(context, event="stage", stage=stage, status=status, duration_ms=duration, elapsed_ms=elapsed_ms()))
+        
+        async def theme_palette(color_task) -> Optional[dict]:
+            try:
+                return (await color_task).get("palette")
+            except Exception as e:
+                print(f"[Build] Analyse de la couleur du thème impossible: {str(e)}")
+                return None
+        
+        async def publish(variation: dict, site: str) -> dict:
+            try:
+                site_name = get_site(site).name
+                async with _site_semaphore(site_name), _publish_semaphore:
+                    return await timed("publish", _publish_variation(variation, session_id, site_name), variation=variation["id"], site=site_name)
+            except UnknownSiteError:
+                return {"error": f"Site WordPress inconnu: {site}"}
+            except Exception as e:
+                return {"error": str(e)}
+        
+        async def build_variation(index: int, variation: dict, color_task, logo_semaphore: asyncio.Semaphore):
+            context = {"variation": variation.get("id")}
+            try:
+                # Les articles ne dépendent pas du logo : ils démarrent tout de suite
+                articles_task = asyncio.ensure_future(timed("articles", run_in_threadpool(_generate_variation_articles, variation), **context))
+                try:
+                    logo = await timed("logo", _generate_variation_logo(variation, logo_descriptions, images_per_variation, logo_semaphore), **context)
+                    generated = logo.pop("generated")
+                    variation["logo"] = logo["logo_url"]
+                    if generated and session_id:
+                        try:
+                            await session_cache.update(session_id, lambda session_data: _set_session_logo(session_data, variation["id"], logo["logo_url"]))
+                        except KeyError:
+                            pass
+                    
+                    palette, palette_source = await timed(
+                        "palette",
+                        _variation_palette(logo["logo_url"] if generated else None, await theme_palette(color_task)),
+                        **context,
+                    )
+                    variation["color_palette"] = palette
+                    variation["content"] = {"articles": await articles_task}
+                finally:
+                    articles_task.cancel()
+                queue.put_nowait(dict(
+                    context,
+                    event="variation",
+                    logo={key: value for key, value in logo.items() if key != "logo_url"},
+                    palette_source=palette_source,
+                    data=variation,
+                    elapsed_ms=elapsed_ms(),
+                ))
+                
+                site = sites[index] if index < len(sites) else None
+                if site:
+                    result = await publish(variation, site)
+                    queue.put_nowait(dict(context, event="published", site=site, success="error" not in result, result=result, elapsed_ms=elapsed_ms()))
+            except Exception as e:
+                print(f"[Build] Erreur lors de la construction de la variation {context['variation']}: {str(e)}")
+                traceback.print_exc()
+                queue.put_nowait(dict(context, event="error", error=str(e), elapsed_ms=elapsed_ms()))
+        
+        async def build():
+            try:
+                color_task = asyncio.ensure_future(timed(
+                    "theme_color",
+                    theme_color_flight.do(request_fingerprint({"theme": theme}), _analyze_theme_color, theme),
+                ))
+                try:
+                    result = await timed("theme", run_in_threadpool(_generate_website_theme, theme, number_of_variations))
+                    variations = result["variations"]
+                    queue.put_nowait({"event": "theme", "variations": [variation["id"] for variation in variations], "elapsed_ms": elapsed_ms()})
+                    logo_semaphore = asyncio.Semaphore(LOGO_CONCURRENCY)
+                    await asyncio.gather(*[
+                        build_variation(index, variation, color_task, logo_semaphore)
+                        for index, variation in enumerate(variations)
+                    ])
+                finally:
+                    color_task.cancel()
+            except Exception as e:
+                print(f"[Build] Erreur lors de la construction des sites: {str(e)}")
+                traceback.print_exc()
+                queue.put_nowait({"event": "error", "error": str(e), "elapsed_ms": elapsed_ms()})
+            finally:
+                queue.put_nowait(finished)
+        
+        task = asyncio.ensure_future(build())
+        try:
+            while True:
+                event = await queue.get()
+                if event is finished:
+                    break
+                yield json_codec.dumps(event) + b"\n"
+            stages = {
+                stage: {"count": len(values), "total_ms": sum(values), "max_ms": max(values)}
+                for stage, values in durations.items()
+            }
+            print(f"[Build] Terminé en {elapsed_ms()} ms: {stages}")
+            yield json_codec.dumps({"event": "summary", "stages": stages, "elapsed_ms": elapsed_ms()}) + b"\n"
+        finally:
+            task.cancel()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def _set_session_logo(session_data: dict, variation_id: str, logo_url: str):
+    # Stocker dans session_data["logos"][variation_id]
+    if "logos" not in session_data or not isinstance(session_data["logos"], dict):
+        session_data["logos"] = {}
+    session_data["logos"][variation_id] = logo_url
+
 @app.post("/api/upload-logo")
 async def upload_logo(request: dict = Body(...)):
     """
@@ -2304,109 +2180,186 @@ async def upload_logo(request: dict = Body(...)):
     logo_base64 = request.get("logo_base64")
     if not session_id or not variation_id or not logo_base64:
         return {"error": "session_id, variation_id et logo_base64 sont requis"}
-    import os, json
-    session_file = f"./sessions/session_{session_id}.json"
-    if not os.path.exists(session_file):
-        return {"error": "Session non trouvée"}
     try:
-        with open(session_file, "r", encoding="utf-8") as f:
-            session_data = json.load(f)
-        # Stocker dans session_data["logos"][variation_id]
-        if "logos" not in session_data or not isinstance(session_data["logos"], dict):
-            session_data["logos"] = {}
-        session_data["logos"][variation_id] = logo_base64
-        with open(session_file, "w", encoding="utf-8") as f:
-            json.dump(session_data, f, ensure_ascii=False, indent=2)
+        await session_cache.update(session_id, lambda session_data: _set_session_logo(session_data, variation_id, logo_base64))
         return {"logo_url": logo_base64}
+    except KeyError:
+        return {"error": "Session non trouvée"}
     except Exception as e:
         print(f"[UPLOAD LOGO ERROR] {e}")
         return {"error": str(e)}
 
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": SESSION_CACHE_CONTROL})
+
+def _cacheable(content: dict, etag: Optional[str]) -> FastJSONResponse:
+    headers = {"ETag": etag, "Cache-Control": SESSION_CACHE_CONTROL} if etag else None
+    return FastJSONResponse(content=content, headers=headers)
+
 @app.get("/api/get-logos")
-async def get_logos(session_id: str = Query(...)):
+async def get_logos(
+    session_id: str = Query(...),
+    variation_id: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
+):
     """
-    Retourne tous les logos pour une session donnée.
+    Retourne tous les logos pour une session donnée, ou seulement celui de `variation_id`.
+    La réponse porte un ETag : un client qui renvoie If-None-Match reçoit 304 sans relecture du fichier.
     """
-    import os, json
-    session_file = f"./sessions/session_{session_id}.json"
-    if not os.path.exists(session_file):
-        return {"logos": {}}
     try:
-        with open(session_file, "r", encoding="utf-8") as f:
-            session_data = json.load(f)
+        etag = session_cache.etag(session_id, "logos", variation_id)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        session_data = await session_cache.get(session_id)
+        if session_data is None:
+            return {"logos": {}}
         logos = session_data.get("logos", {})
-        return {"logos": logos}
+        if variation_id is not None:
+            logos = {variation_id: logos[variation_id]} if variation_id in logos else {}
+        return _cacheable({"logos": logos}, session_cache.etag(session_id, "logos", variation_id))
     except Exception as e:
         print(f"[GET LOGOS ERROR] {e}")
         return {"logos": {}}
 
+@app.get("/api/sessions")
+async def get_sessions(limit: int = Query(100, ge=1, le=1000)):
+    """
+    Liste les sessions depuis l'index (id, création, taille, dernier accès, archivée),
+    les plus récentes d'abord.
+    """
+    sessions = await run_in_threadpool(list_sessions)
+    return {"sessions": sessions[:limit], "total": len(sessions)}
+
+@app.get("/api/sessions/{session_id}/logos/{variation_id}")
+async def get_session_logo(session_id: str, variation_id: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Retourne le logo d'une seule variation (404 si absent).
+    """
+    try:
+        etag = session_cache.etag(session_id, "logos", variation_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    session_data = await session_cache.get(session_id)
+    logo_url = ((session_data or {}).get("logos") or {}).get(variation_id)
+    if not logo_url:
+        raise HTTPException(status_code=404, detail="Logo non trouvé")
+    return _cacheable({"variation_id": variation_id, "logo_url": logo_url}, session_cache.etag(session_id, "logos", variation_id))
+
+@app.get("/api/sessions/{session_id}")
+async def get_session(
+    session_id: str,
+    fields: Optional[str] = Query(None, description="Champs à retourner, séparés par des virgules (chemins pointés acceptés, ex. logos.var1)"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Retourne la session, éventuellement réduite aux champs demandés, avec un ETag.
+    """
+    requested = sorted({field.strip() for field in (fields or "").split(",") if field.strip()})
+    try:
+        etag = session_cache.etag(session_id, "session", *requested)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    session_data = await session_cache.get(session_id)
+    if session_data is None:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+    etag = session_cache.etag(session_id, "session", *requested)
+    if requested:
+        session_data = project_fields(session_data, requested)
+    return _cacheable(session_data, etag)
+
 @app.post("/api/create-session")
 async def create_session(request: dict = Body(...)):
     session_id = request.get("session_id")
     variations = request.get("variations", [])
     if not session_id:
         return {"error": "session_id requis"}
-    import os, json
-    os.makedirs("./sessions", exist_ok=True)
-    session_file = f"./sessions/session_{session_id}.json"
-    if os.path.exists(session_file):
-        return {"message": "Session déjà existante"}
     session_data = {
         "logos": {},
         "variations": variations,
         "articles": []
     }
-    with open(session_file, "w", encoding="utf-8") as f:
-        json.dump(session_data, f, ensure_ascii=False, indent=2)
+    try:
+        created = await session_cache.create(session_id, session_data)
+    except ValueError as e:
+        return {"error": str(e)}
+    if not created:
+        return {"message": "Session déjà existante"}
     return {"message": "Session créée"}
 
 @app.post("/api/generate-logo")
-async def generate_logo(request: dict = Body(...)):
+async def generate_logo(http_request: Request, request: dict = Body(...)):
+    """
+    Génère un logo. Avec `candidates` (1 à 4), plusieurs propositions sont générées en un appel
+    fal et évaluées localement : la meilleure est retournée avec sa qualité, les autres sont
+    classées dans `alternatives` (le mode "binary" ne retourne que la meilleure).
+    """
     try:
         print("Requête reçue pour générer un logo")
         prompt = request.get("prompt", "")
-        session_id = request.get("session_id")
-        var_id = request.get("variation_id")
+        delivery = request.get("delivery", "data_url")
+        candidates = _parse_number(request.get("candidates", 1), None, int)
         
         if not prompt:
             return {"error": "Prompt requis"}
+        if candidates is None:
+            return {"error": "candidates doit être un nombre entier"}
+        candidates = max(1, min(candidates, 4))
+        if delivery not in IMAGE_DELIVERY_MODES:
+            return {"error": f"Mode de livraison inconnu: {delivery} (attendu: {', '.join(IMAGE_DELIVERY_MODES)})"}
         
         print(f"Génération d'un logo avec le prompt: {prompt}")
+        _, ranked = await run_in_threadpool(_generate_variation_logos, prompt, candidates)
+        best_logo, quality = ranked[0]
         
-        # Générer un meilleur prompt avec Gemini
-        from crew_flux_image_agent import get_logo_prompt_from_gemini, generate_logo_with_fal
-        enhanced_prompt = get_logo_prompt_from_gemini(prompt)
-        print(f"Prompt amélioré par Gemini: {enhanced_prompt}")
+        # Ne pas sauvegarder dans la session
         
-        # Générer le logo avec Fal.ai
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-        temp_file_path = temp_file.name
-        temp_file.close()
-        
-        try:
-            generate_logo_with_fal(enhanced_prompt, temp_file_path)
-            
-            # Lire le logo généré
-            with open(temp_file_path, "rb") as f:
-                logo_data = f.read()
-            
-            # Convertir en base64
-            logo_base64 = base64.b64encode(logo_data).decode('utf-8')
-            logo_url = f"data:image/png;base64,{logo_base64}"
-            
-            # Ne pas sauvegarder dans la session
-            
-            return {"logo_url": logo_url}
-        finally:
-            # Supprimer le fichier temporaire
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        response = _deliver_image(best_logo, delivery, http_request, "logo_url")
+        if quality is not None:
+            if isinstance(response, dict):
+                response["quality"] = quality
+                response["alternatives"] = _logo_alternatives(
+                    ranked, lambda logo: _deliver_image(logo, delivery, http_request, "logo_url")["logo_url"]
+                )
+            else:
+                response.headers["X-Logo-Score"] = str(quality["score"])
+        return response
     
     except Exception as e:
         print(f"Erreur lors de la génération du logo: {str(e)}")
         traceback.print_exc()
         return {"error": str(e)}
 
+@app.get("/api/wordpress/sites")
+async def get_wordpress_sites():
+    """
+    Liste les sites WordPress cibles configurés (sans les identifiants).
+    """
+    try:
+        return {"sites": wordpress_sites.describe()}
+    except Exception as e:
+        print(f"[WordPress] Configuration des sites invalide: {str(e)}")
+        return {"error": str(e)}
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    Retourne les métriques internes (taux de coalescence des requêtes identiques, sessions, compression).
+    """
+    return {
+        "singleflight": singleflight_metrics(),
+        "sessions": dict(lifecycle_stats(), cache=session_cache.stats()),
+        "compression": compression_stats.snapshot(),
+        "image_blobs": image_blobs.stats(),
+        "prefetch": speculative_cache.stats(),
+    }
+
 if __name__ == "__main__":
+    import uvicorn
     print("Démarrage du serveur API...")
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Mesure la compression des grosses réponses JSON : octets transmis et coût CPU
+(compression côté serveur, décompression côté client) pour gzip, br et zstd.
+
+Usage (depuis backend/) :
+    python benchmarks/bench_compression.py --runs 10 [--dir sessions]
+
+Deux charges sont construites à partir des fichiers de session réels :
+- "generate-all-content" : toutes les sessions dans une seule réponse (Markdown + base64) ;
+- "get-logos" : les logos de toutes les sessions.
+brotli et zstandard ne sont mesurés que s'ils sont installés.
+"""
+import argparse
+import gzip
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import json_codec
+from compression import BROTLI_QUALITY, GZIP_LEVEL, ZSTD_LEVEL, brotli, zstandard
+
+
+def codecs():
+    for level in (1, GZIP_LEVEL, 9):
+        yield f"gzip -{level}", (lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)), gzip.decompress
+    if brotli is not None:
+        for quality in (1, BROTLI_QUALITY, 11):
+            yield f"br q{quality}", (lambda data, quality=quality: brotli.compress(data, quality=quality)), brotli.decompress
+    if zstandard is not None:
+        for level in (1, ZSTD_LEVEL, 19):
+            yield (
+                f"zstd -{level}",
+                lambda data, level=level: zstandard.ZstdCompressor(level=level).compress(data),
+                lambda data: zstandard.ZstdDecompressor().decompress(data),
+            )
+
+
+def build_payloads(directory: str):
+    sessions = [json_codec.loads(path.read_bytes()) for path in sorted(Path(directory).glob("session_*.json"))]
+    if not sessions:
+        sys.exit(f"Aucun fichier session_*.json dans {directory}")
+    logos = {}
+    for index, session in enumerate(sessions):
+        for variation_id, logo in (session.get("logos") or {}).items():
+            logos[f"{index}-{variation_id}"] = logo
+    return {
+        "generate-all-content": json_codec.dumps({"variations": sessions}),
+        "get-logos": json_codec.dumps({"logos": logos}),
+    }
+
+
+def median_ms(fn, data, runs):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(data)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default="sessions")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for name, payload in build_payloads(args.dir).items():
+        print(f"\n[{name}] {len(payload):,d} octets non compressés, médiane sur {args.runs} runs")
+        print(f"  {'codec':<12} {'octets':>12} {'ratio':>7} {'compression':>12} {'décompression':>14}")
+        for codec, compress, decompress in codecs():
+            compressed = compress(payload)
+            assert decompress(compressed) == payload
+            compress_ms = median_ms(compress, payload, args.runs)
+            decompress_ms = median_ms(decompress, compressed, args.runs)
+            print(
+                f"  {codec:<12} {len(compressed):12,d} {len(compressed) / len(payload):7.3f} "
+                f"{compress_ms:9.2f} ms {decompress_ms:11.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
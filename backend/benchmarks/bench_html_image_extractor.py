@@ -0,0 +1,100 @@
+"""
+Compare l'extraction d'image de la page source : parse complet BeautifulSoup (ancien
+chemin de /api/article) contre html_image_extractor (streaming, arrêt anticipé).
+
+Usage (depuis backend/) :
+    python benchmarks/bench_html_image_extractor.py --size-kib 2048 --runs 10
+
+Trois pages synthétiques de la taille demandée sont générées :
+- og:image dans le <head> ;
+- première <img> qualifiée au début du <body>, après un <head> chargé en scripts ;
+- première <img> qualifiée en fin de page (au-delà du plafond de lecture).
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from html_image_extractor import CHUNK_SIZE, DEFAULT_MAX_BYTES, extract_image_candidates
+
+BASE_URL = "https://example.com/blog/article"
+
+
+def _filler(size: int) -> str:
+    block = (
+        '<div class="card"><a href="/post/{i}"><img src="/static/icons/icon-{i}.svg" width="24" height="24"></a>'
+        '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</p></div>\n'
+    )
+    parts, total, i = [], 0, 0
+    while total < size:
+        part = block.format(i=i)
+        parts.append(part)
+        total += len(part)
+        i += 1
+    return "".join(parts)
+
+
+def build_pages(size: int):
+    script = "<script>" + "var x = 1;" * 2000 + "</script>"
+    return {
+        "og:image": (
+            f'<html><head><meta property="og:image" content="/media/hero.jpg">{script}</head>'
+            f"<body>{_filler(size)}</body></html>"
+        ),
+        "img début": (
+            f"<html><head>{script}</head><body>"
+            f'<img src="https://cdn.example.com/photos/hero.jpg" width="1200">{_filler(size)}</body></html>'
+        ),
+        "img en fin": (
+            f"<html><head>{script}</head><body>{_filler(size)}"
+            f'<img src="https://cdn.example.com/photos/hero.jpg"></body></html>'
+        ),
+    }
+
+
+def legacy_extract(html: str):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for img in soup.find_all('img', src=True):
+        src = img.get('src', '')
+        if src and ('http' in src) and not ('icon' in src.lower()) and not ('logo' in src.lower()):
+            return src
+    return None
+
+
+def streaming_extract(data: bytes):
+    chunks = (data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE))
+    found = extract_image_candidates(chunks, BASE_URL)
+    return found[0] if found else None
+
+
+def timed(fn, arg, runs):
+    durations = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn(arg)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-kib", type=int, default=2048)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"Pages de {args.size_kib} KiB, plafond de lecture {DEFAULT_MAX_BYTES // 1024} KiB, médiane sur {args.runs} runs")
+    for name, html in build_pages(args.size_kib * 1024).items():
+        legacy_ms, legacy_result = timed(legacy_extract, html, args.runs)
+        streaming_ms, streaming_result = timed(streaming_extract, html.encode("utf-8"), args.runs)
+        print(f"\n[{name}]")
+        print(f"  BeautifulSoup complet : {legacy_ms:9.1f} ms -> {legacy_result}")
+        print(f"  Streaming             : {streaming_ms:9.1f} ms -> {streaming_result}")
+
+
+if __name__ == "__main__":
+    main()
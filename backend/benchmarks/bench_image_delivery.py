@@ -0,0 +1,81 @@
+"""
+Compare les modes de livraison des images générées (/api/generate-image, /api/generate-logo) :
+JSON avec data URL base64 (mode historique) contre PNG binaire (modes "binary" et "url").
+
+Usage (depuis backend/) :
+    python benchmarks/bench_image_delivery.py --runs 20
+
+Pour une image d'article (1920x1080) et un logo (512x512) synthétiques, mesure la taille de la
+charge utile et le temps de décodage côté client avant affichage : parse JSON + décodage base64
+pour la data URL, rien pour le binaire ; puis le décodage PNG, commun aux deux modes.
+"""
+import argparse
+import base64
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import json_codec
+
+
+def synthetic_png(width: int, height: int) -> bytes:
+    # Dégradé + bruit : se compresse comme une photo plutôt que comme un aplat
+    from PIL import Image
+    import numpy as np
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 24, base.shape), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def decode_png(data: bytes):
+    from PIL import Image
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def median_ms(fn, runs):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Médiane sur {args.runs} runs")
+    for name, (width, height) in {"image d'article": (1920, 1080), "logo": (512, 512)}.items():
+        png = synthetic_png(width, height)
+        data_url_payload = json_codec.dumps({"image_url": f"data:image/png;base64,{base64.b64encode(png).decode('utf-8')}"})
+
+        def client_data_url():
+            url = json_codec.loads(data_url_payload)["image_url"]
+            return base64.b64decode(url.split("base64,", 1)[1])
+
+        assert client_data_url() == png
+        data_url_ms = median_ms(client_data_url, args.runs)
+        png_ms = median_ms(lambda: decode_png(png), max(args.runs // 4, 1))
+
+        print(f"\n[{name} {width}x{height}]")
+        print(f"  {'mode':<10} {'octets':>12} {'extraction':>12} {'+ décodage PNG':>16}")
+        print(f"  {'data_url':<10} {len(data_url_payload):12,d} {data_url_ms:9.2f} ms {data_url_ms + png_ms:13.2f} ms")
+        print(f"  {'binary':<10} {len(png):12,d} {0:9.2f} ms {png_ms:13.2f} ms")
+        print(f"  surcoût data URL : {len(data_url_payload) / len(png) - 1:+.1%} d'octets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Mesure l'encodage / le décodage des fichiers de session réels : ancien format
+(json.dump indenté) contre json_codec (orjson compact ou indenté, stdlib compact).
+
+Usage (depuis backend/) :
+    python benchmarks/bench_json_codec.py --runs 20 [--dir sessions]
+
+Pour chaque variante : temps médian d'encodage et de décodage de toutes les sessions,
+et nombre d'octets écrits.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def variants():
+    yield "stdlib indent=2 (ancien)", (
+        lambda obj: json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8"),
+        lambda data: json.loads(data),
+    )
+    yield "stdlib compact", (
+        lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        lambda data: json.loads(data),
+    )
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        yield "orjson indent=2", (lambda obj: orjson.dumps(obj, option=option | orjson.OPT_INDENT_2), orjson.loads)
+        yield "orjson compact", (lambda obj: orjson.dumps(obj, option=option), orjson.loads)
+
+
+def median_ms(fn, items, runs):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default="sessions")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    files = sorted(Path(args.dir).glob("session_*.json"))
+    if not files:
+        sys.exit(f"Aucun fichier session_*.json dans {args.dir}")
+    sessions = [json.loads(path.read_bytes()) for path in files]
+    raw_bytes = sum(path.stat().st_size for path in files)
+    print(f"{len(files)} sessions ({raw_bytes / 1024:.0f} KiB sur disque), médiane sur {args.runs} runs")
+    if orjson is None:
+        print("orjson non installé : seules les variantes stdlib sont mesurées")
+
+    print(f"\n{'variante':<26} {'encodage':>10} {'décodage':>10} {'octets':>12}")
+    for name, (encode, decode) in variants():
+        encoded = [encode(session) for session in sessions]
+        encode_ms = median_ms(encode, sessions, args.runs)
+        decode_ms = median_ms(decode, encoded, args.runs)
+        written = sum(len(data) for data in encoded)
+        print(f"{name:<26} {encode_ms:8.2f} ms {decode_ms:8.2f} ms {written:12,d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark du démarrage à froid de l'API.
+
+Mesure, dans des processus Python neufs :
+- le temps d'import de `api` ;
+- le temps jusqu'à la première réponse HTTP d'un worker uvicorn (GET /api/metrics).
+
+Usage (depuis backend/) :
+    python benchmarks/bench_startup.py --runs 5 --budget 1.0
+
+Le script retourne un code de sortie non nul si la médiane dépasse le budget,
+ce qui permet de suivre la régression du démarrage en CI.
+"""
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import api; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import_time() -> float:
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_response(timeout: float = 30.0) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/metrics"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError("Le worker uvicorn s'est arrêté avant de répondre")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    response.read()
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"Aucune réponse de {url} après {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def top_imports(limit: int = 10):
+    """
+    Retourne les modules les plus coûteux à importer (python -X importtime).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="budget en secondes pour la première réponse")
+    parser.add_argument("--importtime", action="store_true", help="afficher les imports les plus coûteux")
+    parser.add_argument("--json", action="store_true", help="sortie JSON (pour le suivi dans le temps)")
+    args = parser.parse_args()
+
+    import_times = [measure_import_time() for _ in range(args.runs)]
+    first_response_times = [measure_first_response() for _ in range(args.runs)]
+
+    report = {
+        "runs": args.runs,
+        "import_s": {"median": statistics.median(import_times), "max": max(import_times)},
+        "first_response_s": {"median": statistics.median(first_response_times), "max": max(first_response_times)},
+        "budget_s": args.budget,
+    }
+    if args.importtime:
+        report["top_imports_us"] = [{"module": name, "cumulative_us": us} for us, name in top_imports()]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Import de api            : médiane {report['import_s']['median'] * 1000:.0f} ms (max {report['import_s']['max'] * 1000:.0f} ms)")
+        print(f"Première réponse HTTP    : médiane {report['first_response_s']['median'] * 1000:.0f} ms (max {report['first_response_s']['max'] * 1000:.0f} ms)")
+        for row in report.get("top_imports_us", []):
+            print(f"  {row['cumulative_us'] / 1000:8.1f} ms  {row['module']}")
+
+    if report["first_response_s"]["median"] > args.budget:
+        print(f"Budget de démarrage dépassé ({args.budget}s)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compare la régénération de titre via CrewAI (Agent + Task + Crew) et via title_engine
+(un seul appel au modèle) : latence et mémoire allouée par régénération.
+
+Usage (depuis backend/) :
+    python benchmarks/bench_title_regeneration.py --runs 5
+    python benchmarks/bench_title_regeneration.py --runs 20 --offline
+
+Sans --offline, les deux chemins appellent réellement OpenAI (OPENAI_API_KEY requis).
+Avec --offline, un modèle factice de langchain répond instantanément : la mesure
+isole alors le coût d'orchestration propre à chaque chemin.
+"""
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+SUJET = "Le marketing digital au Maroc"
+TONE = "accrocheur"
+TITRES = [
+    "Marketing digital au Maroc : les tendances 2025",
+    "Comment réussir sa stratégie digitale au Maroc",
+    "Les réseaux sociaux, moteur du marketing marocain",
+]
+
+
+def _offline_llm():
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    return FakeListChatModel(responses=["Le guide ultime du marketing digital au Maroc"])
+
+
+def measure(fn, runs):
+    latencies = []
+    peaks = []
+    for _ in range(runs):
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        "latency_median_ms": statistics.median(latencies) * 1000,
+        "latency_max_ms": max(latencies) * 1000,
+        "peak_alloc_kib": statistics.median(peaks) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--offline", action="store_true", help="utiliser un modèle factice (pas d'appel réseau)")
+    args = parser.parse_args()
+
+    from api import regenerer_titre
+    from title_engine import regenerate_title
+
+    llm = _offline_llm() if args.offline else None
+    # Un appel de chauffe par chemin pour ne pas mesurer les imports différés
+    regenerer_titre(0, SUJET, TONE, TITRES, llm=llm)
+    regenerate_title(SUJET, TONE, TITRES, llm=llm)
+
+    results = {
+        "crewai": measure(lambda: regenerer_titre(0, SUJET, TONE, TITRES, llm=llm), args.runs),
+        "title_engine": measure(lambda: regenerate_title(SUJET, TONE, TITRES, llm=llm), args.runs),
+    }
+    print(f"{'chemin':<14}{'latence médiane':>18}{'latence max':>14}{'pic mémoire':>14}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['latency_median_ms']:>15.1f} ms{r['latency_max_ms']:>11.1f} ms{r['peak_alloc_kib']:>10.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
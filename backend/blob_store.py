@@ -0,0 +1,67 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Durée de vie des images servies par URL courte (secondes) et mémoire maximale occupée
+IMAGE_BLOB_TTL = float(os.getenv("IMAGE_BLOB_TTL", "900"))
+IMAGE_BLOB_MAX_BYTES = int(os.getenv("IMAGE_BLOB_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class BlobStore:
+    """
+    Stockage en mémoire d'objets binaires à durée de vie limitée.
+    L'identifiant est le hash du contenu : un même fichier n'est stocké qu'une fois,
+    et une URL donnée désigne toujours le même contenu (cacheable en immutable).
+    Au-delà de `max_bytes`, les objets les plus anciens sont évincés.
+    """
+
+    def __init__(self, ttl: float = IMAGE_BLOB_TTL, max_bytes: int = IMAGE_BLOB_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._blobs: "OrderedDict[str, Tuple[bytes, str, float]]" = OrderedDict()
+        self._size = 0
+
+    def put(self, data: bytes, content_type: str) -> str:
+        blob_id = hashlib.sha256(data).hexdigest()[:32]
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            previous = self._blobs.pop(blob_id, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._blobs[blob_id] = (data, content_type, expires)
+            self._size += len(data)
+            self._evict()
+        return blob_id
+
+    def get(self, blob_id: str) -> Optional[Tuple[bytes, str, float]]:
+        """
+        Retourne (contenu, type, secondes restantes) ou None si l'objet a expiré.
+        """
+        with self._lock:
+            self._evict()
+            blob = self._blobs.get(blob_id)
+            if blob is None:
+                return None
+            data, content_type, expires = blob
+            return data, content_type, expires - time.monotonic()
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._blobs:
+            blob_id, (data, _, expires) = next(iter(self._blobs.items()))
+            # Les objets sont rangés par date d'insertion, donc par date d'expiration
+            if expires > now and self._size <= self.max_bytes:
+                break
+            del self._blobs[blob_id]
+            self._size -= len(data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"blobs": len(self._blobs), "bytes": self._size}
+
+
+image_blobs = BlobStore()
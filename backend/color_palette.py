@@ -0,0 +1,203 @@
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+# Côté de l'échantillon analysé (le logo est réduit avant le k-means)
+SAMPLE_SIZE = 64
+CLUSTERS = 5
+KMEANS_ITERATIONS = 12
+# Chroma CIELAB minimale pour qu'une couleur compte comme « couleur de marque »
+MIN_CHROMA = 20
+# Seuils WCAG : texte courant et éléments d'interface / grands textes
+TEXT_CONTRAST = 4.5
+PRIMARY_CONTRAST = 3.0
+CACHE_SIZE = 256
+
+_WHITE_D65 = np.array([0.95047, 1.0, 1.08883])
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+
+
+def _linearize(rgb: np.ndarray) -> np.ndarray:
+    rgb = rgb / 255.0
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """
+    sRGB (0-255, tableau (..., 3)) vers CIELAB (D65).
+    """
+    xyz = _linearize(rgb.astype(np.float64)) @ _RGB_TO_XYZ.T / _WHITE_D65
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def relative_luminance(rgb) -> float:
+    linear = _linearize(np.asarray(rgb, dtype=np.float64))
+    return float(linear @ np.array([0.2126, 0.7152, 0.0722]))
+
+
+def contrast_ratio(a, b) -> float:
+    la, lb = sorted((relative_luminance(a), relative_luminance(b)), reverse=True)
+    return (la + 0.05) / (lb + 0.05)
+
+
+def to_hex(rgb) -> str:
+    r, g, b = (int(round(float(c))) for c in np.clip(rgb, 0, 255))
+    return f"#{r:02X}{g:02X}{b:02X}"
+
+
+def _mix(rgb, target, amount: float) -> np.ndarray:
+    return np.asarray(rgb, dtype=np.float64) * (1 - amount) + np.asarray(target, dtype=np.float64) * amount
+
+
+def kmeans(points: np.ndarray, k: int = CLUSTERS, iterations: int = KMEANS_ITERATIONS, seed: int = 0):
+    """
+    k-means vectorisé (initialisation k-means++ déterministe). Retourne (centres, étiquettes).
+    """
+    k = min(k, len(points))
+    rng = np.random.default_rng(seed)
+    centers = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        distances = np.min(((points[:, None, :] - np.array(centers)[None]) ** 2).sum(-1), axis=1)
+        total = distances.sum()
+        if total == 0:
+            break
+        centers.append(points[rng.choice(len(points), p=distances / total)])
+    centers = np.array(centers)
+    labels = np.zeros(len(points), dtype=np.int64)
+    for _ in range(iterations):
+        labels = ((points[:, None, :] - centers[None]) ** 2).sum(-1).argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        if np.allclose(updated, centers, atol=0.5):
+            centers = updated
+            break
+        centers = updated
+    return centers, labels
+
+
+def dominant_colors(png: bytes, k: int = CLUSTERS) -> list:
+    """
+    Couleurs dominantes du logo : [{"rgb", "lab", "weight"}] triées par poids décroissant.
+    Les pixels transparents sont ignorés ; la couleur affichée est la moyenne sRGB du groupe.
+    """
+    from PIL import Image
+    image = Image.open(io.BytesIO(png)).convert("RGBA")
+    image.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE))
+    pixels = np.asarray(image, dtype=np.float64).reshape(-1, 4)
+    pixels = pixels[pixels[:, 3] >= 128][:, :3]
+    if len(pixels) == 0:
+        return []
+    lab = rgb_to_lab(pixels)
+    centers, labels = kmeans(lab, k)
+    counts = np.bincount(labels, minlength=len(centers))
+    colors = []
+    for index in np.flatnonzero(counts):
+        colors.append({
+            "rgb": pixels[labels == index].mean(axis=0),
+            "lab": centers[index],
+            "weight": counts[index] / len(pixels),
+        })
+    colors.sort(key=lambda color: color["weight"], reverse=True)
+    return colors
+
+
+def _chroma(color) -> float:
+    return float(np.hypot(color["lab"][1], color["lab"][2]))
+
+
+def _ensure_contrast(rgb, against, minimum: float, towards=(0, 0, 0)) -> np.ndarray:
+    # Assombrit (ou éclaircit) progressivement jusqu'au contraste demandé
+    rgb = np.asarray(rgb, dtype=np.float64)
+    for step in range(21):
+        candidate = _mix(rgb, towards, step * 0.05)
+        if contrast_ratio(candidate, against) >= minimum:
+            return candidate
+    return np.asarray(towards, dtype=np.float64)
+
+
+def palette_from_colors(colors: list) -> Optional[Dict[str, str]]:
+    """
+    Attribue les rôles primary / secondary / background / text à partir des couleurs dominantes,
+    en garantissant les contrastes WCAG : texte/fond >= 4.5, primary/fond >= 3.
+    """
+    if not colors:
+        return None
+    chromatic = [color for color in colors if _chroma(color) >= MIN_CHROMA]
+    # Couleur de marque : la plus saturée, pondérée par sa présence dans le logo
+    candidates = chromatic or colors
+    primary = max(candidates, key=lambda color: (_chroma(color) + 10) * np.sqrt(color["weight"]))
+
+    secondary = None
+    for color in chromatic:
+        if color is not primary and np.linalg.norm(color["lab"] - primary["lab"]) > 25:
+            secondary = color["rgb"]
+            break
+    if secondary is None:
+        # Teinte claire de la couleur principale, comme les palettes prédéfinies
+        secondary = _mix(primary["rgb"], (255, 255, 255), 0.75)
+
+    background = _mix(primary["rgb"], (255, 255, 255), 0.96)
+    darkest = min(colors, key=lambda color: color["lab"][0])
+    text_seed = darkest["rgb"] if darkest["lab"][0] < 35 else _mix(primary["rgb"], (0, 0, 0), 0.75)
+    text = _ensure_contrast(text_seed, background, TEXT_CONTRAST)
+    primary_rgb = _ensure_contrast(primary["rgb"], background, PRIMARY_CONTRAST)
+
+    return {
+        "primary": to_hex(primary_rgb),
+        "secondary": to_hex(secondary),
+        "background": to_hex(background),
+        "text": to_hex(text),
+    }
+
+
+class PaletteCache:
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._palettes: "OrderedDict[str, Optional[Dict[str, str]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, png: bytes) -> Optional[Dict[str, str]]:
+        key = hashlib.sha256(png).hexdigest()
+        with self._lock:
+            if key in self._palettes:
+                self.hits += 1
+                self._palettes.move_to_end(key)
+                palette = self._palettes[key]
+                return dict(palette) if palette else None
+            self.misses += 1
+        palette = palette_from_colors(dominant_colors(png))
+        with self._lock:
+            self._palettes[key] = palette
+            while len(self._palettes) > self.size:
+                self._palettes.popitem(last=False)
+        return dict(palette) if palette else None
+
+
+palette_cache = PaletteCache()
+
+
+def palette_from_logo(png: bytes) -> Optional[Dict[str, str]]:
+    return palette_cache.get_or_compute(png)
+
+
+def palette_from_logo_data_url(logo_url: str) -> Optional[Dict[str, str]]:
+    """
+    Palette d'un logo en data URL base64 ; None si le logo n'est pas une image embarquée.
+    """
+    if not logo_url or not logo_url.startswith("data:image") or "base64," not in logo_url:
+        return None
+    return palette_from_logo(base64.b64decode(logo_url.split("base64,", 1)[1]))
@@ -0,0 +1,207 @@
+import gzip
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+# Encodeurs optionnels : brotli et zstandard sont utilisés s'ils sont installés
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Taille minimale d'une réponse compressée (octets) : en dessous, le gain ne couvre pas le coût
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Au-delà de cette taille, la compression est faite dans le threadpool pour ne pas bloquer la boucle
+COMPRESSION_THREADPOOL_SIZE = 256 * 1024
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+# Types de contenu compressibles ; les images, archives et flux binaires ne le sont pas
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    # ZstdCompressor n'est pas thread-safe : un compresseur par appel
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def available_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """
+    Encodeurs disponibles, du préféré au moins préféré à qualité égale côté client.
+    """
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = _zstd_compress
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+    encoders["gzip"] = lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return encoders
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate_encoding(header: Optional[str], encoders: List[str]) -> Optional[str]:
+    """
+    Choisit l'encodage de plus haute qualité accepté par le client ; à qualité égale,
+    l'ordre de préférence du serveur (`encoders`) départage. "*" couvre les encodages non cités.
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for name in encoders:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";")[0].strip().lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+class CompressionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.encodings: Dict[str, dict] = {}
+        self.skipped = 0
+
+    def record(self, encoding: str, raw: int, compressed: int):
+        with self._lock:
+            stats = self.encodings.setdefault(encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0})
+            stats["responses"] += 1
+            stats["bytes_in"] += raw
+            stats["bytes_out"] += compressed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            encodings = {
+                name: dict(stats, ratio=round(stats["bytes_out"] / stats["bytes_in"], 3) if stats["bytes_in"] else None)
+                for name, stats in self.encodings.items()
+            }
+            return {"encodings": encodings, "skipped": self.skipped}
+
+
+compression_stats = CompressionStats()
+
+
+def _vary_only(send):
+    # Sans encodage négocié, la réponse varie quand même selon Accept-Encoding (caches partagés)
+    async def send_wrapper(message):
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            if is_compressible(headers.get("content-type", "")):
+                headers.add_vary_header("Accept-Encoding")
+        await send(message)
+    return send_wrapper
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compression négociée (zstd, br, gzip selon Accept-Encoding).
+
+    Seules les réponses envoyées en un seul bloc sont compressées : les réponses en streaming
+    (NDJSON, fichiers) passent telles quelles pour ne pas retarder leur premier octet.
+    Les réponses déjà encodées, non compressibles (images, binaires) ou plus petites que
+    `minimum_size` ne sont pas modifiées.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), list(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, _vary_only(send))
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            compressible = is_compressible(headers.get("content-type", ""))
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if (
+                message.get("more_body", False)
+                or not compressible
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+            ):
+                # Streaming, binaire, déjà encodé ou trop petit : transmis tel quel
+                passthrough = True
+                compression_stats.skipped += 1
+                await send(start)
+                await send(message)
+                return
+
+            compress = self.encoders[encoding]
+            if len(body) >= COMPRESSION_THREADPOOL_SIZE:
+                compressed = await run_in_threadpool(compress, body)
+            else:
+                compressed = compress(body)
+            if len(compressed) >= len(body):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            compression_stats.record(encoding, len(body), len(compressed))
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
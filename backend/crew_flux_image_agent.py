@@ -1,25 +1,45 @@
 import os
 import base64
+import threading
 from dotenv import load_dotenv
-import google.generativeai as genai # type: ignore
-import fal_client # type: ignore
-from PIL import Image
 from io import BytesIO
 
 # Load environment variables
 load_dotenv()
 
-# Set up Gemini
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY is not set in .env")
-genai.configure(api_key=GEMINI_API_KEY)
-gemini = genai.GenerativeModel('gemini-2.0-flash')
+# Gemini and fal.ai are configured on first use, so importing this module is cheap
+# and the API can start even when the keys are not set.
+_init_lock = threading.Lock()
+_gemini = None
 
-# Set up fal.ai
-FAL_API_KEY = os.getenv("FAL_KEY")
-if not FAL_API_KEY:
-    raise ValueError("FAL_API_KEY is not set in .env")
+
+def get_gemini():
+    global _gemini
+    with _init_lock:
+        if _gemini is None:
+            GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+            if not GEMINI_API_KEY:
+                raise ValueError("GEMINI_API_KEY is not set in .env")
+            import google.generativeai as genai # type: ignore
+            genai.configure(api_key=GEMINI_API_KEY)
+            _gemini = genai.GenerativeModel('gemini-2.0-flash')
+    return _gemini
+
+
+def get_fal_client():
+    FAL_API_KEY = os.getenv("FAL_KEY")
+    if not FAL_API_KEY:
+        raise ValueError("FAL_API_KEY is not set in .env")
+    import fal_client # type: ignore
+    return fal_client
+
+
+def _save_image_data_url(image_url, output_file):
+    from PIL import Image
+    base64_data = image_url.split('base64,')[1]
+    image_bytes = base64.b64decode(base64_data)
+    img = Image.open(BytesIO(image_bytes))
+    img.save(output_file)
 
 def get_image_prompt_from_gemini(topic):
     system_prompt = (
@@ -47,7 +67,7 @@ def get_image_prompt_from_gemini(topic):
 
     user_prompt = f"Topic: {topic}\n\nNow follow the steps above and provide the image prompt based on the topic given."
     
-    response = gemini.generate_content([system_prompt, user_prompt])
+    response = get_gemini().generate_content([system_prompt, user_prompt])
     return response.text.strip()
 
 
@@ -58,7 +78,7 @@ def generate_image_with_fal(prompt, output_file):
         "religious symbol, flag, logo, watermark"
     )
     print(f"Generating image for prompt: {prompt}")
-    result = fal_client.subscribe(
+    result = get_fal_client().subscribe(
         "fal-ai/flux/schnell",
         arguments={
             "prompt": prompt,
@@ -76,10 +96,7 @@ def generate_image_with_fal(prompt, output_file):
     )
     image_url = result['images'][0]['url']
     if 'base64,' in image_url:
-        base64_data = image_url.split('base64,')[1]
-        image_bytes = base64.b64decode(base64_data)
-        img = Image.open(BytesIO(image_bytes))
-        img.save(output_file)
+        _save_image_data_url(image_url, output_file)
         print(f"Image saved to {output_file}")
     else:
         print("Unexpected image URL format:", image_url)
@@ -109,22 +126,35 @@ def get_logo_prompt_from_gemini(topic):
         "Return ONLY the final logo prompt, ready to be used with a generative image model like Fal AI Flux. Do NOT include context, explanations, or labels."
     )
     user_prompt = f"Topic: {topic}\nFirst, understand the context. Then, generate a robust logo prompt by following tha above instructions:"
-    response = gemini.generate_content([system_prompt, user_prompt])
+    response = get_gemini().generate_content([system_prompt, user_prompt])
     return response.text.strip()
 
-def generate_logo_with_fal(prompt, output_file):
+# fal.ai returns at most 4 images per request
+MAX_LOGOS_PER_CALL = 4
+
+
+def _data_url_to_png(image_url):
+    from PIL import Image
+    image_bytes = base64.b64decode(image_url.split('base64,')[1])
+    buffer = BytesIO()
+    Image.open(BytesIO(image_bytes)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def generate_logos_with_fal(prompt, num_images=1):
+    """Generate several logo candidates for one prompt in a single fal call; returns PNG bytes."""
     negative_prompt = (
         "text, words, letters, numbers, signature, watermark, low quality, blurry, human faces, realistic photos, clutter"
     )
-    print(f"Generating logo for prompt: {prompt}")
-    result = fal_client.subscribe(
+    num_images = max(1, min(num_images, MAX_LOGOS_PER_CALL))
+    print(f"Generating {num_images} logo(s) for prompt: {prompt}")
+    result = get_fal_client().subscribe(
         "fal-ai/flux/schnell",
         arguments={
             "prompt": prompt,
             "negative_prompt": negative_prompt,
             "image_size": {"width": 512, "height": 512},
             "num_inference_steps": 6,
-            "num_images": 1,
+            "num_images": num_images,
             "true_cfg": 9.0,
             "guidance_scale": 2.0,
             "quality": "premium",
@@ -133,15 +163,21 @@ def generate_logo_with_fal(prompt, output_file):
         },
         with_logs=True,
     )
-    image_url = result['images'][0]['url']
-    if 'base64,' in image_url:
-        base64_data = image_url.split('base64,')[1]
-        image_bytes = base64.b64decode(base64_data)
-        img = Image.open(BytesIO(image_bytes))
-        img.save(output_file)
+    logos = []
+    for image in result['images']:
+        if 'base64,' in image['url']:
+            logos.append(_data_url_to_png(image['url']))
+        else:
+            print("Unexpected image URL format:", image['url'])
+    return logos
+
+def generate_logo_with_fal(prompt, output_file):
+    logos = generate_logos_with_fal(prompt, num_images=1)
+    if logos:
+        with open(output_file, "wb") as f:
+            f.write(logos[0])
         print(f"Logo saved to {output_file}")
-    else:
-        print("Unexpected image URL format:", image_url)
+
 
  
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import json_codec
+
+# Kit Elementor « Global Kit Styles » : les couleurs dépendant de la palette sont des jetons {{rôle}}
+KIT_TEMPLATE_PATH = Path(__file__).resolve().parent / "templates" / "elementor_kit.json"
+# Dernier kit importé et kits déjà présents dans la médiathèque, par site
+KIT_STATE_PATH = os.getenv("ELEMENTOR_KIT_STATE_PATH", "./cache/elementor_kits.json")
+
+PALETTE_ROLES = ("primary", "secondary", "background", "text")
+
+_TOKEN = re.compile(rb'"\{\{(\w+)\}\}"')
+_COLOR = re.compile(r"#[0-9A-Fa-f]{3}(?:[0-9A-Fa-f]{3})?(?:[0-9A-Fa-f]{2})?")
+
+_template_lock = threading.Lock()
+_template: Optional[list] = None
+
+
+def _load_template() -> list:
+    """
+    Charge le modèle une seule fois et le découpe en fragments d'octets autour des jetons :
+    [b"...", "primary", b"...", "text", ...]. Construire un kit revient alors à concaténer.
+    """
+    global _template
+    with _template_lock:
+        if _template is None:
+            raw = json_codec.dumps(json_codec.loads(KIT_TEMPLATE_PATH.read_bytes()))
+            parts = _TOKEN.split(raw)
+            for role in parts[1::2]:
+                if role.decode() not in PALETTE_ROLES:
+                    raise ValueError(f"Jeton inconnu dans le modèle de kit: {role.decode()}")
+            _template = [part.decode() if index % 2 else part for index, part in enumerate(parts)]
+        return _template
+
+
+def build_kit(color_palette: Dict[str, str]) -> Tuple[bytes, str]:
+    """
+    Retourne (kit JSON en octets, hash SHA-256 du kit) pour une palette
+    {"primary", "secondary", "background", "text"}.
+    """
+    values = {}
+    for role in PALETTE_ROLES:
+        color = color_palette.get(role)
+        if not isinstance(color, str) or not _COLOR.fullmatch(color):
+            raise ValueError(f"Couleur invalide pour '{role}': {color!r}")
+        values[role] = json_codec.dumps(color)
+    parts = _load_template()
+    kit = b"".join(values[part] if index % 2 else part for index, part in enumerate(parts))
+    return kit, hashlib.sha256(kit).hexdigest()
+
+
+def kit_filename(kit_hash: str) -> str:
+    # Le hash dans le nom rend le fichier de la médiathèque identifiable et réutilisable
+    return f"global-kit-{kit_hash[:16]}.json"
+
+
+class KitRegistry:
+    """
+    Mémorise, par site WordPress, le hash du kit actuellement importé et l'URL des kits
+    déjà téléversés, pour ne refaire ni l'upload ni l'import d'un kit inchangé.
+    """
+
+    def __init__(self, path: str = KIT_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sites: Optional[dict] = None
+
+    def _state(self) -> dict:
+        if self._sites is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._sites = json.load(f)
+            except FileNotFoundError:
+                self._sites = {}
+            except Exception as e:
+                print(f"[WordPress] Registre des kits illisible, réinitialisé: {str(e)}")
+                self._sites = {}
+        return self._sites
+
+    def _site(self, site: str) -> dict:
+        return self._state().setdefault(site, {"active": None, "uploads": {}})
+
+    def active(self, site: str) -> Optional[str]:
+        with self._lock:
+            return self._state().get(site, {}).get("active")
+
+    def uploaded_url(self, site: str, kit_hash: str) -> Optional[str]:
+        with self._lock:
+            return self._state().get(site, {}).get("uploads", {}).get(kit_hash)
+
+    def record_upload(self, site: str, kit_hash: str, kit_url: str):
+        with self._lock:
+            self._site(site)["uploads"][kit_hash] = kit_url
+            self._save()
+
+    def record_import(self, site: str, kit_hash: str):
+        with self._lock:
+            self._site(site)["active"] = kit_hash
+            self._save()
+
+    def forget(self, site: str, kit_hash: Optional[str] = None):
+        """
+        Oublie un kit téléversé (fichier supprimé de la médiathèque) ou tout le site.
+        """
+        with self._lock:
+            if kit_hash is None:
+                self._state().pop(site, None)
+            else:
+                self._site(site)["uploads"].pop(kit_hash, None)
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._sites, f, indent=2)
+            os.replace(temp_path, self.path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+
+kit_registry = KitRegistry()
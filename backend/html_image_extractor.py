@@ -0,0 +1,143 @@
+import codecs
+from html.parser import HTMLParser
+from typing import Iterable, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+# Lecture maximale d'une page source (octets décodés) et taille des blocs lus
+DEFAULT_MAX_BYTES = 512 * 1024
+CHUNK_SIZE = 16 * 1024
+# Images ignorées : icônes, logos et images déclarées plus petites que ce seuil (px)
+EXCLUDED_KEYWORDS = ("icon", "logo")
+MIN_DECLARED_SIZE = 100
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+OG_IMAGE_PROPERTIES = ("og:image", "og:image:url", "og:image:secure_url", "twitter:image")
+
+
+def _declared_size_too_small(attrs: dict) -> bool:
+    for name in ("width", "height"):
+        value = (attrs.get(name) or "").strip().lower().rstrip("px")
+        if value.isdigit() and int(value) < MIN_DECLARED_SIZE:
+            return True
+    return False
+
+
+class _ImageFinder(HTMLParser):
+    """
+    Parseur incrémental qui collecte les premières images qualifiées (og:image ou <img>)
+    dans l'ordre du document.
+    """
+
+    def __init__(self, base_url: str, limit: int):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.limit = limit
+        self.found: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.found) >= self.limit
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attrs = {name: value or "" for name, value in attrs}
+        if tag == "base" and attrs.get("href"):
+            self.base_url = urljoin(self.base_url, attrs["href"])
+        elif tag == "meta":
+            prop = (attrs.get("property") or attrs.get("name") or "").lower()
+            if prop in OG_IMAGE_PROPERTIES:
+                self._add(attrs.get("content", ""))
+        elif tag == "img" and not _declared_size_too_small(attrs):
+            src = attrs.get("src") or attrs.get("data-src")
+            if not src and attrs.get("srcset"):
+                src = attrs["srcset"].split(",")[0].strip().split(" ")[0]
+            self._add(src or "")
+
+    def _add(self, url: str):
+        url = url.strip()
+        if not url or url.startswith("data:"):
+            return
+        resolved = urljoin(self.base_url, url)
+        parsed = urlparse(resolved)
+        if parsed.scheme not in ("http", "https"):
+            return
+        lowered = resolved.lower()
+        if any(keyword in lowered for keyword in EXCLUDED_KEYWORDS) or parsed.path.lower().endswith(".svg"):
+            return
+        if resolved not in self.found:
+            self.found.append(resolved)
+
+
+def extract_image_candidates(
+    chunks: Iterable[bytes],
+    base_url: str,
+    limit: int = 1,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    encoding: str = "utf-8",
+) -> List[str]:
+    """
+    Parse le HTML bloc par bloc et s'arrête dès que `limit` images qualifiées sont trouvées
+    ou que `max_bytes` octets ont été lus. Les URLs relatives sont résolues.
+    """
+    parser = _ImageFinder(base_url, limit)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    read = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        chunk = chunk[:max_bytes - read]
+        read += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.done or read >= max_bytes:
+            break
+    return parser.found[:limit]
+
+
+def _charset(response) -> str:
+    content_type = response.headers.get("Content-Type", "")
+    for part in content_type.split(";")[1:]:
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "charset" and value:
+            try:
+                return codecs.lookup(value.strip('"\'')).name
+            except LookupError:
+                break
+    return "utf-8"
+
+
+def fetch_page_image_candidates(
+    url: str,
+    limit: int = 1,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    timeout: float = 10,
+    session: Optional[requests.Session] = None,
+) -> List[str]:
+    """
+    Télécharge la page en streaming et retourne ses premières images qualifiées.
+    La connexion est fermée dès que le résultat est connu.
+    """
+    http = session or requests
+    with http.get(url, timeout=timeout, headers=BROWSER_HEADERS, stream=True) as response:
+        if response.status_code != 200:
+            return []
+        content_type = response.headers.get("Content-Type", "text/html").lower()
+        if "html" not in content_type:
+            return []
+        return extract_image_candidates(
+            response.iter_content(CHUNK_SIZE),
+            response.url or url,
+            limit=limit,
+            max_bytes=max_bytes,
+            encoding=_charset(response),
+        )
+
+
+def fetch_page_image(url: str, **kwargs) -> Optional[str]:
+    candidates = fetch_page_image_candidates(url, limit=1, **kwargs)
+    return candidates[0] if candidates else None
@@ -0,0 +1,163 @@
+import struct
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Iterable, List, Optional, Tuple
+
+import requests
+
+from html_image_extractor import BROWSER_HEADERS
+
+# Octets lus au maximum par image (requête Range) : assez pour trouver l'en-tête de dimensions
+PROBE_BYTES = 32 * 1024
+# Dimensions minimales d'une image d'article
+MIN_WIDTH = 400
+MIN_HEIGHT = 250
+# Budget de latence total pour sonder tous les candidats (secondes)
+DEFAULT_BUDGET = 3.0
+MAX_CANDIDATES = 6
+
+# Pool partagé : les sondes de plusieurs requêtes /api/article s'exécutent en parallèle
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="image-probe")
+
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            i += 1 if marker == 0xFF else 2
+            continue
+        segment_length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + segment_length
+    return None
+
+
+def sniff_image(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """
+    Lit le format et les dimensions dans les premiers octets d'une image.
+    Retourne (format, largeur, hauteur) ou None si l'en-tête n'est pas reconnu ou incomplet.
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return "webp", width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            width = int.from_bytes(data[24:27], "little") + 1
+            height = int.from_bytes(data[27:30], "little") + 1
+            return "webp", width, height
+    if data[:2] == b"\xff\xd8":
+        dimensions = _jpeg_dimensions(data)
+        if dimensions:
+            return ("jpeg",) + dimensions
+    if data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis", b"heic", b"mif1"):
+        index = data.find(b"ispe")
+        if index != -1 and len(data) >= index + 16:
+            width, height = struct.unpack(">II", data[index + 8:index + 16])
+            return "avif", width, height
+    return None
+
+
+def score_image(width: int, height: int) -> float:
+    """
+    Favorise les grandes images au format paysage (bannière / image d'article).
+    """
+    area = min(width * height, 1920 * 1080) / (1920 * 1080)
+    ratio = width / height if height else 0
+    if 1.2 <= ratio <= 2.4:
+        aspect = 1.0
+    elif 0.9 <= ratio < 1.2:
+        aspect = 0.8
+    else:
+        aspect = 0.5
+    return round(area * aspect, 4)
+
+
+def probe_image(url: str, max_bytes: int = PROBE_BYTES, timeout: float = DEFAULT_BUDGET, session=None) -> Optional[dict]:
+    """
+    Télécharge uniquement le début de l'image (Range) pour vérifier son type et ses dimensions.
+    """
+    http = session or requests
+    headers = dict(BROWSER_HEADERS, Range=f"bytes=0-{max_bytes - 1}")
+    with http.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code not in (200, 206):
+            return None
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and not content_type.startswith("image/") and content_type != "application/octet-stream":
+            return None
+        data = b""
+        sniffed = None
+        for chunk in response.iter_content(4096):
+            data += chunk
+            sniffed = sniff_image(data)
+            if sniffed or len(data) >= max_bytes:
+                break
+    if not sniffed:
+        return None
+    image_format, width, height = sniffed
+    return {
+        "url": url,
+        "content_type": content_type or f"image/{image_format}",
+        "format": image_format,
+        "width": width,
+        "height": height,
+        "score": score_image(width, height),
+    }
+
+
+def rank_image_candidates(
+    urls: Iterable[str],
+    budget: float = DEFAULT_BUDGET,
+    min_width: int = MIN_WIDTH,
+    min_height: int = MIN_HEIGHT,
+    max_candidates: int = MAX_CANDIDATES,
+) -> List[dict]:
+    """
+    Sonde les candidats en parallèle dans le budget de latence donné, rejette les images
+    trop petites, cassées ou qui ne sont pas des images, et trie les autres par score.
+    Les sondes encore en cours à l'expiration du budget sont abandonnées.
+    """
+    unique_urls = []
+    for url in urls:
+        if url and url.startswith(("http://", "https://")) and url not in unique_urls:
+            unique_urls.append(url)
+    futures = [_executor.submit(probe_image, url, timeout=budget) for url in unique_urls[:max_candidates]]
+    if not futures:
+        return []
+    done, not_done = wait(futures, timeout=budget)
+    for future in not_done:
+        future.cancel()
+
+    ranked = []
+    for future in done:
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"[Images] Sonde échouée: {str(e)}")
+            continue
+        if result and result["width"] >= min_width and result["height"] >= min_height:
+            ranked.append(result)
+    ranked.sort(key=lambda r: r["score"], reverse=True)
+    print(f"[Images] {len(ranked)}/{len(futures)} candidats retenus ({len(not_done)} hors budget)")
+    return ranked
+
+
+def best_image(urls: Iterable[str], **kwargs) -> Optional[str]:
+    ranked = rank_image_candidates(urls, **kwargs)
+    return ranked[0]["url"] if ranked else None
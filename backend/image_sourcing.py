@@ -0,0 +1,135 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Optional
+
+import requests
+from starlette.concurrency import run_in_threadpool
+
+from html_image_extractor import fetch_page_image_candidates
+from image_probe import MAX_CANDIDATES, best_image
+
+# Échéance par défaut de la course entre sources d'images (secondes)
+DEFAULT_DEADLINE = 8.0
+
+# Ordre de préférence des sources (plus petit = meilleur)
+SOURCE_PRIORITY = {
+    "serp": 0,
+    "page": 1,
+    "unsplash": 2,
+    "fal": 3,
+}
+
+
+def serp_api_key() -> str:
+    return os.getenv("SERP_API_KEY", "be83482fbc42759f8b772badebee33da859d05e98b88506bb2b7bc4e9e33fe56")
+
+
+def search_serp_image(query: str) -> Optional[str]:
+    """
+    Recherche Google Images via SERP API, puis sonde les résultats et retourne le meilleur.
+    """
+    search_url = f"https://serpapi.com/search.json?q={query.replace(' ', '+')}&api_key={serp_api_key()}&engine=google&tbm=isch&num=5"
+    print(f"Envoi de la requête à SERP API pour les images: {search_url}")
+    response = requests.get(search_url, timeout=15)
+    print(f"Réponse SERP API (images): {response.status_code}")
+    if response.status_code == 429:
+        print("Limite de requêtes SERP API atteinte")
+        return None
+    if response.status_code != 200:
+        return None
+    images_results = response.json().get("images_results", [])
+    # Sonder les candidats en parallèle et prendre la meilleure image valide
+    article_image_url = best_image([result.get("original", "") for result in images_results])
+    if article_image_url:
+        print(f"Image trouvée via SERP API: {article_image_url}")
+    return article_image_url
+
+
+def search_unsplash_image(query: str) -> Optional[str]:
+    unsplash_url = f"https://source.unsplash.com/featured/?{query.replace(' ', '+')}"
+    unsplash_response = requests.get(unsplash_url, allow_redirects=True, timeout=10)
+    if unsplash_response.status_code == 200:
+        print(f"Image trouvée via Unsplash: {unsplash_response.url}")
+        return unsplash_response.url
+    return None
+
+
+def scrape_page_image(link: str) -> Optional[str]:
+    # Lecture en streaming des premières images, puis sondage de leurs dimensions
+    article_image_url = best_image(fetch_page_image_candidates(link, limit=MAX_CANDIDATES, timeout=10))
+    if article_image_url:
+        print(f"Image extraite de la page: {article_image_url}")
+    return article_image_url
+
+
+async def race_image_sources(
+    sources: Dict[str, Callable[[], Awaitable[Optional[str]]]],
+    deadline: float = DEFAULT_DEADLINE,
+) -> Optional[dict]:
+    """
+    Lance toutes les sources en concurrence et retourne {"source", "url"} du meilleur résultat
+    (selon SOURCE_PRIORITY) disponible à l'échéance. La course s'arrête plus tôt dès qu'aucune
+    source encore en cours ne peut battre le meilleur résultat ; les perdantes sont annulées
+    (les appels HTTP déjà partis dans le threadpool se terminent sur leur propre timeout,
+    leur résultat est ignoré).
+    """
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    names = {asyncio.ensure_future(factory()): name for name, factory in sources.items()}
+    pending = set(names)
+    best = None
+    try:
+        while pending:
+            remaining = end - loop.time()
+            if remaining <= 0:
+                print(f"[Images] Échéance atteinte, {len(pending)} source(s) abandonnée(s)")
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = names[task]
+                try:
+                    url = task.result()
+                except Exception as e:
+                    print(f"[Images] Source {name} en erreur: {str(e)}")
+                    continue
+                if url and (best is None or SOURCE_PRIORITY[name] < SOURCE_PRIORITY[best["source"]]):
+                    best = {"source": name, "url": url}
+            if best and all(SOURCE_PRIORITY[names[task]] > SOURCE_PRIORITY[best["source"]] for task in pending):
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+    return best
+
+
+async def source_article_image(
+    query: str,
+    links_task: Optional["asyncio.Future"] = None,
+    deadline: float = DEFAULT_DEADLINE,
+    fal_fallback: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+) -> Optional[dict]:
+    """
+    Trouve une image d'article en faisant courir SERP, la page du premier résultat organique
+    (dès que `links_task` fournit ses liens) et Unsplash sous une même échéance.
+    Si aucune source n'aboutit et que `fal_fallback` est fourni, l'image est générée (dernier niveau).
+    """
+    async def page():
+        if links_task is None:
+            return None
+        links = await links_task
+        return await run_in_threadpool(scrape_page_image, links[0]) if links and links[0] else None
+
+    best = await race_image_sources({
+        "serp": lambda: run_in_threadpool(search_serp_image, query),
+        "page": page,
+        "unsplash": lambda: run_in_threadpool(search_unsplash_image, query),
+    }, deadline=deadline)
+
+    if best is None and fal_fallback is not None:
+        print("[Images] Aucune image trouvée, génération avec fal")
+        url = await fal_fallback()
+        if url:
+            best = {"source": "fal", "url": url}
+    if best:
+        print(f"[Images] Image retenue ({best['source']}): {best['url'][:100]}")
+    return best
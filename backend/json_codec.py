@@ -0,0 +1,48 @@
+import json
+import os
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+
+# Codec JSON utilisé pour les fichiers de session et les réponses de l'API :
+# "orjson" si disponible (beaucoup plus rapide sur les longues chaînes base64 / Markdown),
+# sinon la bibliothèque standard. JSON_CODEC=json force la bibliothèque standard.
+_requested = os.getenv("JSON_CODEC", "orjson").lower()
+
+try:
+    if _requested != "orjson":
+        raise ImportError
+    import orjson
+    CODEC = "orjson"
+except ImportError:
+    orjson = None
+    CODEC = "json"
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Encode en UTF-8 (sans échappement des caractères non ASCII).
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Réponse JSON par défaut de l'API, encodée avec le codec courant.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,154 @@
+import io
+from typing import List, Sequence
+
+import numpy as np
+
+# Taille de travail des métriques (les logos fal font 512x512)
+ANALYSIS_SIZE = 256
+# Taille d'affichage typique d'un logo (favicon, en-tête) pour la mesure du détail
+DETAIL_SIZE = 64
+
+# Poids des métriques dans le score global
+WEIGHTS = {
+    "centering": 0.3,
+    "background": 0.25,
+    "colors": 0.2,
+    "detail": 0.25,
+}
+
+
+def open_rgba(png: bytes):
+    from PIL import Image
+    return Image.open(io.BytesIO(png)).convert("RGBA")
+
+
+def load_rgba(image, size: int = ANALYSIS_SIZE) -> np.ndarray:
+    from PIL import Image
+    if max(image.size) > size:
+        image = image.resize((size, size), Image.BILINEAR)
+    return np.asarray(image, dtype=np.float32)
+
+
+def _border(pixels: np.ndarray, width: int = 4) -> np.ndarray:
+    return np.concatenate([
+        pixels[:width].reshape(-1, pixels.shape[-1]),
+        pixels[-width:].reshape(-1, pixels.shape[-1]),
+        pixels[:, :width].reshape(-1, pixels.shape[-1]),
+        pixels[:, -width:].reshape(-1, pixels.shape[-1]),
+    ])
+
+
+def foreground_mask(rgba: np.ndarray):
+    """
+    Retourne (masque du motif, score de fond). Avec transparence, le fond est la zone
+    transparente et son score la part de bordure transparente ; sinon le fond est la couleur
+    médiane de la bordure et son score mesure son uniformité.
+    """
+    alpha = rgba[..., 3]
+    border = _border(rgba)
+    if (alpha < 250).mean() > 0.01:
+        return alpha > 32, float((border[:, 3] < 32).mean())
+    background = np.median(border[:, :3], axis=0)
+    distance = np.linalg.norm(rgba[..., :3] - background, axis=-1)
+    border_spread = float(np.linalg.norm(border[:, :3] - background, axis=-1).mean())
+    return distance > 40, float(np.clip(1 - border_spread / 48, 0, 1))
+
+
+def centering_score(mask: np.ndarray) -> float:
+    """
+    Motif centré et entouré de marges : centre de la boîte englobante proche du centre de
+    l'image, boîte occupant entre ~20 % et ~80 % de la surface.
+    """
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0:
+        return 0.0
+    height, width = mask.shape
+    center_y = (rows[0] + rows[-1] + 1) / 2 / height
+    center_x = (cols[0] + cols[-1] + 1) / 2 / width
+    offset = max(abs(center_x - 0.5), abs(center_y - 0.5)) / 0.5
+    area = (rows[-1] - rows[0] + 1) * (cols[-1] - cols[0] + 1) / (height * width)
+    if area < 0.2:
+        fill = area / 0.2
+    elif area > 0.8:
+        fill = max(0.0, 1 - (area - 0.8) / 0.2)
+    else:
+        fill = 1.0
+    return float(np.clip(1 - offset, 0, 1) * (0.5 + 0.5 * fill))
+
+
+def dominant_color_count(rgba: np.ndarray, mask: np.ndarray, coverage: float = 0.9) -> int:
+    """
+    Nombre de couleurs (quantifiées sur 3 bits par canal) nécessaires pour couvrir `coverage`
+    des pixels du motif.
+    """
+    pixels = rgba[..., :3][mask].astype(np.uint8) >> 5
+    if pixels.size == 0:
+        return 0
+    codes = (pixels[:, 0].astype(np.int32) << 6) | (pixels[:, 1].astype(np.int32) << 3) | pixels[:, 2]
+    counts = np.sort(np.bincount(codes, minlength=512))[::-1]
+    return int(np.searchsorted(np.cumsum(counts), coverage * pixels.shape[0]) + 1)
+
+
+def colors_score(count: int) -> float:
+    # Le prompt demande 2 à 3 couleurs
+    if count == 0:
+        return 0.0
+    if 2 <= count <= 3:
+        return 1.0
+    if count in (1, 4):
+        return 0.7
+    return float(max(0.0, 0.7 - 0.1 * (count - 4)))
+
+
+def detail_score(image) -> float:
+    """
+    Lisibilité en petit : densité de contours à 64 px. Trop peu de contours (logo vide ou flou)
+    ou trop (texture, bruit) sont pénalisés ; l'idéal est autour de 5 à 25 % de pixels de contour.
+    """
+    from PIL import Image
+    small = np.asarray(image.resize((DETAIL_SIZE, DETAIL_SIZE), Image.LANCZOS), dtype=np.float32)
+    # Luminance composée sur fond blanc (les zones transparentes comptent comme fond)
+    alpha = small[..., 3:] / 255
+    rgb = small[..., :3] * alpha + 255 * (1 - alpha)
+    luminance = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    gradient = np.hypot(np.diff(luminance, axis=0)[:, :-1], np.diff(luminance, axis=1)[:-1, :])
+    density = float((gradient > 24).mean())
+    if density < 0.05:
+        return density / 0.05
+    if density > 0.25:
+        return float(max(0.0, 1 - (density - 0.25) / 0.35))
+    return 1.0
+
+
+def score_logo(png: bytes) -> dict:
+    image = open_rgba(png)
+    rgba = load_rgba(image)
+    mask, background = foreground_mask(rgba)
+    count = dominant_color_count(rgba, mask)
+    metrics = {
+        "centering": round(centering_score(mask), 3),
+        "background": round(background, 3),
+        "colors": round(colors_score(count), 3),
+        "detail": round(detail_score(image), 3),
+    }
+    score = sum(WEIGHTS[name] * value for name, value in metrics.items())
+    return {"score": round(score, 3), "dominant_colors": count, "metrics": metrics}
+
+
+def rank_logos(pngs: Sequence[bytes]) -> List[dict]:
+    """
+    Évalue chaque candidat et les retourne du meilleur au moins bon :
+    [{"index", "score", "dominant_colors", "metrics"}, ...].
+    Un candidat illisible reçoit un score nul au lieu de faire échouer le classement.
+    """
+    ranked = []
+    for index, png in enumerate(pngs):
+        try:
+            quality = score_logo(png)
+        except Exception as e:
+            print(f"[Logos] Évaluation impossible du candidat {index}: {str(e)}")
+            quality = {"score": 0.0, "dominant_colors": 0, "metrics": {}}
+        ranked.append(dict(quality, index=index))
+    ranked.sort(key=lambda quality: quality["score"], reverse=True)
+    return ranked
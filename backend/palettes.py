@@ -0,0 +1,317 @@
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Palettes prédéfinies des sites générés
+PREDEFINED_PALETTES = [
+    {
+        "primary": "#0077b6",
+        "secondary": "#E8F0FE",
+        "background": "#FFFFFF",
+        "text": "#202124",
+    },
+    {
+        "primary": "#b2967d",
+        "secondary": "#d5bdaf",
+        "background": "#F5F5F5",
+        "text": "#504b43",
+    },
+    {
+        "primary": "#e76f51",
+        "secondary": "#f4a261",
+        "background": "#FFFFFF",
+        "text": "#212121",
+    },
+    {
+        "primary": "#009688",
+        "secondary": "#B2DFDB",
+        "background": "#FAFAFA",
+        "text": "#263238",
+    },
+    {
+        "primary": "#3F51B5",
+        "secondary": "#C5CAE9",
+        "background": "#FDFDFD",
+        "text": "#212121",
+    },
+    {
+        "primary": "#00BCD4",
+        "secondary": "#B2EBF2",
+        "background": "#FFFFFF",
+        "text": "#023e8a",
+    },
+    {
+        "primary": "#E91E63",
+        "secondary": "#F8BBD0",
+        "background": "#FFFFFF",
+        "text": "#355070",
+    },
+    {
+        "primary": "#f28482",
+        "secondary": "#FFCDD2",
+        "background": "#FFFFFF",
+        "text": "#212121",
+    },
+    {
+        "primary": "#588157",
+        "secondary": "#C8E6C9",
+        "background": "#F8F8F8",
+        "text": "#344e41",
+    },
+    {
+        "primary": "#db7c26",
+        "secondary": "#FFF8E1",
+        "background": "#FAFAFA",
+        "text": "#212121",
+    },
+    {
+        "primary": "#5e548e",
+        "secondary": "#9f86c0",
+        "background": "#FFFFFF",
+        "text": "#1A1A1A",
+    },
+    {
+        "primary": "#17c3b2",
+        "secondary": "#CFD8DC",
+        "background": "#f5f3f4",
+        "text": "#227c9d",
+    },
+    {
+        "primary": "#8a817c",
+        "secondary": "#bcb8b1",
+        "background": "#f4f3ee",
+        "text": "#463f3a",
+    },
+    {
+        "primary": "#a6a2a2",
+        "secondary": "#cfd2cd",
+        "background": "#fbfbf2",
+        "text": "#847577",
+    },
+    {
+        "primary": "#006494",
+        "secondary": "#4cc9f0",
+        "background": "#d6e3f8",
+        "text": "#006daa",
+    },
+    {
+        "primary": "#304d6d",
+        "secondary": "#82a0bc",
+        "background": "#d6e3f8",
+        "text": "#545e75",
+    },
+    {
+        "primary": "#007ea7",
+        "secondary": "#B3E5FC",
+        "background": "#F9FAFB",
+        "text": "#01579B",
+    },
+    {
+        "primary": "#00ACC1",
+        "secondary": "#E0F7FA",
+        "background": "#FFFFFF",
+        "text": "#263238",
+    },
+    {
+        "primary": "#C2185B",
+        "secondary": "#F48FB1",
+        "background": "#FFFFFF",
+        "text": "#1C1C1C",
+    },
+    {
+        "primary": "#3da35d",
+        "secondary": "#A5D6A7",
+        "background": "#e8fccf",
+        "text": "#134611",
+    },
+    {
+        "primary": "#303F9F",
+        "secondary": "#C5CAE9",
+        "background": "#FFFFFF",
+        "text": "#1A1A1A",
+    },
+    {
+        "primary": "#5D4037",
+        "secondary": "#D7CCC8",
+        "background": "#FAFAFA",
+        "text": "#3E2723",
+    },
+    {
+        "primary": "#0097A7",
+        "secondary": "#B2EBF2",
+        "background": "#F5F5F5",
+        "text": "#004D40",
+    },
+    {
+        "primary": "#ad2e24",
+        "secondary": "#c75146",
+        "background": "#FFFFFF",
+        "text": "#3E2723",
+    },
+    {
+        "primary": "#7B1FA2",
+        "secondary": "#E1BEE7",
+        "background": "#FDFDFD",
+        "text": "#1A1A1A",
+    },
+    {
+        "primary": "#1E88E5",
+        "secondary": "#BBDEFB",
+        "background": "#FFFFFF",
+        "text": "#0D47A1",
+    },
+    {
+        "primary": "#43A047",
+        "secondary": "#C8E6C9",
+        "background": "#FAFAFA",
+        "text": "#1B5E20",
+    },
+    {
+        "primary": "#b5838d",
+        "secondary": "#F8BBD0",
+        "background": "#ffebe7",
+        "text": "#6d6875",
+    },
+    {
+        "primary": "#6D4C41",
+        "secondary": "#D7CCC8",
+        "background": "#FFF",
+        "text": "#3E2723",
+    },
+    {
+        "primary": "#607D8B",
+        "secondary": "#B0BEC5",
+        "background": "#FFFFFF",
+        "text": "#263238",
+    },
+]
+
+# Couleur représentative de chaque schéma retourné par l'analyse de thème
+SCHEME_COLORS = {
+    "vert": "#43A047",
+    "bleu": "#1E88E5",
+    "violet": "#7B1FA2",
+    "rouge": "#C62828",
+    "orange": "#EF6C00",
+    "jaune": "#F9A825",
+}
+
+# Contraste WCAG AA minimal texte / fond pour qu'une palette soit proposée par l'index
+MIN_TEXT_CONTRAST = 4.5
+
+
+def hex_to_rgb(color: str) -> Tuple[int, int, int]:
+    value = color.lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    return int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16)
+
+
+class KDTree:
+    """
+    Arbre k-d minimal (points de dimension fixe) : construction en O(n log n),
+    plus proche voisin en O(log n) en moyenne.
+    """
+
+    def __init__(self, points: List[Tuple[float, ...]]):
+        self.points = points
+        self._root = self._build(list(range(len(points))), 0)
+
+    def _build(self, indices: List[int], depth: int):
+        if not indices:
+            return None
+        axis = depth % len(self.points[indices[0]])
+        indices.sort(key=lambda i: self.points[i][axis])
+        middle = len(indices) // 2
+        return (
+            indices[middle],
+            axis,
+            self._build(indices[:middle], depth + 1),
+            self._build(indices[middle + 1:], depth + 1),
+        )
+
+    def nearest(self, target: Sequence[float]) -> Tuple[int, float]:
+        """
+        Retourne (indice du point le plus proche, distance euclidienne).
+        """
+        best = [-1, math.inf]
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            distance = math.dist(self.points[index], target)
+            if distance < best[1]:
+                best[0], best[1] = index, distance
+            delta = target[axis] - self.points[index][axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            visit(near)
+            if abs(delta) < best[1]:
+                visit(far)
+
+        visit(self._root)
+        return best[0], best[1]
+
+
+class PaletteIndex:
+    """
+    Index des palettes : coordonnées CIELAB de la couleur principale, contrastes WCAG,
+    et arbre k-d sur les coordonnées CIELAB des palettes accessibles.
+    Les conversions de couleurs sont celles de color_palette (une seule implémentation).
+    """
+
+    def __init__(self, palettes: List[Dict[str, str]], min_text_contrast: float = MIN_TEXT_CONTRAST):
+        import numpy as np
+        from color_palette import contrast_ratio, rgb_to_lab
+
+        # Toutes les couleurs principales converties en une seule passe vectorisée
+        labs = rgb_to_lab(np.array([hex_to_rgb(palette["primary"]) for palette in palettes]))
+        self.entries = []
+        for palette, lab in zip(palettes, labs.tolist()):
+            background = hex_to_rgb(palette["background"])
+            self.entries.append({
+                "palette": palette,
+                "lab": tuple(lab),
+                "text_contrast": contrast_ratio(hex_to_rgb(palette["text"]), background),
+                "primary_contrast": contrast_ratio(hex_to_rgb(palette["primary"]), background),
+            })
+        accessible = [entry for entry in self.entries if entry["text_contrast"] >= min_text_contrast]
+        self._candidates = accessible or self.entries
+        self._tree = KDTree([entry["lab"] for entry in self._candidates])
+
+    def nearest(self, color: str) -> dict:
+        """
+        Palette accessible dont la couleur principale est perceptuellement la plus proche de `color`.
+        """
+        import numpy as np
+        from color_palette import rgb_to_lab
+
+        lab = rgb_to_lab(np.array(hex_to_rgb(color))).tolist()
+        index, distance = self._tree.nearest(lab)
+        return dict(self._candidates[index], distance=distance)
+
+
+_index_lock = threading.Lock()
+_palette_index: Optional[PaletteIndex] = None
+
+
+def get_palette_index() -> PaletteIndex:
+    """
+    Index construit une seule fois, au premier usage : NumPy n'est pas importé au démarrage de l'API.
+    """
+    global _palette_index
+    with _index_lock:
+        if _palette_index is None:
+            _palette_index = PaletteIndex(PREDEFINED_PALETTES)
+        return _palette_index
+
+
+def palette_for_scheme(scheme: str) -> Dict[str, str]:
+    """
+    Palette correspondant à un schéma de l'analyse de thème ("vert", "bleu"...).
+    Le schéma "default" (ou inconnu) retourne la première palette prédéfinie.
+    """
+    color = SCHEME_COLORS.get(scheme)
+    if color is None:
+        return dict(PREDEFINED_PALETTES[0])
+    return dict(get_palette_index().nearest(color)["palette"])
@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Préchargement spéculatif (désactivé par défaut ; une requête peut le demander avec "prefetch")
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "0") == "1"
+# Durée de vie d'un résultat préchargé non consommé (secondes)
+PREFETCH_TTL = float(os.getenv("PREFETCH_TTL", "600"))
+# Budget d'appels payants (LLM, Gemini, SERP) du préchargement par fenêtre glissante
+PREFETCH_BUDGET = int(os.getenv("PREFETCH_BUDGET", "100"))
+PREFETCH_BUDGET_WINDOW = float(os.getenv("PREFETCH_BUDGET_WINDOW", "3600"))
+# Peu de workers dédiés : le préchargement ne prend pas de place dans le threadpool des requêtes
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "2"))
+# Priorité réduite des workers de préchargement (valeur nice, Linux)
+PREFETCH_NICE = int(os.getenv("PREFETCH_NICE", "10"))
+# Attente maximale d'un préchargement déjà en cours avant de refaire l'appel soi-même
+PREFETCH_WAIT = float(os.getenv("PREFETCH_WAIT", "30"))
+
+
+def _lower_priority():
+    # Sous Linux, la priorité d'ordonnancement est propre à chaque thread
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PREFETCH_NICE)
+    except (AttributeError, OSError):
+        pass
+
+
+class CostBudget:
+    """
+    Budget d'appels sur une fenêtre glissante : une dépense est refusée (et non mise
+    en attente) quand elle dépasserait `limit` sur les `window` dernières secondes.
+    """
+
+    def __init__(self, limit: int = PREFETCH_BUDGET, window: float = PREFETCH_BUDGET_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._spent: list = []
+
+    def _used(self, now: float) -> int:
+        self._spent = [(at, cost) for at, cost in self._spent if now - at < self.window]
+        return sum(cost for _, cost in self._spent)
+
+    def try_spend(self, cost: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._used(now) + cost > self.limit:
+                return False
+            self._spent.append((now, cost))
+            return True
+
+    def refund(self, cost: int):
+        with self._lock:
+            for index in range(len(self._spent) - 1, -1, -1):
+                if self._spent[index][1] == cost:
+                    del self._spent[index]
+                    break
+
+    def remaining(self) -> int:
+        with self._lock:
+            return self.limit - self._used(time.monotonic())
+
+
+class SpeculativeCache:
+    """
+    Résultats calculés à l'avance, à usage unique et à durée de vie limitée.
+
+    `schedule` lance le calcul en arrière-plan si le budget le permet ; `take` retire
+    l'entrée : un résultat prêt est retourné, un calcul en cours est attendu (au plus
+    PREFETCH_WAIT secondes), un calcul pas encore démarré est annulé et remboursé.
+    Dans ces deux derniers cas d'échec, `take` retourne None et l'appelant calcule lui-même.
+    """
+
+    def __init__(self, ttl: float = PREFETCH_TTL, budget: Optional[CostBudget] = None, workers: int = PREFETCH_WORKERS):
+        self.ttl = ttl
+        self.budget = budget or CostBudget()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch", initializer=_lower_priority)
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[Future, float, int]] = {}
+        self.scheduled = 0
+        self.skipped = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def _purge(self, now: float):
+        for key in [key for key, (_, expires, _) in self._entries.items() if expires <= now]:
+            future, _, _ = self._entries.pop(key)
+            future.cancel()
+            self.expired += 1
+
+    def schedule(self, key: Hashable, cost: int, fn: Callable, *args, **kwargs) -> bool:
+        """
+        Précharge fn(*args, **kwargs) sous la clé `key`. Retourne False si la clé est déjà
+        préchargée ou si le budget est épuisé.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            if key in self._entries:
+                return False
+            if not self.budget.try_spend(cost):
+                self.skipped += 1
+                return False
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._entries[key] = (future, now + self.ttl, cost)
+            self.scheduled += 1
+            return True
+
+    def take(self, key: Hashable, timeout: float = PREFETCH_WAIT) -> Optional[Any]:
+        with self._lock:
+            self._purge(time.monotonic())
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+        future, _, cost = entry
+        if future.cancel():
+            # Pas encore démarré : l'appelant sera plus rapide en calculant lui-même
+            self.budget.refund(cost)
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            result = future.result(timeout=timeout)
+        except (CancelledError, FutureTimeout, Exception) as e:
+            print(f"[Prefetch] Résultat préchargé indisponible: {str(e) or type(e).__name__}")
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "scheduled": self.scheduled,
+                "skipped_budget": self.skipped,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "budget_remaining": self.budget.remaining(),
+            }
+
+    def clear(self):
+        """
+        Annule les préchargements pas encore démarrés et oublie toutes les entrées.
+        """
+        with self._lock:
+            for future, _, _ in self._entries.values():
+                future.cancel()
+            self._entries.clear()
+
+
+speculative_cache = SpeculativeCache()
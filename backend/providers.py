@@ -0,0 +1,64 @@
+import importlib.util
+import os
+import threading
+from dotenv import load_dotenv
+
+# Chargement des variables d'environnement
+load_dotenv()
+
+# Modèle OpenAI utilisé par défaut
+OPENAI_MODEL = "gpt-3.5-turbo"
+
+# Les modules langchain ne sont importés qu'au premier appel LLM : l'API démarre
+# sans payer leur temps d'import (ni exiger leur présence).
+_lock = threading.Lock()
+_chat_models = {}
+_langchain = None
+
+
+def llm_available() -> bool:
+    """
+    Indique si une intégration langchain est installée, sans l'importer.
+    """
+    return any(importlib.util.find_spec(name) is not None for name in ("langchain_openai", "langchain"))
+
+
+def _import_langchain():
+    global _langchain
+    if _langchain is None:
+        try:
+            # Essayer les importations pour les versions récentes
+            from langchain_openai import ChatOpenAI
+            from langchain_core.messages import HumanMessage
+        except ImportError:
+            # Essayer les importations pour les versions plus anciennes
+            from langchain.chat_models import ChatOpenAI
+            from langchain.schema import HumanMessage
+        _langchain = (ChatOpenAI, HumanMessage)
+    return _langchain
+
+
+def get_chat_llm(temperature: float = 0.7):
+    """
+    Retourne le client ChatOpenAI partagé pour une température donnée.
+    Le client (et son pool de connexions HTTP) est créé au premier usage puis réutilisé.
+    """
+    with _lock:
+        llm = _chat_models.get(temperature)
+        if llm is None:
+            ChatOpenAI, _ = _import_langchain()
+            llm = ChatOpenAI(api_key=os.getenv("OPENAI_API_KEY", ""), model_name=OPENAI_MODEL, temperature=temperature)
+            _chat_models[temperature] = llm
+    return llm
+
+
+def human_message(content: str):
+    _, HumanMessage = _import_langchain()
+    return HumanMessage(content=content)
+
+
+def invoke_llm(prompt: str, temperature: float = 0.7):
+    """
+    Envoie un prompt unique au modèle et retourne la réponse langchain.
+    """
+    return get_chat_llm(temperature).invoke([human_message(prompt)])
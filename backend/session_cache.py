@@ -0,0 +1,216 @@
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+import session_store
+
+# Période d'écriture des sessions modifiées sur disque (secondes)
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "2"))
+# Nombre maximal de sessions gardées en mémoire, et durée d'inactivité avant éviction (secondes)
+SESSION_CACHE_MAX = int(os.getenv("SESSION_CACHE_MAX", "64"))
+SESSION_CACHE_IDLE = float(os.getenv("SESSION_CACHE_IDLE", "600"))
+
+
+def _load_with_version(session_id: str):
+    data = session_store.load_session(session_id)
+    return data, session_store.session_version(session_id) if data is not None else None
+
+
+def _new_entry(data: dict, base: str, dirty: bool) -> dict:
+    return {"data": data, "base": base, "counter": 0, "dirty": dirty, "last_used": time.monotonic()}
+
+
+class SessionCache:
+    """
+    Cache en mémoire des sessions avec écriture différée.
+
+    Chaque session a son propre asyncio.Lock : les lectures-modifications-écritures
+    concurrentes d'une même session (logos, articles, upload) sont sérialisées au lieu de
+    s'écraser. Les modifications marquent la session comme sale et incrémentent sa version ;
+    flush() les écrit périodiquement de façon atomique (fichier temporaire + os.replace).
+
+    Les dictionnaires retournés par get() sont partagés : ils ne doivent être modifiés
+    que dans update().
+    """
+
+    def __init__(self, max_entries: int = SESSION_CACHE_MAX, idle_seconds: float = SESSION_CACHE_IDLE):
+        self.max_entries = max_entries
+        self.idle_seconds = idle_seconds
+        self._entries: Dict[str, dict] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.loads = 0
+        self.hits = 0
+        self.writes = 0
+        self.updates = 0
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    async def _entry(self, session_id: str) -> Optional[dict]:
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            self.hits += 1
+        else:
+            data, base = await run_in_threadpool(_load_with_version, session_id)
+            if data is None:
+                return None
+            self.loads += 1
+            entry = self._entries[session_id] = _new_entry(data, base, dirty=False)
+        entry["last_used"] = time.monotonic()
+        return entry
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        session_store.session_path(session_id)
+        async with self.lock(session_id):
+            entry = await self._entry(session_id)
+            return entry["data"] if entry else None
+
+    async def get_fields(self, session_id: str, fields: Iterable[str]) -> Optional[dict]:
+        """
+        Projection de la session sur `fields` (chemins pointés, voir session_store.project_fields),
+        calculée sous le verrou : seules les valeurs demandées sont retournées, sans exposer le
+        dictionnaire partagé. La session est lue sur disque seulement si elle n'est pas en cache.
+        """
+        session_store.session_path(session_id)
+        async with self.lock(session_id):
+            entry = await self._entry(session_id)
+            return session_store.project_fields(entry["data"], fields) if entry else None
+
+    async def update(self, session_id: str, mutate: Callable[[dict], Any], default: Optional[Callable[[], dict]] = None) -> Any:
+        """
+        Applique `mutate(session_data)` sous le verrou de la session et retourne son résultat.
+        Si la session n'existe pas : crée `default()` si fourni, sinon lève KeyError.
+        """
+        session_store.session_path(session_id)
+        async with self.lock(session_id):
+            entry = await self._entry(session_id)
+            if entry is None:
+                if default is None:
+                    raise KeyError(session_id)
+                entry = self._entries[session_id] = _new_entry(default(), f"new-{time.time_ns()}", dirty=True)
+            result = mutate(entry["data"])
+            entry["counter"] += 1
+            entry["dirty"] = True
+            self.updates += 1
+            return result
+
+    async def create(self, session_id: str, session_data: dict) -> bool:
+        """
+        Crée la session si elle n'existe ni en mémoire ni sur disque. Retourne False sinon.
+        """
+        session_store.session_path(session_id)
+        async with self.lock(session_id):
+            if await self._entry(session_id) is not None:
+                return False
+            self._entries[session_id] = _new_entry(session_data, f"new-{time.time_ns()}", dirty=True)
+            self.updates += 1
+            return True
+
+    def version(self, session_id: str) -> Optional[str]:
+        """
+        Version de la session : base (état du fichier au chargement) + compteur de modifications.
+        Une session non chargée a la version de son fichier avec un compteur nul.
+        """
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            return f"{entry['base']}.{entry['counter']}"
+        base = session_store.session_version(session_id)
+        return f"{base}.0" if base else None
+
+    def etag(self, session_id: str, *variant: Any) -> Optional[str]:
+        return session_store.make_etag(session_id, self.version(session_id), *variant)
+
+    def cached_ids(self) -> set:
+        return set(self._entries)
+
+    async def flush(self) -> int:
+        """
+        Écrit les sessions modifiées, puis évince les sessions propres inactives.
+        """
+        written = 0
+        for session_id in [sid for sid, entry in self._entries.items() if entry["dirty"]]:
+            async with self.lock(session_id):
+                entry = self._entries.get(session_id)
+                if entry is None or not entry["dirty"]:
+                    continue
+                try:
+                    await run_in_threadpool(session_store.save_session, session_id, entry["data"])
+                except Exception as e:
+                    print(f"[Sessions] Écriture de la session {session_id} en échec: {str(e)}")
+                    continue
+                entry["dirty"] = False
+                written += 1
+        self.writes += written
+        self._evict()
+        return written
+
+    def _evict(self):
+        now = time.monotonic()
+        clean = sorted(
+            (entry["last_used"], session_id)
+            for session_id, entry in self._entries.items()
+            if not entry["dirty"] and not (session_id in self._locks and self._locks[session_id].locked())
+        )
+        excess = len(self._entries) - self.max_entries
+        for last_used, session_id in clean:
+            if excess <= 0 and now - last_used < self.idle_seconds:
+                break
+            del self._entries[session_id]
+            self._locks.pop(session_id, None)
+            excess -= 1
+
+    def discard(self, session_id: str):
+        self._entries.pop(session_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "cached": len(self._entries),
+            "dirty": sum(1 for entry in self._entries.values() if entry["dirty"]),
+            "loads": self.loads,
+            "hits": self.hits,
+            "updates": self.updates,
+            "writes": self.writes,
+        }
+
+
+session_cache = SessionCache()
+
+_flusher_task: Optional["asyncio.Task"] = None
+
+
+async def _flush_forever(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await session_cache.flush()
+        except Exception as e:
+            print(f"[Sessions] Écriture différée en échec: {str(e)}")
+
+
+def start_flusher(interval: float = SESSION_FLUSH_INTERVAL):
+    global _flusher_task
+    if _flusher_task is None or _flusher_task.done():
+        _flusher_task = asyncio.get_running_loop().create_task(_flush_forever(interval))
+
+
+async def stop_flusher():
+    """
+    Arrête l'écriture périodique et écrit toutes les sessions encore modifiées.
+    """
+    global _flusher_task
+    if _flusher_task is not None:
+        _flusher_task.cancel()
+        try:
+            await _flusher_task
+        except asyncio.CancelledError:
+            pass
+        _flusher_task = None
+    written = await session_cache.flush()
+    if written:
+        print(f"[Sessions] {written} session(s) écrite(s) à l'arrêt")
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from session_cache import session_cache
+from session_store import archive_session, delete_session, session_index
+
+# Durée de vie d'une session sans accès avant suppression (jours)
+SESSION_TTL_DAYS = float(os.getenv("SESSION_TTL_DAYS", "30"))
+# Une session sans accès depuis ce délai est compressée dans l'archive (heures)
+SESSION_ARCHIVE_AFTER_HOURS = float(os.getenv("SESSION_ARCHIVE_AFTER_HOURS", "48"))
+# Période du balayage en tâche de fond (secondes)
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "900"))
+
+_sweeper_task: Optional["asyncio.Task"] = None
+_last_sweep: Optional[dict] = None
+
+
+def sweep_sessions(
+    now: Optional[float] = None,
+    ttl_days: float = SESSION_TTL_DAYS,
+    archive_after_hours: float = SESSION_ARCHIVE_AFTER_HOURS,
+    active: frozenset = frozenset(),
+) -> dict:
+    """
+    Supprime les sessions expirées, archive les sessions froides et persiste l'index.
+    Un TTL ou un délai d'archivage <= 0 désactive l'étape correspondante.
+    Les sessions de `active` (chargées dans le cache) ne sont pas touchées.
+    """
+    global _last_sweep
+    now = time.time() if now is None else now
+    started = time.perf_counter()
+    # Resynchronise l'index avec le disque (sessions créées ou supprimées hors de l'API)
+    session_index.reconcile()
+    evicted = archived = 0
+    for session_id, entry in session_index.entries().items():
+        if session_id in active:
+            continue
+        idle = now - entry.get("last_access", now)
+        try:
+            if ttl_days > 0 and idle > ttl_days * 86400:
+                delete_session(session_id)
+                evicted += 1
+            elif archive_after_hours > 0 and not entry.get("archived") and idle > archive_after_hours * 3600:
+                if archive_session(session_id):
+                    archived += 1
+        except Exception as e:
+            print(f"[Sessions] Erreur sur la session {session_id}: {str(e)}")
+    session_index.save()
+    _last_sweep = {
+        "at": now,
+        "evicted": evicted,
+        "archived": archived,
+        "sessions": len(session_index.entries()),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    if evicted or archived:
+        print(f"[Sessions] Balayage : {evicted} supprimée(s), {archived} archivée(s)")
+    return _last_sweep
+
+
+async def sweep_now() -> dict:
+    # Les modifications en attente sont écrites avant de balayer le disque
+    await session_cache.flush()
+    return await run_in_threadpool(sweep_sessions, active=frozenset(session_cache.cached_ids()))
+
+
+async def _sweep_forever(interval: float):
+    while True:
+        try:
+            await sweep_now()
+        except Exception as e:
+            print(f"[Sessions] Balayage en échec: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+def start_sweeper(interval: float = SESSION_SWEEP_INTERVAL):
+    global _sweeper_task
+    if _sweeper_task is None or _sweeper_task.done():
+        _sweeper_task = asyncio.get_running_loop().create_task(_sweep_forever(interval))
+
+
+async def stop_sweeper():
+    global _sweeper_task
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+        try:
+            await _sweeper_task
+        except asyncio.CancelledError:
+            pass
+        _sweeper_task = None
+    await run_in_threadpool(session_index.save)
+
+
+def lifecycle_stats() -> dict:
+    entries = session_index.entries().values()
+    return {
+        "sessions": len(entries),
+        "archived": sum(1 for entry in entries if entry.get("archived")),
+        "bytes": sum(entry.get("size", 0) for entry in entries),
+        "last_sweep": _last_sweep,
+    }
@@ -0,0 +1,335 @@
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import json_codec
+
+# Dossier des sessions (un fichier JSON par session_{id})
+SESSIONS_DIR = os.getenv("SESSIONS_DIR", "./sessions")
+# Sessions froides compressées (session_{id}.json.gz), hors du dossier de travail
+ARCHIVE_DIR = os.path.join(SESSIONS_DIR, "archive")
+INDEX_PATH = os.path.join(SESSIONS_DIR, "index.json")
+# Fichiers de session indentés (lisibles) ou compacts (plus petits et plus rapides à écrire)
+SESSION_JSON_INDENT = os.getenv("SESSION_JSON_INDENT", "0") == "1"
+
+# Les vues de session sont revalidées à chaque requête (If-None-Match -> 304)
+SESSION_CACHE_CONTROL = "private, no-cache"
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+def session_path(session_id: str) -> str:
+    """
+    Chemin du fichier d'une session. L'identifiant est validé (pas de traversée de dossier).
+    """
+    if not session_id or not _SESSION_ID.match(str(session_id)):
+        raise ValueError(f"Identifiant de session invalide: {session_id!r}")
+    return os.path.join(SESSIONS_DIR, f"session_{session_id}.json")
+
+
+def archive_path(session_id: str) -> str:
+    session_path(session_id)
+    return os.path.join(ARCHIVE_DIR, f"session_{session_id}.json.gz")
+
+
+def _session_id_from_filename(name: str) -> Optional[str]:
+    for suffix in (".json", ".json.gz"):
+        if name.startswith("session_") and name.endswith(suffix):
+            session_id = name[len("session_"):-len(suffix)]
+            if _SESSION_ID.match(session_id):
+                return session_id
+    return None
+
+
+class SessionIndex:
+    """
+    Index compact des sessions : id -> {created, size (sur disque), last_access, archived}.
+    Évite de lister et de lire le dossier des sessions ; reconstruit depuis le disque
+    s'il est absent, persisté de façon atomique par save().
+    """
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, dict]] = None
+        self._dirty = False
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, "rb") as f:
+                    self._entries = json_codec.loads(f.read()).get("sessions", {})
+            except (FileNotFoundError, ValueError):
+                self._entries = self._scan()
+                self._dirty = True
+        return self._entries
+
+    def _scan(self) -> Dict[str, dict]:
+        # Les dates d'accès réelles sont inconnues (mtime = dernière écriture, ou date de copie) :
+        # une session découverte sur disque démarre son délai d'expiration maintenant
+        now = time.time()
+        entries = {}
+        for directory, archived in ((SESSIONS_DIR, False), (ARCHIVE_DIR, True)):
+            try:
+                scanner = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with scanner:
+                for item in scanner:
+                    session_id = _session_id_from_filename(item.name)
+                    if session_id is None or not item.is_file() or (session_id in entries and archived):
+                        continue
+                    stat = item.stat()
+                    entries[session_id] = {
+                        "created": _created_at(session_id, stat.st_mtime),
+                        "size": stat.st_size,
+                        "last_access": now,
+                        "archived": archived,
+                    }
+        return entries
+
+    def record(self, session_id: str, size: Optional[int] = None, archived: bool = False):
+        now = time.time()
+        with self._lock:
+            entries = self._load()
+            entry = entries.setdefault(session_id, {"created": _created_at(session_id, now), "size": 0})
+            entry["last_access"] = now
+            entry["archived"] = archived
+            if size is not None:
+                entry["size"] = size
+            self._dirty = True
+
+    def update(self, session_id: str, **fields):
+        with self._lock:
+            entry = self._load().get(session_id)
+            if entry is not None:
+                entry.update(fields)
+                self._dirty = True
+
+    def remove(self, session_id: str):
+        with self._lock:
+            if self._load().pop(session_id, None) is not None:
+                self._dirty = True
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._load().get(session_id)
+            return dict(entry) if entry else None
+
+    def entries(self) -> Dict[str, dict]:
+        with self._lock:
+            return {session_id: dict(entry) for session_id, entry in self._load().items()}
+
+    def reconcile(self):
+        """
+        Resynchronise l'index avec le disque en conservant les dates d'accès connues :
+        ajoute les sessions créées hors de l'API, retire celles qui ont disparu.
+        """
+        scanned = self._scan()
+        with self._lock:
+            entries = self._load()
+            for session_id in set(entries) - set(scanned):
+                del entries[session_id]
+            for session_id, found in scanned.items():
+                entry = entries.get(session_id)
+                if entry is None:
+                    entries[session_id] = found
+                else:
+                    entry["size"] = found["size"]
+                    entry["archived"] = found["archived"]
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            payload = json_codec.dumps({"sessions": self._entries})
+            self._dirty = False
+        _atomic_write(self.path, payload)
+
+
+def _created_at(session_id: str, default: float) -> float:
+    # Les identifiants du frontend sont des timestamps en millisecondes
+    if session_id.isdigit() and len(session_id) == 13:
+        return int(session_id) / 1000
+    return default
+
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+session_index = SessionIndex()
+
+# Sérialise l'archivage et la restauration d'une session
+_archive_lock = threading.Lock()
+
+
+def session_exists(session_id: str) -> bool:
+    return os.path.exists(session_path(session_id)) or os.path.exists(archive_path(session_id))
+
+
+def _restore_session(session_id: str) -> bool:
+    """
+    Décompresse une session archivée dans le dossier de travail. Retourne False si elle n'existe pas.
+    """
+    with _archive_lock:
+        path = session_path(session_id)
+        if os.path.exists(path):
+            return True
+        archived = archive_path(session_id)
+        if not os.path.exists(archived):
+            return False
+        temp_path = f"{path}.restore.tmp"
+        with gzip.open(archived, "rb") as source, open(temp_path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.replace(temp_path, path)
+        os.remove(archived)
+    print(f"[Sessions] Session {session_id} restaurée depuis l'archive")
+    return True
+
+
+def load_session(session_id: str) -> Optional[dict]:
+    """
+    Retourne les données de la session, ou None si elle n'existe pas.
+    Une session archivée est restaurée de façon transparente.
+    """
+    path = session_path(session_id)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        if not _restore_session(session_id):
+            return None
+        f = open(path, "rb")
+    with f:
+        data = f.read()
+    session_data = json_codec.loads(data)
+    size = len(data)
+    session_index.record(session_id, size=size)
+    return session_data
+
+
+def save_session(session_id: str, session_data: dict):
+    path = session_path(session_id)
+    os.makedirs(SESSIONS_DIR, exist_ok=True)
+    # Écriture atomique : un lecteur voit l'ancienne ou la nouvelle version, jamais un fichier tronqué
+    data = json_codec.dumps(session_data, indent=SESSION_JSON_INDENT)
+    _atomic_write(path, data)
+    size = len(data)
+    # Une éventuelle copie archivée est désormais périmée
+    if os.path.exists(archive_path(session_id)):
+        os.remove(archive_path(session_id))
+    session_index.record(session_id, size=size)
+
+
+def archive_session(session_id: str) -> bool:
+    """
+    Compresse une session dans ARCHIVE_DIR et la retire du dossier de travail.
+    """
+    with _archive_lock:
+        path = session_path(session_id)
+        if not os.path.exists(path):
+            return False
+        archived = archive_path(session_id)
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        temp_path = f"{archived}.tmp"
+        with open(path, "rb") as source, gzip.open(temp_path, "wb", compresslevel=6) as target:
+            shutil.copyfileobj(source, target)
+        os.replace(temp_path, archived)
+        os.remove(path)
+        size = os.path.getsize(archived)
+    session_index.update(session_id, archived=True, size=size)
+    return True
+
+
+def delete_session(session_id: str):
+    with _archive_lock:
+        for path in (session_path(session_id), archive_path(session_id)):
+            if os.path.exists(path):
+                os.remove(path)
+    session_index.remove(session_id)
+
+
+def list_sessions() -> List[dict]:
+    """
+    Sessions connues de l'index, les plus récemment utilisées d'abord (sans parcourir le dossier).
+    """
+    entries = [dict(entry, session_id=session_id) for session_id, entry in session_index.entries().items()]
+    entries.sort(key=lambda entry: entry.get("last_access", 0), reverse=True)
+    return entries
+
+
+def session_version(session_id: str) -> Optional[str]:
+    """
+    Version courante de la session, dérivée de la date de modification et de la taille
+    du fichier : permet de calculer un ETag sans relire ni parser la session.
+    Une session archivée n'est pas restaurée pour autant (appel fait depuis la boucle
+    d'événements) : sa version est dérivée du fichier compressé.
+    """
+    try:
+        stat = os.stat(session_path(session_id))
+    except FileNotFoundError:
+        try:
+            stat = os.stat(archive_path(session_id))
+        except FileNotFoundError:
+            return None
+        return f"gz-{stat.st_mtime_ns}-{stat.st_size}"
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def make_etag(session_id: str, version: Optional[str], *variant: Any) -> Optional[str]:
+    """
+    ETag faible d'une vue de la session ; `variant` distingue les projections d'une même version.
+    """
+    if version is None:
+        return None
+    digest = hashlib.sha1(repr((session_id, version) + variant).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    if not if_none_match or not etag:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    weak = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any(c == etag or c == weak or c[2:] == weak for c in candidates)
+
+
+def _lookup(data: Any, path: str) -> Any:
+    current = data
+    for key in path.split("."):
+        if isinstance(current, dict) and key in current:
+            current = current[key]
+        elif isinstance(current, list) and key.isdigit() and int(key) < len(current):
+            current = current[int(key)]
+        else:
+            raise KeyError(path)
+    return current
+
+
+def project_fields(data: dict, fields: Iterable[str]) -> dict:
+    """
+    Ne garde que les champs demandés. Un champ peut être un chemin pointé
+    ("logos.var1", "variations.0.title") ; les champs absents sont ignorés.
+    """
+    projected: dict = {}
+    for field in fields:
+        try:
+            value = _lookup(data, field)
+        except KeyError:
+            continue
+        target = projected
+        keys = field.split(".")
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+    return projected
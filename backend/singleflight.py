@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Callable, Dict
+
+from starlette.concurrency import run_in_threadpool
+
+
+def request_fingerprint(payload: Any) -> str:
+    """
+    Calcule une empreinte stable d'une requête (ordre des clés ignoré).
+    """
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """
+    Exécution partagée : la tâche et le nombre d'appels qui l'attendent encore.
+    """
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Partage une seule exécution entre les appels concurrents ayant la même clé.
+
+    Le premier appel lance la fonction dans sa propre tâche ; les doublons qui arrivent
+    pendant l'exécution attendent le même résultat au lieu de relancer les appels
+    LLM / fal. Chaque appel attend la tâche à travers `asyncio.shield` : l'annulation
+    d'un appel (client déconnecté) n'annule pas les autres, et la tâche n'est annulée
+    que lorsque plus personne ne l'attend. Les fonctions synchrones sont exécutées
+    dans le threadpool pour ne pas bloquer la boucle d'événements.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, _Call] = {}
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    @staticmethod
+    async def _run(fn: Callable, *args, **kwargs) -> Any:
+        if asyncio.iscoroutinefunction(fn):
+            return await fn(*args, **kwargs)
+        return await run_in_threadpool(fn, *args, **kwargs)
+
+    def _finished(self, key: str, call: _Call, task: asyncio.Task):
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+        # Lire l'exception évite l'avertissement "exception never retrieved" sans appelant
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+
+    async def do(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        self.requests += 1
+        call = self._inflight.get(key)
+        if call is not None:
+            self.coalesced += 1
+            print(f"[SingleFlight] {self.name}: requête identique en cours, résultat partagé")
+        else:
+            call = _Call(asyncio.ensure_future(self._run(fn, *args, **kwargs)))
+            self._inflight[key] = call
+            self.executions += 1
+            call.task.add_done_callback(lambda task: self._finished(key, call, task))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Dernier appel annulé : l'exécution ne sert plus à personne
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+                call.task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "in_flight": len(self._inflight),
+            "coalescing_rate": round(self.coalesced / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+_registry: Dict[str, SingleFlight] = {}
+
+
+def get_flight(name: str) -> SingleFlight:
+    """
+    Retourne (en la créant si besoin) l'instance SingleFlight nommée.
+    """
+    if name not in _registry:
+        _registry[name] = SingleFlight(name)
+    return _registry[name]
+
+
+def singleflight_metrics() -> Dict[str, Dict[str, Any]]:
+    return {name: flight.stats() for name, flight in _registry.items()}
@@ -0,0 +1,379 @@
+# Kit Elementor tel qu'il était écrit en dur dans send_color_palette_to_wordpress,
+# avant le modèle templates/elementor_kit.json : référence pour test_elementor_kit.py.
+
+
+def legacy_kit(color_palette: dict) -> dict:
+    return {
+        "version": "0.4",
+        "title": "Global Kit Styles",
+        "type": "global-styles",
+        "metadata": {
+            "template_type": "global-styles",
+            "include_in_zip": "1",
+            "wp_page_template": "default"
+        },
+        "content": [],
+        "page_settings": {
+            "system_colors": [
+                {
+                    "_id": "primary",
+                    "title": "Primary",
+                    "color": color_palette["primary"]
+                },
+                {
+                    "_id": "secondary",
+                    "title": "Secondary",
+                    "color": color_palette["secondary"]
+                },
+                {
+                    "_id": "text",
+                    "title": "Text",
+                    "color": color_palette["text"]
+                },
+                {
+                    "_id": "accent",
+                    "title": "Accent",
+                    "color": color_palette["secondary"]
+                }
+            ],
+            "custom_colors": [
+                {
+                    "_id": "e777cd9",
+                    "title": "White",
+                    "color": color_palette["background"]
+                },
+                {
+                    "_id": "e632858",
+                    "title": "transparent",
+                    "color": "#FFFFFF00"
+                },
+                {
+                    "_id": "e9c5ff0",
+                    "title": "grey",
+                    "color": "#F3F3F3"
+                },
+                {
+                    "_id": "9947692",
+                    "title": "white trans",
+                    "color": "#FFFFFFD1"
+                },
+                {
+                    "_id": "7e293d1",
+                    "title": "Black Trans",
+                    "color": "#22283170"
+                }
+            ],
+            "system_typography": [
+                {
+                    "_id": "primary",
+                    "title": "Large text",
+                    "typography_typography": "custom",
+                    "typography_font_family": "Sans-serif",
+                    "typography_font_weight": "500",
+                    "typography_font_size": {
+                        "unit": "px",
+                        "size": 150,
+                        "sizes": []
+                    },
+                    "typography_line_height": {
+                        "unit": "em",
+                        "size": 1,
+                        "sizes": []
+                    },
+                    "typography_letter_spacing": {
+                        "unit": "em",
+                        "size": -0.05,
+                        "sizes": []
+                    },
+                    "typography_font_size_mobile": {
+                        "unit": "px",
+                        "size": 45,
+                        "sizes": []
+                    },
+                    "typography_font_size_tablet": {
+                        "unit": "px",
+                        "size": 80,
+                        "sizes": []
+                    }
+                },
+                {
+                    "_id": "secondary",
+                    "title": "Secondary",
+                    "typography_typography": "custom",
+                    "typography_font_family": "Sans-serif",
+                    "typography_font_weight": "400",
+                    "typography_font_size": {
+                        "unit": "px",
+                        "size": 28,
+                        "sizes": []
+                    },
+                    "typography_line_height": {
+                        "unit": "em",
+                        "size": 1.5,
+                        "sizes": []
+                    },
+                    "typography_font_size_tablet": {
+                        "unit": "px",
+                        "size": 21,
+                        "sizes": []
+                    },
+                    "typography_font_size_mobile": {
+                        "unit": "px",
+                        "size": 19,
+                        "sizes": []
+                    }
+                },
+                {
+                    "_id": "text",
+                    "title": "Text",
+                    "typography_typography": "custom",
+                    "typography_font_family": "Sans-serif",
+                    "typography_font_weight": "400",
+                    "typography_font_size": {
+                        "unit": "px",
+                        "size": 18,
+                        "sizes": []
+                    },
+                    "typography_line_height": {
+                        "unit": "em",
+                        "size": 1.65,
+                        "sizes": []
+                    },
+                    "typography_letter_spacing": {
+                        "unit": "em",
+                        "size": 0.01,
+                        "sizes": []
+                    }
+                },
+                {
+                    "_id": "accent",
+                    "title": "Accent",
+                    "typography_typography": "custom",
+                    "typography_font_family": "Sans-serif",
+                    "typography_font_weight": "400",
+                    "typography_font_size": {
+                        "unit": "px",
+                        "size": 16,
+                        "sizes": []
+                    },
+                    "typography_line_height": {
+                        "unit": "em",
+                        "size": 1.5,
+                        "sizes": []
+                    },
+                    "typography_letter_spacing": {
+                        "unit": "px",
+                        "size": 0.15,
+                        "sizes": []
+                    },
+                    "typography_text_transform": "uppercase"
+                }
+            ],
+            "default_generic_fonts": "Sans-serif",
+            "body_color": color_palette["text"],
+            "link_normal_color": color_palette["primary"],
+            "h1_color": color_palette["text"],
+            "page_title_selector": "h1.entry-title",
+            "hello_footer_copyright_text": "All rights reserved",
+            "activeItemIndex": 1,
+            "__globals__": {
+                "body_color": "globals/colors?id=text",
+                "body_typography_typography": "globals/typography?id=text",
+                "link_normal_color": "globals/colors?id=primary",
+                "link_hover_color": "globals/colors?id=text",
+                "h1_color": "globals/colors?id=text",
+                "h1_typography_typography": "globals/typography?id=8352cd5",
+                "h3_color": "globals/colors?id=text",
+                "h3_typography_typography": "globals/typography?id=d4f69a8",
+                "h2_color": "globals/colors?id=text",
+                "h4_color": "globals/colors?id=text",
+                "h5_color": "globals/colors?id=text",
+                "h6_color": "globals/colors?id=text",
+                "button_typography_typography": "globals/typography?id=87350ce",
+                "button_text_color": "globals/colors?id=e777cd9",
+                "button_hover_background_color": "globals/colors?id=e777cd9",
+                "button_background_color": "globals/colors?id=text",
+                "button_hover_text_color": "globals/colors?id=primary",
+                "form_label_typography_typography": "globals/typography?id=accent",
+                "form_label_color": "globals/colors?id=text",
+                "form_field_typography_typography": "globals/typography?id=text",
+                "form_field_text_color": "globals/colors?id=text",
+                "form_field_background_color": "globals/colors?id=e777cd9",
+                "button_border_color": "globals/colors?id=text",
+                "h2_typography_typography": "globals/typography?id=4353ebc",
+                "h4_typography_typography": "globals/typography?id=326df42",
+                "h5_typography_typography": "globals/typography?id=49ea2e1",
+                "h6_typography_typography": "globals/typography?id=6524214",
+                "form_field_border_color": "globals/colors?id=d59e8a8",
+                "body_background_color": "globals/colors?id=e777cd9",
+                "button_hover_border_color": "globals/colors?id=text"
+            },
+            "viewport_md": 768,
+            "viewport_lg": 1025,
+            "h2_color": color_palette["text"],
+            "h3_color": color_palette["text"],
+            "h4_color": color_palette["text"],
+            "h5_color": color_palette["text"],
+            "h6_color": color_palette["text"],
+            "button_padding": {
+                "unit": "px",
+                "top": "20",
+                "right": "50",
+                "bottom": "20",
+                "left": "50",
+                "isLinked": False
+            },
+            "paragraph_spacing": {
+                "unit": "px",
+                "size": 18,
+                "sizes": []
+            },
+            "container_width": {
+                "unit": "%",
+                "size": 98,
+                "sizes": []
+            },
+            "button_border_width": {
+                "unit": "px",
+                "top": "1",
+                "right": "1",
+                "bottom": "1",
+                "left": "1",
+                "isLinked": True
+            },
+            "image_border_radius": {
+                "unit": "px",
+                "top": "0",
+                "right": "0",
+                "bottom": "0",
+                "left": "0",
+                "isLinked": True
+            },
+            "image_opacity": {
+                "unit": "px",
+                "size": 1,
+                "sizes": []
+            },
+            "image_hover_border_radius": {
+                "unit": "px",
+                "top": "0",
+                "right": "0",
+                "bottom": "0",
+                "left": "0",
+                "isLinked": True
+            },
+            "image_hover_opacity": {
+                "unit": "px",
+                "size": 1,
+                "sizes": []
+            },
+            "image_hover_css_filters_saturate": {
+                "unit": "px",
+                "size": 139,
+                "sizes": []
+            },
+            "image_hover_css_filters_hue": {
+                "unit": "px",
+                "size": 112,
+                "sizes": []
+            },
+            "form_field_border_border": "solid",
+            "form_field_border_width": {
+                "unit": "px",
+                "top": "1",
+                "right": "1",
+                "bottom": "1",
+                "left": "1",
+                "isLinked": True
+            },
+            "form_field_border_radius": {
+                "unit": "px",
+                "top": "0",
+                "right": "0",
+                "bottom": "0",
+                "left": "0",
+                "isLinked": True
+            },
+            "button_text_color": color_palette["background"],
+            "button_background_color": color_palette["primary"],
+            "button_hover_text_color": color_palette["primary"],
+            "button_hover_background_color": color_palette["background"],
+            "form_label_color": color_palette["text"],
+            "form_field_text_color": color_palette["text"],
+            "form_field_background_color": color_palette["background"],
+            "image_box_shadow_box_shadow": {
+                "horizontal": 0,
+                "vertical": 20,
+                "blur": 50,
+                "spread": 0,
+                "color": "rgba(98.00000000000001, 98.00000000000001, 98.00000000000001, 0.12)"
+            },
+            "link_hover_color": color_palette["text"],
+            "button_hover_border_width": {
+                "unit": "px",
+                "top": "1",
+                "right": "1",
+                "bottom": "1",
+                "left": "1",
+                "isLinked": True
+            },
+            "body_background_image": {
+                "url": "",
+                "id": "",
+                "size": "",
+                "alt": "",
+                "source": "library"
+            },
+            "body_background_position": "center center",
+            "body_background_repeat": "repeat-y",
+            "body_background_size": "contain",
+            "active_breakpoints": [
+                "viewport_mobile",
+                "viewport_tablet",
+                "viewport_widescreen"
+            ],
+            "viewport_widescreen": 1600,
+            "button_hover_box_shadow_box_shadow": {
+                "horizontal": 0,
+                "vertical": 20,
+                "blur": 50,
+                "spread": 0,
+                "color": "rgba(98.22330163043478, 98.24020576116492, 98.24999999999999, 0.31)"
+            },
+            "body_background_background": "classic",
+            "button_border_width_tablet": {
+                "unit": "px",
+                "top": "1",
+                "right": "1",
+                "bottom": "1",
+                "left": "1",
+                "isLinked": True
+            },
+            "button_hover_border_width_tablet": {
+                "unit": "px",
+                "top": "1",
+                "right": "1",
+                "bottom": "1",
+                "left": "1",
+                "isLinked": True
+            },
+            "link_hover_typography_text_decoration": "underline",
+            "button_hover_background_background": "",
+            "button_border_radius": {
+                "unit": "px",
+                "top": "0",
+                "right": "0",
+                "bottom": "0",
+                "left": "0",
+                "isLinked": True
+            },
+            "button_padding_tablet": {
+                "unit": "px",
+                "top": "15",
+                "right": "30",
+                "bottom": "15",
+                "left": "30",
+                "isLinked": False
+            }
+        }
+    }
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SESSIONS_DIR", tempfile.mkdtemp())
+
+import api
+import image_sourcing
+
+
+def _patch_sources(monkeypatch, serp=None, delay=0.3):
+    def slow_sources(sujet, titre):
+        time.sleep(delay)
+        return {"links": ["https://example.com/article"], "web_content": "extraits", "sources": ["Source - https://example.com"]}
+
+    monkeypatch.setattr(api, "_search_article_sources", slow_sources)
+    monkeypatch.setattr(api, "_write_article", lambda titre, web_content, sources: f"contenu: {web_content}")
+    monkeypatch.setattr(image_sourcing, "search_serp_image", serp or (lambda query: "https://images.example.com/serp.png"))
+    monkeypatch.setattr(image_sourcing, "search_unsplash_image", lambda query: None)
+    monkeypatch.setattr(image_sourcing, "scrape_page_image", lambda link: None)
+
+
+def test_serp_image_does_not_cancel_sources_search(monkeypatch):
+    # SERP gagne la course pendant que la source "page" attend encore les liens organiques
+    _patch_sources(monkeypatch)
+    result = asyncio.run(api._generate_article({"titre": "Titre", "sujet": "Sujet"}))
+    assert result == {
+        "content": "contenu: extraits",
+        "sources": ["Source - https://example.com"],
+        "imageUrl": "https://images.example.com/serp.png",
+    }
+
+
+def test_image_deadline_does_not_cancel_sources_search(monkeypatch):
+    def slow_serp(query):
+        time.sleep(0.5)
+        return None
+
+    _patch_sources(monkeypatch, serp=slow_serp)
+    result = asyncio.run(api._generate_article({"titre": "Titre", "sujet": "Sujet", "image_deadline": 0.05}))
+    assert result["content"] == "contenu: extraits"
+    assert result["imageUrl"] is None
+
+
+def test_invalid_image_deadline_uses_default():
+    assert api._image_deadline("bientôt") == image_sourcing.DEFAULT_DEADLINE
+    assert api._image_deadline(None) == image_sourcing.DEFAULT_DEADLINE
+    assert api._image_deadline("nan") == image_sourcing.DEFAULT_DEADLINE
+    assert api._image_deadline("2.5") == 2.5
+
+
+def test_article_web_content_uses_configured_serp_key(monkeypatch):
+    urls = []
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return {"organic_results": [{"title": "Titre", "snippet": "Extrait", "link": "https://example.com"}]}
+
+    monkeypatch.setenv("SERP_API_KEY", "cle-de-test")
+    monkeypatch.setattr(api.requests, "get", lambda url, timeout: urls.append(url) or Response())
+    web_content, sources = api._article_web_content("Titre", "Site", "Description", "Catégorie")
+    assert "api_key=cle-de-test" in urls[0]
+    assert sources == ["Titre - https://example.com"]
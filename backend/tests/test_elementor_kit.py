@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SESSIONS_DIR", tempfile.mkdtemp())
+
+import api
+from elementor_kit import KitRegistry, build_kit
+from palettes import PREDEFINED_PALETTES
+from tests.fixtures.legacy_elementor_kit import legacy_kit
+
+
+@pytest.mark.parametrize("palette", PREDEFINED_PALETTES[:5] + [{"primary": "#FFF", "secondary": "#000", "background": "#123456", "text": "#ABCDEF"}])
+def test_template_matches_legacy_kit(palette):
+    kit, kit_hash = build_kit(palette)
+    assert json.loads(kit) == legacy_kit(palette)
+    assert build_kit(dict(palette))[1] == kit_hash
+
+
+def test_invalid_color_is_rejected():
+    with pytest.raises(ValueError):
+        build_kit(dict(PREDEFINED_PALETTES[0], primary="red"))
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+    text = "ok"
+
+
+class FakeSite:
+    name = "test"
+    url = "https://wordpress.example.com"
+
+    def __init__(self):
+        self.imports = []
+
+    def endpoint(self, path):
+        return f"{self.url}/wp-json/{path}"
+
+    def post(self, path, data=None, **kwargs):
+        self.imports.append(data["kit_url"])
+        return FakeResponse()
+
+
+@pytest.fixture
+def wordpress(monkeypatch, tmp_path):
+    site = FakeSite()
+    uploads = []
+
+    def upload(wordpress, kit, filename):
+        uploads.append(filename)
+        return f"{wordpress.url}/wp-content/uploads/{filename}"
+
+    monkeypatch.setattr(api, "kit_registry", KitRegistry(str(tmp_path / "kits.json")))
+    monkeypatch.setattr(api, "_wordpress_site", lambda name: (site, None))
+    monkeypatch.setattr(api, "upload_kit_json_to_wordpress", upload)
+    return site, uploads
+
+
+def test_unchanged_kit_skips_upload_and_import(wordpress):
+    site, uploads = wordpress
+    first, second = PREDEFINED_PALETTES[0], PREDEFINED_PALETTES[1]
+
+    assert asyncio.run(api.send_color_palette_to_wordpress(first))["success"]
+    assert (len(uploads), len(site.imports)) == (1, 1)
+
+    result = asyncio.run(api.send_color_palette_to_wordpress(dict(first)))
+    assert result["skipped"] is True
+    assert (len(uploads), len(site.imports)) == (1, 1)
+
+    # Autre palette puis retour à la première : réimport sans nouvel upload
+    asyncio.run(api.send_color_palette_to_wordpress(second))
+    asyncio.run(api.send_color_palette_to_wordpress(first))
+    assert (len(uploads), len(site.imports)) == (2, 3)
+
+    asyncio.run(api.send_color_palette_to_wordpress(first, force=True))
+    assert (len(uploads), len(site.imports)) == (3, 4)
@@ -0,0 +1,33 @@
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SESSIONS_DIR", tempfile.mkdtemp())
+
+import api
+import palettes
+
+
+def test_scheme_palette_is_accessible():
+    palette = palettes.palette_for_scheme("bleu")
+    assert palette["primary"] == "#1E88E5"
+    assert palettes.palette_for_scheme("default") == palettes.PREDEFINED_PALETTES[0]
+
+
+def test_request_theme_palette():
+    assert api._request_theme_palette({}) is None
+    assert api._request_theme_palette({"colorData": {"type": "preset", "value": "vert"}}) == palettes.palette_for_scheme("vert")
+    assert api._request_theme_palette({"colorData": {"type": "hex", "value": "#1E88E5"}}) == palettes.palette_for_scheme("bleu")
+    assert api._request_theme_palette({"colorData": {"type": "hex", "value": "bleu"}}) is None
+
+
+def test_generate_all_content_falls_back_to_theme_palette(monkeypatch):
+    monkeypatch.setattr(api, "_generate_variation_articles", lambda variation: [])
+    response = asyncio.run(api.generate_all_content({
+        "variations": [{"id": "1", "title": "Site"}],
+        "colorData": {"type": "preset", "value": "rouge"},
+    }))
+    assert response["variations"][0]["color_palette"] == palettes.palette_for_scheme("rouge")
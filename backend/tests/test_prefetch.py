@@ -0,0 +1,82 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from prefetch import CostBudget, SpeculativeCache
+
+
+def test_budget_refuses_spend_once_full():
+    budget = CostBudget(limit=3, window=60)
+    assert budget.try_spend(2)
+    assert not budget.try_spend(2)
+    assert budget.try_spend(1)
+    assert budget.remaining() == 0
+    budget.refund(2)
+    assert budget.remaining() == 2
+
+
+def test_budget_window_slides():
+    budget = CostBudget(limit=1, window=0.05)
+    assert budget.try_spend(1)
+    assert not budget.try_spend(1)
+    time.sleep(0.06)
+    assert budget.try_spend(1)
+
+
+def test_schedule_skipped_when_budget_exhausted():
+    cache = SpeculativeCache(budget=CostBudget(limit=1, window=60), workers=1)
+    assert cache.schedule("a", 1, lambda: "a")
+    assert not cache.schedule("b", 1, lambda: "b")
+    assert not cache.schedule("a", 0, lambda: "a")
+    assert cache.stats()["skipped_budget"] == 1
+
+
+def test_result_is_taken_only_once():
+    cache = SpeculativeCache(budget=CostBudget(limit=10, window=60), workers=1)
+    cache.schedule("key", 1, lambda: "résultat")
+    assert cache.take("key") == "résultat"
+    assert cache.take("key") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_running_job_is_awaited():
+    cache = SpeculativeCache(budget=CostBudget(limit=10, window=60), workers=1)
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(0.05)
+        return "prêt"
+
+    cache.schedule("key", 1, slow)
+    started.wait(1)
+    assert cache.take("key") == "prêt"
+
+
+def test_pending_job_is_cancelled_and_refunded():
+    cache = SpeculativeCache(budget=CostBudget(limit=10, window=60), workers=1)
+    release = threading.Event()
+    cache.schedule("blocker", 1, release.wait)
+    calls = []
+    cache.schedule("pending", 3, lambda: calls.append(True))
+    assert cache.budget.remaining() == 6
+
+    # Le seul worker est occupé : le calcul n'a pas démarré, il est annulé et remboursé
+    assert cache.take("pending") is None
+    assert cache.budget.remaining() == 9
+    release.set()
+    assert cache.take("blocker") is True
+    assert calls == []
+
+
+def test_entries_expire_after_ttl():
+    cache = SpeculativeCache(ttl=0.05, budget=CostBudget(limit=10, window=60), workers=1)
+    cache.schedule("key", 1, lambda: "périmé")
+    time.sleep(0.06)
+    assert cache.take("key") is None
+    stats = cache.stats()
+    assert (stats["expired"], stats["entries"]) == (1, 0)
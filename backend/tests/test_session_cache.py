@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SESSIONS_DIR", tempfile.mkdtemp())
+
+from session_cache import SessionCache
+
+
+def test_get_fields_returns_only_requested_values():
+    cache = SessionCache()
+
+    async def main():
+        await cache.create("1700000000001", {"logos": {"v1": "https://logo/v1.png", "v2": "https://logo/v2.png"}, "variations": [{"id": "v1"}]})
+        return (
+            await cache.get_fields("1700000000001", ["logos.v1"]),
+            await cache.get_fields("1700000000001", ["logos.v3"]),
+            await cache.get_fields("1700000000002", ["logos.v1"]),
+        )
+
+    projected, missing_field, missing_session = asyncio.run(main())
+    assert projected == {"logos": {"v1": "https://logo/v1.png"}}
+    assert missing_field == {}
+    assert missing_session is None
+
+
+def test_etag_of_archived_session_does_not_restore_it():
+    import session_store
+
+    cache = SessionCache()
+    session_id = "1700000000003"
+    session_store.save_session(session_id, {"logos": {"v1": "https://logo/v1.png"}})
+    assert session_store.archive_session(session_id)
+
+    etag = cache.etag(session_id, "logos")
+    assert etag is not None
+    assert not os.path.exists(session_store.session_path(session_id))
+    assert os.path.exists(session_store.archive_path(session_id))
+
+    # La lecture (dans le threadpool) restaure la session ; l'ETag suit la nouvelle version
+    assert asyncio.run(cache.get_fields(session_id, ["logos.v1"])) == {"logos": {"v1": "https://logo/v1.png"}}
+    assert os.path.exists(session_store.session_path(session_id))
+    assert cache.etag(session_id, "logos") != etag
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SESSIONS_DIR", tempfile.mkdtemp())
+
+import session_cache
+import session_lifecycle
+import session_store
+from session_store import SessionIndex
+
+
+@pytest.fixture
+def sessions_dir(monkeypatch, tmp_path):
+    # Dossier de sessions et index propres à chaque test
+    monkeypatch.setattr(session_store, "SESSIONS_DIR", str(tmp_path))
+    monkeypatch.setattr(session_store, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    index = SessionIndex(str(tmp_path / "index.json"))
+    monkeypatch.setattr(session_store, "session_index", index)
+    monkeypatch.setattr(session_lifecycle, "session_index", index)
+    return tmp_path
+
+
+def test_index_records_and_persists(sessions_dir):
+    index = session_store.session_index
+    index.record("1700000000001", size=10)
+    index.update("1700000000001", archived=True)
+    index.record("1700000000002", size=20)
+    index.remove("1700000000002")
+    index.save()
+
+    reloaded = SessionIndex(index.path)
+    entry = reloaded.get("1700000000001")
+    assert entry["size"] == 10
+    assert entry["archived"] is True
+    assert entry["created"] == 1700000000.001
+    assert reloaded.get("1700000000002") is None
+
+
+def test_index_scan_starts_idle_timer_at_discovery(sessions_dir):
+    (sessions_dir / "session_1600000000000.json").write_text("{}")
+    (sessions_dir / "archive").mkdir()
+    (sessions_dir / "archive" / "session_1600000000001.json.gz").write_bytes(b"")
+    (sessions_dir / "notes.txt").write_text("")
+    old = time.time() - 90 * 86400
+    os.utime(sessions_dir / "session_1600000000000.json", (old, old))
+
+    before = time.time()
+    entries = SessionIndex(str(sessions_dir / "index.json")).entries()
+    assert set(entries) == {"1600000000000", "1600000000001"}
+    assert entries["1600000000000"]["last_access"] >= before
+    assert entries["1600000000001"]["archived"] is True
+
+
+def test_index_reconcile_keeps_known_access_times(sessions_dir):
+    index = session_store.session_index
+    session_store.save_session("1700000000001", {"a": 1})
+    index.update("1700000000001", last_access=123.0)
+    index.record("1700000000009", size=5)
+    (sessions_dir / "session_1700000000002.json").write_text("{}")
+
+    index.reconcile()
+    entries = index.entries()
+    assert set(entries) == {"1700000000001", "1700000000002"}
+    assert entries["1700000000001"]["last_access"] == 123.0
+
+
+def test_archive_restore_round_trip(sessions_dir):
+    data = {"logos": {"v1": "https://logo/v1.png"}, "titre": "Cafés à Fès"}
+    session_store.save_session("1700000000001", data)
+
+    assert session_store.archive_session("1700000000001")
+    assert not os.path.exists(session_store.session_path("1700000000001"))
+    assert os.path.exists(session_store.archive_path("1700000000001"))
+    assert session_store.session_index.get("1700000000001")["archived"] is True
+    assert session_store.session_exists("1700000000001")
+
+    assert session_store.load_session("1700000000001") == data
+    assert os.path.exists(session_store.session_path("1700000000001"))
+    assert not os.path.exists(session_store.archive_path("1700000000001"))
+    assert session_store.session_index.get("1700000000001")["archived"] is False
+
+
+def test_sweep_deletes_expired_and_archives_cold_sessions(sessions_dir):
+    now = time.time()
+    for session_id in ("1700000000001", "1700000000002", "1700000000003"):
+        session_store.save_session(session_id, {"id": session_id})
+    session_store.session_index.update("1700000000001", last_access=now - 40 * 86400)
+    session_store.session_index.update("1700000000002", last_access=now - 3 * 86400)
+
+    result = session_lifecycle.sweep_sessions(now=now, ttl_days=30, archive_after_hours=48)
+    assert (result["evicted"], result["archived"]) == (1, 1)
+    assert not session_store.session_exists("1700000000001")
+    assert os.path.exists(session_store.archive_path("1700000000002"))
+    assert os.path.exists(session_store.session_path("1700000000003"))
+
+
+def test_sweep_now_skips_cached_sessions(sessions_dir, monkeypatch):
+    cache = session_cache.SessionCache()
+    monkeypatch.setattr(session_lifecycle, "session_cache", cache)
+
+    async def main():
+        await cache.create("1700000000001", {"id": "en cours"})
+        await cache.flush()
+        session_store.save_session("1700000000002", {"id": "inactive"})
+        old = time.time() - 40 * 86400
+        for session_id in ("1700000000001", "1700000000002"):
+            session_store.session_index.update(session_id, last_access=old)
+        return await session_lifecycle.sweep_now()
+
+    result = asyncio.run(main())
+    assert result["evicted"] == 1
+    assert session_store.session_exists("1700000000001")
+    assert not session_store.session_exists("1700000000002")
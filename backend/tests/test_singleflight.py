@@ -0,0 +1,86 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from singleflight import SingleFlight
+
+
+def test_duplicates_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return value * 2
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work, 21) for _ in range(3)))
+
+    assert asyncio.run(main()) == [42, 42, 42]
+    assert calls == [21]
+    assert flight.stats()["coalesced"] == 2
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_leader_cancellation_does_not_cancel_followers():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.02)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "ok"
+    assert flight.executions == 1
+
+
+def test_execution_cancelled_when_no_waiter_left():
+    flight = SingleFlight("test")
+    finished = []
+
+    async def work():
+        try:
+            await asyncio.sleep(1)
+        finally:
+            finished.append(True)
+
+    async def main():
+        callers = [asyncio.ensure_future(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert finished == [True]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_failure_is_shared_and_counted_once():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(flight.do("k", work), flight.do("k", work), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.failures == 1
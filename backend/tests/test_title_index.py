@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import title_index
+
+
+def test_normalize_title_keeps_non_latin_letters():
+    assert title_index.normalize_title("Les 10 Meilleurs Cafés !") == "les 10 meilleurs cafes"
+    assert title_index.normalize_title("Лучшие кафе города") == "лучшие кафе города"
+    assert title_index.normalize_title("مقاهي المدينة") != ""
+
+
+def test_non_latin_titles_are_not_all_duplicates():
+    index = title_index.TitleIndex(["مقاهي المدينة"])
+    assert index.novelty("مقاهي المدينة") == 0.0
+    assert index.novelty("كتب جديدة للأطفال") > 0.5
+
+
+def test_empty_history_is_reused():
+    key = "session:test-empty-history"
+    history = title_index.get_history(key)
+    assert len(history) == 0
+    assert title_index.get_history(key) is history
@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SESSIONS_DIR", tempfile.mkdtemp())
+
+import api
+
+client = TestClient(api.app)
+
+
+@pytest.mark.parametrize("body", [
+    {"content": "", "target_languages": ["en"]},
+    {"content": "Bonjour", "target_languages": "en"},
+    {"content": "Bonjour", "target_languages": ["en", 3]},
+    {"content": "Bonjour", "target_languages": ["en", "de"]},
+])
+def test_batch_translation_rejects_invalid_body(body, monkeypatch):
+    monkeypatch.setattr(api, "translate_markdown", lambda content, language: pytest.fail("traduction lancée"))
+    response = client.post("/api/translate-batch", json=body)
+    assert "error" in response.json()
+
+
+def test_batch_translation_streams_each_language(monkeypatch):
+    monkeypatch.setattr(api, "api_key", "test")
+    monkeypatch.setattr(api, "translate_markdown", lambda content, language: f"{language}: {content}")
+    response = client.post("/api/translate-batch", json={"content": "Bonjour", "target_languages": ["en", "ar", "en"]})
+    lines = sorted(line for line in response.text.splitlines() if line)
+    assert len(lines) == 2
+    assert '"translated_content":"ar: Bonjour"' in lines[0]
+    assert '"translated_content":"en: Bonjour"' in lines[1]
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from wordpress_client import SiteRegistry, UnknownSiteError
+
+
+def test_sites_from_list(monkeypatch):
+    monkeypatch.setenv("WORDPRESS_SITES", '[{"name": "prod", "url": "https://prod.example.com/"}, {"name": "test", "url": "https://test.example.com"}]')
+    registry = SiteRegistry()
+    assert registry.names() == ["prod", "test"]
+    assert registry.get().name == "prod"
+    assert registry.get("test").url == "https://test.example.com"
+    with pytest.raises(UnknownSiteError):
+        registry.get("absent")
+    registry.close()
+
+
+@pytest.mark.parametrize("raw, message", [
+    ('{"prod": {"username": "admin"}}', "'url' manquant pour le site 'prod'"),
+    ('[{"url": "https://prod.example.com"}]', "'name' manquant"),
+    ('{"prod": ', "JSON valide"),
+    ("[]", "non vide"),
+])
+def test_invalid_config_names_the_problem(monkeypatch, raw, message):
+    monkeypatch.setenv("WORDPRESS_SITES", raw)
+    registry = SiteRegistry()
+    with pytest.raises(ValueError, match=message) as first:
+        registry.get("prod")
+    assert not isinstance(first.value, KeyError)
+    # L'erreur est mémorisée : la configuration n'est pas relue à chaque appel
+    monkeypatch.setenv("WORDPRESS_SITES", '{"prod": {"url": "https://prod.example.com"}}')
+    with pytest.raises(ValueError, match=message):
+        registry.get("prod")
+    registry.close()
+    assert registry.get("prod").url == "https://prod.example.com"
+    registry.close()
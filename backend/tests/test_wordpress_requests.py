@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SESSIONS_DIR", tempfile.mkdtemp())
+
+import api
+
+client = TestClient(api.app)
+
+
+@pytest.mark.parametrize("body", [
+    {"targets": "x"},
+    {"targets": ["x"]},
+    {"targets": [{"sites": 5}]},
+    {"targets": [{"sites": ["prod", 3]}]},
+    {"targets": [{"site": "prod", "variation_data": "titre"}]},
+])
+def test_bulk_publish_rejects_invalid_body(body):
+    response = client.post("/api/publish-to-wordpress/bulk", json=body)
+    assert response.status_code == 200
+    assert "error" in response.json()
+
+
+def test_bulk_publish_accepts_a_single_site_name():
+    response = client.post("/api/publish-to-wordpress/bulk", json={"targets": [{"sites": "absent", "variation_data": {"title": "t"}}]})
+    events = [line for line in response.text.splitlines() if line]
+    assert len(events) == 2
+    assert '"site":"absent"' in events[0]
+
+
+@pytest.mark.parametrize("sites", [{"0": "prod"}, ["prod", 3], 7])
+def test_build_sites_rejects_invalid_sites(sites):
+    response = client.post("/api/build-sites", json={"theme": "cafés", "sites": sites})
+    assert "error" in response.json()
+
+
+def test_site_names():
+    assert api._site_names("prod") == ["prod"]
+    assert api._site_names(["prod", None]) == ["prod", None]
+    assert api._site_names({"prod": 1}) is None
@@ -0,0 +1,105 @@
+import re
+from typing import List, Optional, Tuple
+
+from providers import get_chat_llm, human_message
+from title_index import TitleIndex
+
+# Nombre de titres candidats demandés en un seul appel au modèle
+DEFAULT_CANDIDATES = 4
+# Nombre de titres de l'historique rappelés au modèle dans le prompt
+PROMPT_HISTORY_LIMIT = 10
+
+# Adaptation du ton selon le choix de l'utilisateur
+TONE_INSTRUCTIONS = {
+    "standard": "équilibré entre information et attractivité",
+    "professionnel": "formel, sérieux et adapté à un public professionnel",
+    "créatif": "original, avec des jeux de mots ou des formulations surprenantes",
+    "accrocheur": "conçu pour maximiser les clics et l'engagement",
+    "informatif": "clair, précis et axé sur l'information"
+}
+
+
+def build_regeneration_prompt(sujet: str, tone: str, titres: List[str], count: int = 1) -> str:
+    """
+    Construit en un seul message ce que l'agent CrewAI recevait (rôle, objectif, tâche).
+    Avec count > 1, le modèle propose plusieurs titres, un par ligne.
+    """
+    tone_instruction = TONE_INSTRUCTIONS.get(tone, TONE_INSTRUCTIONS["standard"])
+    if count > 1:
+        demande = f"génère {count} titres d'articles, très différents les uns des autres, qui sont chacun {tone_instruction}"
+        sortie = "Retourne uniquement les titres, un par ligne, sans numérotation ni autre texte."
+    else:
+        demande = f"génère UN SEUL titre d'article qui est {tone_instruction}"
+        sortie = "Retourne uniquement le titre, sans numérotation ni autre texte."
+    return f"""
+    Tu es un rédacteur professionnel avec 15 ans d'expérience dans la création de titres
+    qui génèrent des clics tout en restant informatifs et pertinents.
+    Objectif: créer un titre d'article captivant et optimisé pour le SEO.
+
+    En fonction du sujet général suivant: "{sujet}",
+    {demande}.
+
+    Le titre doit être:
+    1. Pertinent par rapport au sujet principal
+    2. Optimisé pour le référencement
+    3. De longueur appropriée (60-70 caractères idéalement)
+    4. Différent des titres suivants:
+    {', '.join([f'"{t}"' for t in titres])}
+
+    {sortie}
+    """
+
+
+def clean_title(raw: str) -> str:
+    titre = str(raw).strip()
+    # Supprimer les numéros ou puces éventuels
+    titre = re.sub(r'^[\d\.\-\*]+\s*', '', titre)
+    # Supprimer les guillemets éventuels
+    return titre.strip('"\'')
+
+
+def parse_candidates(raw: str) -> List[str]:
+    candidates = []
+    for line in str(raw).split('\n'):
+        titre = clean_title(line)
+        if titre and titre not in candidates:
+            candidates.append(titre)
+    return candidates
+
+
+def regenerate_title_ranked(
+    sujet: str,
+    tone: str,
+    titres: List[str],
+    history: Optional[TitleIndex] = None,
+    candidates: int = DEFAULT_CANDIDATES,
+    llm=None,
+) -> Tuple[str, float]:
+    """
+    Demande plusieurs titres en un seul appel et retourne le plus nouveau avec son score
+    de nouveauté (1.0 = aucun titre proche parmi `titres` et l'historique de la session).
+    Le titre retenu est ajouté à l'historique.
+    """
+    llm = llm or get_chat_llm(0.7)
+    history_titles = history.titles() if history is not None else []
+    a_eviter = titres + [t for t in history_titles[-PROMPT_HISTORY_LIMIT:] if t not in titres]
+    response = llm.invoke([human_message(build_regeneration_prompt(sujet, tone, a_eviter, candidates))])
+
+    proposes = parse_candidates(response.content)
+    if not proposes:
+        raise ValueError("Aucun titre retourné par le modèle")
+    ranked = TitleIndex(titres + history_titles).rank(proposes)
+    titre, nouveaute = ranked[0]
+    print(f"[Titres] {len(proposes)} candidats, retenu (nouveauté {nouveaute:.2f}): {titre}")
+    if history is not None:
+        history.add(titre)
+    return titre, nouveaute
+
+
+def regenerate_title(sujet: str, tone: str, titres: List[str], llm=None) -> str:
+    """
+    Régénère un titre avec un seul appel au modèle, sans construire d'Agent/Task/Crew.
+    `llm` permet d'injecter un autre modèle de chat (par défaut le client partagé).
+    """
+    titre, _ = regenerate_title_ranked(sujet, tone, titres, llm=llm)
+    return titre
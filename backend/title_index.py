@@ -0,0 +1,106 @@
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, List, Tuple
+
+# Taille des n-grammes de caractères utilisés pour comparer les titres
+SHINGLE_SIZE = 3
+# Nombre de titres conservés par historique et nombre d'historiques en mémoire
+MAX_HISTORY_TITLES = 200
+MAX_HISTORIES = 512
+
+
+def normalize_title(title: str) -> str:
+    """
+    Minuscules, sans accents ni ponctuation, espaces compactés. Les lettres et chiffres
+    de toutes les écritures sont conservés (arabe, cyrillique, CJK...).
+    """
+    decomposed = unicodedata.normalize("NFKD", title.lower())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join("".join(c if c.isalnum() else " " for c in without_accents).split())
+
+
+def shingles(title: str, size: int = SHINGLE_SIZE) -> FrozenSet[str]:
+    text = f" {normalize_title(title)} "
+    if len(text) <= size:
+        return frozenset([text])
+    return frozenset(text[i:i + size] for i in range(len(text) - size + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class TitleIndex:
+    """
+    Index local de titres, comparés par similarité de Jaccard sur leurs n-grammes de caractères.
+    Détecte les quasi-doublons (reformulations, ordre des mots, accents) sans appel au modèle.
+    """
+
+    def __init__(self, titles: Iterable[str] = (), max_titles: int = MAX_HISTORY_TITLES):
+        self.max_titles = max_titles
+        self._entries: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        for title in titles:
+            self.add(title)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def titles(self) -> List[str]:
+        with self._lock:
+            return list(self._entries.keys())
+
+    def add(self, title: str):
+        if not title:
+            return
+        title_shingles = shingles(title)
+        with self._lock:
+            self._entries.pop(title, None)
+            self._entries[title] = title_shingles
+            while len(self._entries) > self.max_titles:
+                self._entries.popitem(last=False)
+
+    def max_similarity(self, candidate: str) -> float:
+        candidate_shingles = shingles(candidate)
+        with self._lock:
+            indexed = list(self._entries.values())
+        return max((jaccard(candidate_shingles, s) for s in indexed), default=0.0)
+
+    def novelty(self, candidate: str) -> float:
+        """
+        1.0 = aucun titre proche dans l'index, 0.0 = doublon exact.
+        """
+        return 1.0 - self.max_similarity(candidate)
+
+    def rank(self, candidates: Iterable[str]) -> List[Tuple[str, float]]:
+        """
+        Trie les candidats du plus nouveau au moins nouveau (ordre du modèle conservé en cas d'égalité).
+        """
+        scored = [(c, self.novelty(c)) for c in candidates if c]
+        return sorted(scored, key=lambda item: item[1], reverse=True)
+
+
+_histories: "OrderedDict[str, TitleIndex]" = OrderedDict()
+_histories_lock = threading.Lock()
+
+
+def history_key(session_id: str, sujet: str) -> str:
+    return f"session:{session_id}" if session_id else f"sujet:{normalize_title(sujet)}"
+
+
+def get_history(key: str) -> TitleIndex:
+    """
+    Historique des titres déjà proposés pour une session (ou un sujet), en LRU borné.
+    """
+    with _histories_lock:
+        # Un index vide est « faux » (__len__ == 0) : tester None explicitement
+        index = _histories.pop(key, None)
+        if index is None:
+            index = TitleIndex()
+        _histories[key] = index
+        while len(_histories) > MAX_HISTORIES:
+            _histories.popitem(last=False)
+        return index
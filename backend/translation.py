@@ -0,0 +1,189 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from providers import invoke_llm
+
+LANGUAGE_NAMES = {
+    "ar": "arabe",
+    "en": "anglais",
+    "fr": "français",
+}
+
+# Nombre maximal de segments traduits simultanément, toutes requêtes et langues confondues
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "6"))
+TRANSLATION_MEMORY_PATH = os.getenv("TRANSLATION_MEMORY_PATH", "./cache/translation_memory.sqlite3")
+
+_executor = ThreadPoolExecutor(max_workers=TRANSLATION_CONCURRENCY, thread_name_prefix="translation")
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_HEADING = re.compile(r"^(\s*#{1,6}\s+)(.*)$")
+_LIST_ITEM = re.compile(r"^(\s*(?:[-*+]|\d+[.)])\s+(?:\[[ xX]\]\s+)?)(.*)$")
+_QUOTE = re.compile(r"^(\s*>+\s?)(.*)$")
+_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+
+
+def language_name(target_language: str) -> str:
+    return LANGUAGE_NAMES.get(target_language, "français")
+
+
+def split_markdown(content: str) -> List[Tuple[str, str]]:
+    """
+    Découpe le Markdown en segments (préfixe, texte) qui préservent la structure :
+    titres, éléments de liste, citations et lignes de tableau sont des segments à part,
+    les lignes consécutives d'un paragraphe forment un seul segment.
+    Les segments dont le texte est vide (lignes vides, règles, blocs de code) ne sont pas traduits.
+    """
+    segments: List[Tuple[str, str]] = []
+    paragraph: List[str] = []
+    in_code = False
+
+    def flush_paragraph():
+        if paragraph:
+            segments.append(("", "\n".join(paragraph)))
+            paragraph.clear()
+
+    for line in content.split("\n"):
+        if _FENCE.match(line):
+            flush_paragraph()
+            in_code = not in_code
+            segments.append((line, ""))
+            continue
+        if in_code or not line.strip() or _RULE.match(line) or (_TABLE_SEPARATOR.match(line) and "-" in line):
+            flush_paragraph()
+            segments.append((line, ""))
+            continue
+        match = _HEADING.match(line) or _LIST_ITEM.match(line) or _QUOTE.match(line)
+        if match:
+            flush_paragraph()
+            segments.append((match.group(1), match.group(2)))
+        elif line.lstrip().startswith("|"):
+            flush_paragraph()
+            segments.append(("", line))
+        else:
+            paragraph.append(line)
+    flush_paragraph()
+    return segments
+
+
+def join_markdown(segments: List[Tuple[str, str]]) -> str:
+    return "\n".join(prefix + text for prefix, text in segments)
+
+
+def _needs_translation(text: str) -> bool:
+    return any(c.isalpha() for c in text)
+
+
+def _source_hash(text: str) -> str:
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """
+    Mémoire de traduction persistante : (hash du segment source, langue cible) -> traduction.
+    """
+
+    def __init__(self, path: str = TRANSLATION_MEMORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS translation_memory ("
+                "source_hash TEXT NOT NULL, target_language TEXT NOT NULL, "
+                "translation TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (source_hash, target_language))"
+            )
+        return self._connection
+
+    def lookup(self, source_hashes: List[str], target_language: str) -> Dict[str, str]:
+        if not source_hashes:
+            return {}
+        found = {}
+        with self._lock:
+            db = self._db()
+            # SQLite limite le nombre de paramètres par requête
+            for i in range(0, len(source_hashes), 500):
+                batch = source_hashes[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = db.execute(
+                    f"SELECT source_hash, translation FROM translation_memory "
+                    f"WHERE target_language = ? AND source_hash IN ({placeholders})",
+                    [target_language, *batch],
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def store(self, entries: Dict[str, str], target_language: str):
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO translation_memory VALUES (?, ?, ?, ?)",
+                [(source_hash, target_language, translation, now) for source_hash, translation in entries.items()],
+            )
+            db.commit()
+
+
+translation_memory = TranslationMemory()
+
+
+def translate_segment(text: str, target_language: str) -> str:
+    prompt = f"""
+    Traduis le texte suivant en {language_name(target_language)}.
+    Conserve la mise en forme Markdown en ligne (gras, italique, liens, code, barres verticales des tableaux).
+    Retourne uniquement la traduction, sans guillemets ni commentaire.
+
+    Texte à traduire:
+    {text}
+    """
+    response = invoke_llm(prompt, temperature=0.3)
+    return response.content.strip()
+
+
+def translate_markdown(content: str, target_language: str, memory: TranslationMemory = translation_memory) -> str:
+    """
+    Traduit un contenu Markdown segment par segment : les segments déjà connus de la mémoire
+    de traduction sont réutilisés, les autres sont traduits en parallèle puis mémorisés.
+    """
+    segments = split_markdown(content)
+    hashes = {text: _source_hash(text) for _, text in segments if _needs_translation(text)}
+    known = memory.lookup(list(set(hashes.values())), target_language)
+
+    to_translate = {}
+    for text, source_hash in hashes.items():
+        if source_hash not in known and source_hash not in to_translate:
+            to_translate[source_hash] = text
+    print(f"[Traduction] {target_language}: {len(hashes)} segments, {len(hashes) - len(to_translate)} depuis la mémoire, {len(to_translate)} à traduire")
+
+    futures = {source_hash: _executor.submit(translate_segment, text, target_language) for source_hash, text in to_translate.items()}
+    translated = {}
+    errors = []
+    for source_hash, future in futures.items():
+        try:
+            translated[source_hash] = future.result()
+        except Exception as e:
+            errors.append(e)
+    # Les segments réussis sont mémorisés même si un autre a échoué
+    memory.store(translated, target_language)
+    if errors:
+        raise errors[0]
+    known.update(translated)
+
+    return join_markdown([
+        (prefix, known[hashes[text]] if text in hashes else text)
+        for prefix, text in segments
+    ])
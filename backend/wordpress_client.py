@@ -0,0 +1,170 @@
+import base64
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Site utilisé quand aucun site n'est précisé (et quand WORDPRESS_SITES n'est pas défini)
+DEFAULT_WORDPRESS_URL = "https://aic-builder.cloud-glory-creation.com"
+DEFAULT_SITE = "default"
+# Connexions keep-alive conservées par site
+WORDPRESS_POOL_SIZE = int(os.getenv("WORDPRESS_POOL_SIZE", "8"))
+WORDPRESS_TIMEOUT = float(os.getenv("WORDPRESS_TIMEOUT", "30"))
+
+
+class UnknownSiteError(KeyError):
+    """
+    Aucun site de ce nom dans la configuration.
+    """
+
+
+class WordPressSite:
+    """
+    Site WordPress cible : URL, identifiants Basic Auth et session HTTP persistante.
+    Les en-têtes d'authentification sont calculés une fois et les connexions TLS
+    sont réutilisées d'un appel à l'autre (pool keep-alive de WORDPRESS_POOL_SIZE connexions).
+    """
+
+    def __init__(self, name: str, url: str, username: Optional[str], password: Optional[str]):
+        self.name = name
+        self.url = url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.auth_headers: Dict[str, str] = {}
+        if username and password:
+            token = base64.b64encode(f"{username}:{password}".encode()).decode()
+            self.auth_headers = {"Authorization": f"Basic {token}"}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=WORDPRESS_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def has_credentials(self) -> bool:
+        return bool(self.auth_headers)
+
+    def endpoint(self, path: str) -> str:
+        return f"{self.url}/wp-json/{path.lstrip('/')}"
+
+    def owns_media_url(self, url: str) -> bool:
+        return url.startswith(f"{self.url}/wp-content/uploads/")
+
+    def post(self, path: str, headers: Optional[dict] = None, timeout: float = WORDPRESS_TIMEOUT, **kwargs) -> requests.Response:
+        return self.session.post(
+            self.endpoint(path),
+            headers={**self.auth_headers, **(headers or {})},
+            timeout=timeout,
+            **kwargs,
+        )
+
+    def upload_media(self, filename: str, data: bytes, content_type: str) -> requests.Response:
+        return self.post("wp/v2/media", files={"file": (filename, data, content_type)})
+
+    def describe(self) -> dict:
+        return {"name": self.name, "url": self.url, "configured": self.has_credentials}
+
+    def close(self):
+        self.session.close()
+
+
+def _site_configs() -> Dict[str, dict]:
+    """
+    Lit WORDPRESS_SITES (JSON) : {"nom": {"url", "username", "password"}, ...}
+    ou une liste [{"name", "url", "username", "password"}, ...]. Sans cette variable,
+    un seul site "default" : WORDPRESS_URL, WORDPRESS_USERNAME et WORDPRESS_PASSWORD.
+    """
+    raw = os.getenv("WORDPRESS_SITES")
+    if not raw:
+        return {
+            DEFAULT_SITE: {
+                "url": os.getenv("WORDPRESS_URL", DEFAULT_WORDPRESS_URL),
+                "username": os.getenv("WORDPRESS_USERNAME"),
+                "password": os.getenv("WORDPRESS_PASSWORD"),
+            }
+        }
+    try:
+        configs = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"WORDPRESS_SITES n'est pas un JSON valide: {str(e)}") from None
+    if isinstance(configs, list):
+        for position, config in enumerate(configs):
+            if not isinstance(config, dict) or not isinstance(config.get("name"), str) or not config["name"]:
+                raise ValueError(f"WORDPRESS_SITES[{position}]: champ 'name' manquant")
+        configs = {config["name"]: config for config in configs}
+    if not isinstance(configs, dict) or not configs:
+        raise ValueError("WORDPRESS_SITES doit être un objet ou une liste de sites non vide")
+    for name, config in configs.items():
+        if not isinstance(config, dict):
+            raise ValueError(f"WORDPRESS_SITES: le site '{name}' doit être un objet")
+        if not isinstance(config.get("url"), str) or not config["url"]:
+            raise ValueError(f"WORDPRESS_SITES: champ 'url' manquant pour le site '{name}'")
+    return configs
+
+
+class SiteRegistry:
+    """
+    Sites configurés, créés au premier usage (après le chargement du .env).
+    Le premier site déclaré est le site par défaut.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Optional[Dict[str, WordPressSite]] = None
+        self._error: Optional[ValueError] = None
+
+    def _load(self) -> Dict[str, WordPressSite]:
+        """
+        Lit la configuration une seule fois ; une configuration invalide lève ValueError
+        (la même erreur à chaque appel, sans relire ni réanalyser WORDPRESS_SITES).
+        """
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            if self._sites is None:
+                try:
+                    configs = _site_configs()
+                except ValueError as e:
+                    print(f"[WordPress] Configuration des sites invalide: {str(e)}")
+                    self._error = e
+                    raise
+                sites = {}
+                for name, config in configs.items():
+                    sites[name] = WordPressSite(name, config["url"], config.get("username"), config.get("password"))
+                    print(f"[WordPress] Site configuré: {name} ({sites[name].url})")
+                self._sites = sites
+            return self._sites
+
+    def get(self, name: Optional[str] = None) -> WordPressSite:
+        """
+        Retourne le site `name` (le site par défaut si None). Lève UnknownSiteError si le site
+        est inconnu, ValueError si la configuration des sites est invalide.
+        """
+        sites = self._load()
+        if name is None:
+            return sites.get(DEFAULT_SITE) or next(iter(sites.values()))
+        if name not in sites:
+            raise UnknownSiteError(name)
+        return sites[name]
+
+    def names(self) -> List[str]:
+        return list(self._load())
+
+    def describe(self) -> List[dict]:
+        return [site.describe() for site in self._load().values()]
+
+    def close(self):
+        with self._lock:
+            for site in (self._sites or {}).values():
+                site.close()
+            self._sites = None
+            self._error = None
+
+
+wordpress_sites = SiteRegistry()
+
+
+def get_site(name: Optional[str] = None) -> WordPressSite:
+    return wordpress_sites.get(name)
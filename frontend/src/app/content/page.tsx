@@ -178,7 +178,9 @@ export default function ContentPage() {
         },
         body: JSON.stringify({
           variations: [variationForRegeneration],
-          forceRegenerate: true
+          forceRegenerate: true,
+          // Palette du thème, utilisée si le logo ne permet pas d'en extraire une
+          colorData: sessionData.colorData
         }),
       });
       
@@ -380,7 +380,9 @@ export default function LogosPage() {
         },
         body: JSON.stringify({
           variations: variationsForRegeneration,
-          forceRegenerate: true  // Indiquer au backend de régénérer le contenu
+          forceRegenerate: true,  // Indiquer au backend de régénérer le contenu
+          // Palette du thème, utilisée si le logo ne permet pas d'en extraire une
+          colorData: sessionData.colorData
         }),
       });
 